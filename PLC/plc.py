@@ -47,6 +47,10 @@ modbus_slave_id = 1
 modbus_address = 0
 
 port = "/dev/ttyS0"
+# 設定 RTU_GATEWAY=host:port 時改經由 modbus_proxy 的 RTU gateway 存取 RS-485
+rtu_gateway = os.getenv("RTU_GATEWAY")
+# 設定 RACK_GATEWAY=host:port 時 rack 開度改經由 modbus_proxy 的 rack gateway 寫出
+rack_gateway = os.getenv("RACK_GATEWAY")
 
 switch_address = 0x0000
 
@@ -6704,15 +6708,19 @@ duration = 0.5
 def rtu_thread():
     prev_plc_error = False  # 追踪上一次的 PLC 錯誤狀態
 
-    client = ModbusSerialClient(
-        method="rtu",
-        port="/dev/ttyS0",
-        baudrate=19200,
-        parity="E",
-        stopbits=1,
-        bytesize=8,
-        timeout=0.5,
-    )
+    if rtu_gateway:
+        gateway_host, gateway_port = rtu_gateway.rsplit(":", 1)
+        client = ModbusTcpClient(gateway_host, port=int(gateway_port), timeout=0.5)
+    else:
+        client = ModbusSerialClient(
+            method="rtu",
+            port="/dev/ttyS0",
+            baudrate=19200,
+            parity="E",
+            stopbits=1,
+            bytesize=8,
+            timeout=0.5,
+        )
     try:
         while True:
             global ver_switch
@@ -6986,6 +6994,46 @@ def rtu_thread():
         client.close()
 
 
+# rack gateway 的位址表 (見 modbus_proxy/rack_gateway.py)
+RACK_GATEWAY_RELEASE = 0xFFFF
+RACK_GATEWAY_PASS_OFFSET = 40
+
+
+def send_rack_openings(client):
+    """
+    把各 rack 的開度一次寫給 rack gateway，未啟用的 rack 寫 RELEASE 不再控制；
+    pass 取自 gateway 最近一次寫出 rack 的結果。
+    """
+    opening_value = round(4095 * rack_data["rack_opening"] / 100)
+    values = []
+    for i in range(10):
+        if not rack_data["rack_control"][f"Rack_{i + 1}_Enable"]:
+            values.append(RACK_GATEWAY_RELEASE)
+        elif rack_data["rack_control"][f"Rack_{i + 1}_Control"]:
+            values.append(opening_value)
+        else:
+            values.append(0)
+
+    try:
+        result = client.write_registers(0, values)
+        if result.isError():
+            raise ValueError(result)
+        r = client.read_discrete_inputs(RACK_GATEWAY_PASS_OFFSET, 10)
+        if r.isError():
+            raise ValueError(r)
+    except Exception as e:
+        client.close()
+        for i in range(10):
+            if values[i] != RACK_GATEWAY_RELEASE:
+                rack_data["rack_pass"][f"Rack_{i + 1}_Pass"] = False
+        print(f"rack gateway error: {e}")
+        return
+
+    for i in range(10):
+        if values[i] != RACK_GATEWAY_RELEASE:
+            rack_data["rack_pass"][f"Rack_{i + 1}_Pass"] = r.bits[i]
+
+
 def rack_thread():
     host = {
         "rack1": "192.168.3.10",
@@ -7000,6 +7048,13 @@ def rack_thread():
         "rack10": "192.168.3.19",
     }
 
+    rack_gateway_client = None
+    if rack_gateway:
+        gateway_host, gateway_port = rack_gateway.rsplit(":", 1)
+        rack_gateway_client = ModbusTcpClient(
+            gateway_host, port=int(gateway_port), timeout=0.5
+        )
+
     while True:
         ### 以下複製進plc_spare 開始
 
@@ -7028,27 +7083,30 @@ def rack_thread():
                 except Exception as e:
                     print(f"rack control error: {e}")
 
-                for i in range(10):
-                    enable_key = f"Rack_{i + 1}_Enable"
-                    control_key = f"Rack_{i + 1}_Control"
-                    ip_key = f"rack{i + 1}"
-                    rack_ip = host[ip_key]
-                    pass_key = f"Rack_{i + 1}_Pass"
-                    opening_value = 4095 * rack_data["rack_opening"] / 100
-                    if rack_data["rack_control"][enable_key]:
-                        try:
-                            with ModbusTcpClient(
-                                host=rack_ip, port=modbus_port, timeout=0.5
-                            ) as client:
-                                if rack_data["rack_control"][control_key]:
-                                    client.write_register(0, round(opening_value))
-                                else:
-                                    client.write_register(0, 0)
-                                rack_data["rack_pass"][pass_key] = True
-                        except Exception as e:
-                            rack_data["rack_pass"][pass_key] = False
-                            print(f"rack input error: {e}")
-                            # journal_logger.info(f"rack input error: {e}")
+                if rack_gateway_client is not None:
+                    send_rack_openings(rack_gateway_client)
+                else:
+                    for i in range(10):
+                        enable_key = f"Rack_{i + 1}_Enable"
+                        control_key = f"Rack_{i + 1}_Control"
+                        ip_key = f"rack{i + 1}"
+                        rack_ip = host[ip_key]
+                        pass_key = f"Rack_{i + 1}_Pass"
+                        opening_value = 4095 * rack_data["rack_opening"] / 100
+                        if rack_data["rack_control"][enable_key]:
+                            try:
+                                with ModbusTcpClient(
+                                    host=rack_ip, port=modbus_port, timeout=0.5
+                                ) as client:
+                                    if rack_data["rack_control"][control_key]:
+                                        client.write_register(0, round(opening_value))
+                                    else:
+                                        client.write_register(0, 0)
+                                    rack_data["rack_pass"][pass_key] = True
+                            except Exception as e:
+                                rack_data["rack_pass"][pass_key] = False
+                                print(f"rack input error: {e}")
+                                # journal_logger.info(f"rack input error: {e}")
             except Exception as e:
                 print(f"rack key error: {e}")
 
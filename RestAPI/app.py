@@ -18,6 +18,11 @@ import requests
 import pyzipper
 from dotenv import load_dotenv, set_key
 
+# 本地模組
+from state_cache import JsonStateCache, thaw
+# webUI/web/unit_view.py 的副本，RestAPI 另外部署時不依賴 webUI 的目錄
+from unit_view import convert_units
+
 # from flask_limiter import Limiter
 # from flask_limiter.util import get_remote_address
 load_dotenv()
@@ -25,6 +30,8 @@ load_dotenv()
 log_path = os.path.dirname(os.getcwd())
 json_path = f"{log_path}/webUI/web/json"
 web_path = f"{log_path}/webUI/web"
+# webUI 發佈的 JSON 只在檔案改變時重新解析
+state_cache = JsonStateCache()
 
 app = Flask(__name__)
 api = Api(app, version="0.6.6", title="CDU API", description="API for CDU system")
@@ -916,40 +923,25 @@ def cvt_registers_to_float(reg1, reg2):
     return decoded_value_big_endian
 
 
-def read_data_from_json():
+def read_data_from_json(mutable=False):
+    """mutable=False 時為 state_cache 的唯讀快照；要修改內容時傳 True"""
     global thrshd, ctr_data, measure_data, fw_info, sensor_data
 
-    with open(f"{json_path}/thrshd.json", "r") as file:
-        thrshd = json.load(file)
-
-    with open(f"{json_path}/ctr_data.json", "r") as file:
-        ctr_data = json.load(file)
+    thrshd = state_cache.get(f"{json_path}/thrshd.json")
+    ctr_data = state_cache.get(f"{json_path}/ctr_data.json")
+    measure_data = state_cache.get(f"{json_path}/measure_data.json")
+    fw_info = state_cache.get(f"{web_path}/fw_info.json")
+    sensor_data = state_cache.get(f"{json_path}/sensor_data.json")
 
-    with open(f"{json_path}/measure_data.json", "r") as file:
-        measure_data = json.load(file)
-
-    with open(f"{web_path}/fw_info.json", "r") as file:
-        fw_info = json.load(file)
-        
-    with open(f"{json_path}/sensor_data.json", "r") as file:
-        sensor_data = json.load(file)
+    if mutable:
+        thrshd = thaw(thrshd)
+        ctr_data = thaw(ctr_data)
+        measure_data = thaw(measure_data)
 
 def change_to_metric():
-    read_data_from_json()
-
-    for key in thrshd:
-        if not key.endswith("_trap") and not key.startswith("Delay_"):
-            if "Temp" in key:
-                thrshd[key] = (thrshd[key] - 32) * 5.0 / 9.0
-
-            if "DewPoint" in key:
-                thrshd[key] = (thrshd[key]) * 5.0 / 9.0
-
-            if "Prsr" in key:
-                thrshd[key] = thrshd[key] * 6.89476
+    read_data_from_json(mutable=True)
 
-            if "Flow" in key:
-                thrshd[key] = thrshd[key] / 0.2642
+    thrshd.update(convert_units(thrshd, "thrshd", "metric"))
 
     registers = []
     index = 0
@@ -975,17 +967,7 @@ def change_to_metric():
 
         i += 1
 
-    key_list = list(ctr_data["value"].keys())
-    for key in key_list:
-        if key == "oil_temp_set":
-            ctr_data["value"]["oil_temp_set"] = (
-                (ctr_data["value"]["oil_temp_set"] - 32) / 9.0 * 5.0
-            )
-
-        if key == "oil_pressure_set":
-            ctr_data["value"]["oil_pressure_set"] = (
-                ctr_data["value"]["oil_pressure_set"] * 6.89476
-            )
+    ctr_data["value"].update(convert_units(ctr_data["value"], "control", "metric"))
 
     temp1, temp2 = cvt_float_byte(ctr_data["value"]["oil_temp_set"])
     try:
@@ -1003,16 +985,7 @@ def change_to_metric():
     except Exception as e:
         print(f"write oil pressure error:{e}")
 
-    key_list = list(measure_data.keys())
-    for key in key_list:
-        if "Temp" in key:
-            measure_data[key] = (measure_data[key] - 32) * 5.0 / 9.0
-
-        if "Prsr" in key:
-            measure_data[key] = measure_data[key] * 6.89476
-
-        if "f1" in key or "f2" in key:
-            measure_data[key] = measure_data[key] / 0.2642
+    measure_data.update(convert_units(measure_data, "measure", "metric"))
     try:
         with ModbusTcpClient(host=modbus_host, port=modbus_port) as client:
             for i, (key, value) in enumerate(measure_data.items()):
@@ -1024,21 +997,9 @@ def change_to_metric():
 
 
 def change_to_imperial():
-    read_data_from_json()
-
-    for key in thrshd:
-        if not key.endswith("_trap") and not key.startswith("Delay_"):
-            if "Temp" in key:
-                thrshd[key] = thrshd[key] * 9.0 / 5.0 + 32.0
-
-            if "DewPoint" in key:
-                thrshd[key] = thrshd[key] * 9.0 / 5.0
+    read_data_from_json(mutable=True)
 
-            if "Prsr" in key:
-                thrshd[key] = thrshd[key] * 0.145038
-
-            if "Flow" in key:
-                thrshd[key] = thrshd[key] * 0.2642
+    thrshd.update(convert_units(thrshd, "thrshd", "imperial"))
 
     registers = []
     index = 0
@@ -1077,17 +1038,7 @@ def change_to_imperial():
     except Exception as e:
         print(f"write oil pressure error:{e}")
 
-    key_list = list(ctr_data["value"].keys())
-    for key in key_list:
-        if key == "oil_temp_set":
-            ctr_data["value"]["oil_temp_set"] = (
-                ctr_data["value"]["oil_temp_set"] * 9.0 / 5.0 + 32.0
-            )
-
-        if key == "oil_pressure_set":
-            ctr_data["value"]["oil_pressure_set"] = (
-                ctr_data["value"]["oil_pressure_set"] * 0.145038
-            )
+    ctr_data["value"].update(convert_units(ctr_data["value"], "control", "imperial"))
 
     temp1, temp2 = cvt_float_byte(ctr_data["value"]["oil_temp_set"])
     try:
@@ -1103,16 +1054,7 @@ def change_to_imperial():
     except Exception as e:
         print(f"write oil pressure error:{e}")
 
-    key_list = list(measure_data.keys())
-    for key in key_list:
-        if "Temp" in key:
-            measure_data[key] = measure_data[key] * 9.0 / 5.0 + 32.0
-
-        if "Prsr" in key:
-            measure_data[key] = measure_data[key] * 0.145038
-
-        if "f1" in key or "f2" in key:
-            measure_data[key] = measure_data[key] * 0.2642
+    measure_data.update(convert_units(measure_data, "measure", "imperial"))
 
     try:
         with ModbusTcpClient(host=modbus_host, port=modbus_port) as client:
@@ -1159,9 +1101,7 @@ def change_data_by_unit():
 
 def read_ctr_data():
     try:
-        with open(f"{json_path}/ctr_data.json", "r") as json_file:
-            data = json.load(json_file)
-            return data
+        return state_cache.get(f"{json_path}/ctr_data.json")
 
     except Exception as e:
         print(f"read ctr_data error: {e}")
@@ -1170,9 +1110,7 @@ def read_ctr_data():
 
 def read_sensor_data():
     try:
-        with open(f"{json_path}/sensor_data.json", "r") as json_file:
-            data = json.load(json_file)
-            return data
+        return state_cache.get(f"{json_path}/sensor_data.json")
 
     except Exception as e:
         print(f"read sensor_data error: {e}")
@@ -1181,10 +1119,8 @@ def read_sensor_data():
 
 def read_unit():
     try:
-        with open(f"{json_path}/system_data.json", "r") as json_file:
-            data = json.load(json_file)
-            unit = data["value"]["unit"]
-            return unit
+        data = state_cache.get(f"{json_path}/system_data.json")
+        return data["value"]["unit"]
     except Exception as e:
         print(f"read unit error: {e}")
         return plc_error()
@@ -1992,8 +1928,7 @@ class CduDevice(Resource):
     def get(self):
         """Get the current device values of CDU"""
         try:
-            with open(f"{json_path}/scc_device.json", "r") as file:
-                device = json.load(file)
+            device = state_cache.get(f"{json_path}/scc_device.json")
         except Exception as e:
             return plc_error()
            
@@ -2331,8 +2266,7 @@ class SensorsSummary(Resource):
     '''
     @default_ns.doc("get_sensor_summary")
     def get(self):
-        with open(f"{json_path}/version.json", "r") as file:
-            version_josn = json.load(file)
+        version_josn = state_cache.get(f"{json_path}/version.json")
         # 判斷幾顆風扇
         fan_count_switch = version_josn["fan_count_switch"]
         rep = {}
@@ -2466,18 +2400,14 @@ class SensorsSummary(Resource):
 # 0512新增
 def get_version_json():
     try:
-        with open(f"{web_path}/fw_info_version.json", "r") as json_file:
-            data = json.load(json_file)
-            return data
+        return state_cache.get(f"{web_path}/fw_info_version.json")
     except Exception as e:
         print(f"read fw_info_version error: {e}")
         return e
 
 def get_fw_info():
     try:
-        with open(f"{web_path}/fw_info.json", "r") as json_file:
-            data = json.load(json_file)
-            return data
+        return state_cache.get(f"{web_path}/fw_info.json")
     except Exception as e:
         print(f"read fw_info error: {e}")
         return e
@@ -0,0 +1,64 @@
+"""
+RestAPI 讀取 webUI 狀態檔 (sensor_data.json、ctr_data.json...) 的行程內快取。
+
+每次取用只 stat 一次檔案，(inode, mtime, size) 沒變就回傳上次解析的快照，
+內容改變 (webUI 以 atomic rename 發佈，inode 會跟著變) 才重新解析。
+快照為唯讀 (FrozenDict / tuple)，所有 handler 共用同一份；
+需要修改時以 thaw() 取得一般 dict / list 的複本。
+"""
+
+import json
+import os
+import threading
+
+
+class FrozenDict(dict):
+    """json.dumps 仍視為一般 dict，但不允許修改"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("state snapshot is read-only, use thaw() to modify")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value):
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+class JsonStateCache:
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get(self, path):
+        """回傳 path 的唯讀快照；檔案不存在或 JSON 不完整時拋出例外"""
+        stat = os.stat(path)
+        stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        entry = self.entries.get(path)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == stamp:
+                return entry[1]
+            with open(path, "r") as file:
+                snapshot = freeze(json.load(file))
+            self.entries[path] = (stamp, snapshot)
+            return snapshot
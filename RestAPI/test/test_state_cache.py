@@ -0,0 +1,72 @@
+import os
+import sys
+import json
+import pickle
+import pytest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from state_cache import FrozenDict, JsonStateCache, thaw
+
+
+def publish(path, data):
+    # 與 webUI 相同以 atomic rename 發佈
+    tmp_path = str(path) + ".tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(data, file)
+    os.replace(tmp_path, path)
+
+
+def test_unchanged_file_returns_same_snapshot(tmp_path):
+    """[TestCase] 檔案沒變時回傳同一份快照，不重新解析"""
+    path = tmp_path / "sensor_data.json"
+    publish(path, {"value": {"temp": 25.0}, "list": [1, 2]})
+    cache = JsonStateCache()
+
+    first = cache.get(str(path))
+    assert cache.get(str(path)) is first
+    assert first["value"]["temp"] == 25.0
+    assert first["list"] == (1, 2)
+
+
+def test_republished_file_is_reloaded(tmp_path):
+    """[TestCase] atomic rename 發佈新內容後重新解析"""
+    path = tmp_path / "ctr_data.json"
+    publish(path, {"mode": "auto"})
+    cache = JsonStateCache()
+    first = cache.get(str(path))
+
+    publish(path, {"mode": "stop"})
+    second = cache.get(str(path))
+    assert second is not first
+    assert second == {"mode": "stop"}
+
+
+def test_snapshot_is_read_only(tmp_path):
+    """[TestCase] 快照不可修改，thaw() 取得可修改的複本"""
+    path = tmp_path / "system_data.json"
+    publish(path, {"value": {"unit": "metric"}, "items": [{"a": 1}]})
+    snapshot = JsonStateCache().get(str(path))
+
+    with pytest.raises(TypeError):
+        snapshot["value"]["unit"] = "imperial"
+    with pytest.raises(TypeError):
+        snapshot.update({"x": 1})
+
+    copy = thaw(snapshot)
+    copy["value"]["unit"] = "imperial"
+    copy["items"].append({"b": 2})
+    assert snapshot["value"]["unit"] == "metric"
+    assert type(copy["value"]) is dict and type(copy["items"]) is list
+    assert json.loads(json.dumps(snapshot)) == {"value": {"unit": "metric"}, "items": [{"a": 1}]}
+    assert isinstance(pickle.loads(pickle.dumps(snapshot)), FrozenDict)
+
+
+def test_missing_or_partial_file_raises(tmp_path):
+    """[TestCase] 檔案不存在或 JSON 不完整時拋出例外，交由呼叫端處理"""
+    cache = JsonStateCache()
+    with pytest.raises(FileNotFoundError):
+        cache.get(str(tmp_path / "missing.json"))
+
+    path = tmp_path / "partial.json"
+    path.write_text('{"value": ')
+    with pytest.raises(ValueError):
+        cache.get(str(path))
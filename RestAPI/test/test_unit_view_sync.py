@@ -0,0 +1,22 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from unit_view import convert_units
+
+REST_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WEB_UNIT_VIEW = os.path.join(os.path.dirname(REST_DIR), "webUI", "web", "unit_view.py")
+
+
+def test_copy_matches_webui():
+    """[TestCase] RestAPI 的 unit_view.py 與 webUI 的版本內容相同"""
+    with open(os.path.join(REST_DIR, "unit_view.py"), "rb") as file:
+        rest = file.read()
+    with open(WEB_UNIT_VIEW, "rb") as file:
+        web = file.read()
+    assert rest == web, "webUI/web/unit_view.py 有修改，請同步複製到 RestAPI/unit_view.py"
+
+
+def test_copy_converts_thresholds():
+    """[TestCase] RestAPI 載入的是本目錄的副本，門檻值換算正常"""
+    imperial = convert_units({"Thr_W_Temp": 40.0, "Delay_Temp": 10}, "thrshd", "imperial")
+    assert imperial == {"Thr_W_Temp": 104.0, "Delay_Temp": 10}
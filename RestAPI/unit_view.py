@@ -0,0 +1,122 @@
+"""
+公制 / 英制換算。
+
+PLC 內的設定值以目前的顯示單位保存，切換單位時仍需整批換算後寫回 PLC；
+這裡只負責換算本身：一律回傳新的 dict，不修改傳入的資料。
+每組欄位的換算表 (哪個欄位套用哪個換算) 依欄位名稱建一次後快取，
+之後每次換算只需查表。
+
+RestAPI 另外部署，RestAPI/unit_view.py 是這個檔案的副本，修改時兩邊一起改
+(RestAPI/test/test_unit_view_sync.py 會比對兩者內容)。
+"""
+
+import functools
+
+
+# (公制 -> 英制, 英制 -> 公制)
+TEMPERATURE = (lambda v: v * 9.0 / 5.0 + 32.0, lambda v: (v - 32) * 5.0 / 9.0)
+TEMPERATURE_DELTA = (lambda v: v * 9.0 / 5.0, lambda v: v * 5.0 / 9.0)
+PRESSURE = (lambda v: v * 0.145038, lambda v: v * 6.89476)
+FLOW = (lambda v: v * 0.2642, lambda v: v / 0.2642)
+
+UNIT_LABELS = {
+    "metric": {TEMPERATURE: "°C", PRESSURE: "kPa", FLOW: "LPM"},
+    "imperial": {TEMPERATURE: "°F", PRESSURE: "psi", FLOW: "GPM"},
+}
+
+
+def _threshold_kinds(key):
+    if key.endswith("_trap") or key.startswith("Delay_"):
+        return ()
+    kinds = []
+    if "Temp" in key:
+        kinds.append(TEMPERATURE)
+    if "DewPoint" in key:
+        kinds.append(TEMPERATURE_DELTA)
+    if "Prsr" in key:
+        kinds.append(PRESSURE)
+    if "Flow" in key:
+        kinds.append(FLOW)
+    return tuple(kinds)
+
+
+def _measure_kinds(key):
+    kinds = []
+    if "Temp" in key:
+        kinds.append(TEMPERATURE)
+    if "Prsr" in key:
+        kinds.append(PRESSURE)
+    if "f1" in key or "f2" in key:
+        kinds.append(FLOW)
+    return tuple(kinds)
+
+
+def _control_kinds(key):
+    if key == "oil_temp_set":
+        return (TEMPERATURE,)
+    if key == "oil_pressure_set":
+        return (PRESSURE,)
+    return ()
+
+
+def _sensor_value_kinds(key):
+    # Redfish / SCC 的 sensor 名稱 (CoolantSupplyTemperature、DewPoint...)
+    if "Temp" in key or "Dew" in key:
+        return (TEMPERATURE,)
+    if "Pressure" in key:
+        return (PRESSURE,)
+    if "Flow" in key:
+        return (FLOW,)
+    return ()
+
+
+RULES = {
+    "thrshd": _threshold_kinds,
+    "measure": _measure_kinds,
+    "control": _control_kinds,
+    "sensor_value": _sensor_value_kinds,
+}
+
+
+@functools.lru_cache(maxsize=64)
+def conversion_table(rules, keys):
+    """
+    回傳 {key: 換算種類 tuple}，只含需要換算的欄位。
+    keys 為欄位名稱的 tuple，同一組欄位只會建一次表。
+    """
+    classify = RULES[rules]
+    table = {}
+    for key in keys:
+        kinds = classify(key)
+        if kinds:
+            table[key] = kinds
+    return table
+
+
+def convert_units(data, rules, unit):
+    """
+    把 data 換算成 unit ("imperial" / "metric")，data 視為另一個單位。
+    回傳與 data 相同型別的新 dict，不需換算的欄位原樣保留。
+    """
+    direction = 0 if unit == "imperial" else 1
+    result = data.copy()
+    for key, kinds in conversion_table(rules, tuple(data)).items():
+        value = result[key]
+        if value is None:
+            continue
+        for kind in kinds:
+            value = kind[direction](value)
+        result[key] = value
+    return result
+
+
+@functools.lru_cache(maxsize=16)
+def unit_labels(rules, keys, unit):
+    """回傳 {key: 單位文字}，只含有單位的欄位"""
+    labels = UNIT_LABELS[unit]
+    return {
+        key: labels[kinds[0]]
+        for key, kinds in conversion_table(rules, keys).items()
+        if kinds[0] in labels
+    }
+
@@ -0,0 +1,147 @@
+# 標準函式庫
+import asyncio
+import struct
+
+# 第三方套件
+import logging
+from pymodbus.device import ModbusControlBlock
+from pymodbus.exceptions import NoSuchSlaveException
+from pymodbus.factory import ServerDecoder
+from pymodbus.pdu import ModbusExceptions
+from pymodbus.transaction import ModbusSocketFramer
+
+
+log = logging.getLogger()
+
+
+MBAP_HEADER = struct.Struct(">HHHB")
+# MBAP length 欄位含 unit id，PDU 最長 253 bytes
+MAX_MBAP_LENGTH = 254
+# 每條連線的讀取緩衝上限，一個 Modbus TCP frame 最大 260 bytes
+STREAM_LIMIT = 512
+
+
+class AsyncModbusServer:
+    """
+    以 asyncio 實作的 Modbus TCP server。
+
+    所有連線共用同一個 event loop thread，每條連線只有一個 StreamReader/Writer，
+    可同時掛上數百條閒置或活躍的連線。超過 idle_timeout 沒有請求的連線會被關閉，
+    連線數超過 max_connections 時新連線會直接被拒絕。
+    """
+
+    def __init__(
+        self,
+        context,
+        identity=None,
+        address=("0.0.0.0", 5020),
+        max_connections=256,
+        idle_timeout=60,
+    ):
+        self.context = context
+        self.address = address
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+
+        self.decoder = ServerDecoder()
+        self.framer = ModbusSocketFramer(self.decoder)
+        self.control = ModbusControlBlock()
+        if identity is not None:
+            self.control.Identity.update(identity)
+
+        self.connections = 0
+        self.loop = None
+        self.server = None
+
+    async def _read_frame(self, reader):
+        header = await asyncio.wait_for(
+            reader.readexactly(MBAP_HEADER.size), self.idle_timeout
+        )
+        transaction_id, protocol_id, length, unit_id = MBAP_HEADER.unpack(header)
+        if protocol_id != 0 or not 2 <= length <= MAX_MBAP_LENGTH:
+            raise ValueError(f"Invalid MBAP header: {header.hex()}")
+        pdu = await asyncio.wait_for(reader.readexactly(length - 1), self.idle_timeout)
+        return transaction_id, unit_id, pdu
+
+    async def process(self, transaction_id, unit_id, pdu, peer):
+        """處理一個請求 PDU，回傳完整的回應封包 (含 MBAP)；None 表示不回應 (僅子類別使用)"""
+        return self._execute(transaction_id, unit_id, pdu)
+
+    def _exception_packet(self, transaction_id, unit_id, function_code, exception_code):
+        pdu = bytes([(function_code | 0x80) & 0xFF, exception_code])
+        return MBAP_HEADER.pack(transaction_id, 0, len(pdu) + 1, unit_id) + pdu
+
+    def _execute(self, transaction_id, unit_id, pdu):
+        try:
+            request = self.decoder.decode(pdu)
+        except Exception as e:
+            log.warning(f"Unable to decode request {pdu.hex()}: {e}")
+            request = None
+        if request is None:
+            # 無法解析的功能碼 / 子功能回 IllegalFunction，不讓 client 等到逾時
+            return self._exception_packet(
+                transaction_id, unit_id, pdu[0], ModbusExceptions.IllegalFunction
+            )
+
+        try:
+            response = request.execute(self.context[unit_id])
+        except NoSuchSlaveException:
+            response = request.doException(ModbusExceptions.GatewayNoResponse)
+        except Exception as e:
+            log.error(f"Error executing request {request}: {e}")
+            response = request.doException(ModbusExceptions.SlaveFailure)
+
+        response.transaction_id = transaction_id
+        response.unit_id = unit_id
+        return self.framer.buildPacket(response)
+
+    async def _handle_client(self, reader, writer):
+        peer = writer.get_extra_info("peername")
+        if self.connections >= self.max_connections:
+            log.warning(
+                f"Rejecting {peer}: max connections ({self.max_connections}) reached"
+            )
+            writer.close()
+            return
+
+        self.connections += 1
+        try:
+            while True:
+                transaction_id, unit_id, pdu = await self._read_frame(reader)
+                packet = await self.process(transaction_id, unit_id, pdu, peer)
+                if packet is None:
+                    continue
+                writer.write(packet)
+                await writer.drain()
+        except asyncio.TimeoutError:
+            log.info(f"Closing idle connection {peer}")
+        except asyncio.IncompleteReadError:
+            pass
+        except (ConnectionError, ValueError) as e:
+            log.info(f"Closing connection {peer}: {e}")
+        finally:
+            self.connections -= 1
+            self.connection_closed(peer)
+            writer.close()
+
+    def connection_closed(self, peer):
+        pass
+
+    async def serve(self):
+        self.loop = asyncio.get_running_loop()
+        host, port = self.address
+        self.server = await asyncio.start_server(
+            self._handle_client, host, port, limit=STREAM_LIMIT, reuse_address=True
+        )
+        async with self.server:
+            await self.server.serve_forever()
+
+    def serve_forever(self):
+        try:
+            asyncio.run(self.serve())
+        except asyncio.CancelledError:
+            pass
+
+    def server_close(self):
+        if self.loop is not None and self.server is not None:
+            self.loop.call_soon_threadsafe(self.server.close)
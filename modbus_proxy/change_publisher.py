@@ -0,0 +1,128 @@
+# 標準函式庫
+import json
+import os
+import socket
+import time
+from threading import Lock, Thread
+
+# 第三方套件
+import logging
+
+
+log = logging.getLogger()
+
+
+DEFAULT_SOCKET_PATH = "/tmp/modbus_proxy_changes.sock"
+
+
+def diff_values(previous, current, start):
+    """比對同一段位址的前後快照，回傳 (address, old, new) 清單"""
+    if previous is None:
+        return []
+    return [
+        (start + i, old, new)
+        for i, (old, new) in enumerate(zip(previous, current))
+        if old != new
+    ]
+
+
+class ChangePublisher:
+    """
+    在本機 Unix socket 上廣播暫存器變化事件。
+
+    每個事件為一行 JSON：
+    {"table": "ir"|"di", "address": int, "old": int, "new": int, "ts": float}
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH, send_timeout=0.2):
+        self.socket_path = socket_path
+        self.send_timeout = send_timeout
+        self.subscribers = []
+        self.lock = Lock()
+        self.server = None
+        self.accept_thread = None
+
+    def start(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o666)
+        self.server.listen(16)
+
+        self.accept_thread = Thread(target=self._accept_loop, daemon=True)
+        self.accept_thread.start()
+        log.info(f"Change publisher listening on {self.socket_path}")
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                # socket 已關閉
+                return
+            conn.settimeout(self.send_timeout)
+            with self.lock:
+                self.subscribers.append(conn)
+            log.info(f"Change subscriber connected ({len(self.subscribers)} total)")
+
+    def publish(self, table, changes, ts=None):
+        if not changes:
+            return
+        ts = time.time() if ts is None else ts
+        payload = "".join(
+            json.dumps(
+                {"table": table, "address": address, "old": old, "new": new, "ts": ts},
+                separators=(",", ":"),
+            )
+            + "\n"
+            for address, old, new in changes
+        ).encode()
+
+        with self.lock:
+            alive = []
+            for conn in self.subscribers:
+                try:
+                    conn.sendall(payload)
+                    alive.append(conn)
+                except OSError:
+                    # 訂閱端斷線或卡住，直接移除，不拖慢同步迴圈
+                    conn.close()
+            if len(alive) != len(self.subscribers):
+                log.info(f"Dropped {len(self.subscribers) - len(alive)} change subscriber(s)")
+            self.subscribers = alive
+
+    def stop(self):
+        with self.lock:
+            for conn in self.subscribers:
+                conn.close()
+            self.subscribers = []
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def subscribe_changes(socket_path=DEFAULT_SOCKET_PATH, timeout=None):
+    """
+    連線到 proxy 的變化通知 socket，逐一 yield 事件 dict。
+    連線中斷時結束，由呼叫端決定是否重連。
+    """
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conn.settimeout(timeout)
+    conn.connect(socket_path)
+    buffer = b""
+    try:
+        while True:
+            chunk = conn.recv(4096)
+            if not chunk:
+                return
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line:
+                    yield json.loads(line)
+    finally:
+        conn.close()
@@ -0,0 +1,110 @@
+# 標準函式庫
+import logging
+
+# 第三方套件
+import numpy as np
+from pymodbus.datastore.store import BaseModbusDataBlock
+
+
+log = logging.getLogger()
+
+
+class NumpyRegisterBlock(BaseModbusDataBlock):
+    """
+    以預先配置的 uint16 陣列保存暫存器。
+
+    setValues 為整段 slice 指派；getValues 回傳底層陣列的 memoryview，
+    pymodbus 組回應時直接迭代，不會再複製一份 list。
+    """
+
+    def __init__(self, address, count, default=0):
+        self.address = address
+        self.default_value = default
+        self.values = np.full(count, default, dtype=np.uint16)
+
+    def default(self, count, value=0):
+        self.default_value = value
+        self.values = np.full(count, value, dtype=np.uint16)
+        self.address = 0x00
+
+    def reset(self):
+        self.values.fill(self.default_value)
+
+    def validate(self, address, count=1):
+        start = address - self.address
+        return start >= 0 and start + count <= len(self.values)
+
+    def getValues(self, address, count=1):
+        start = address - self.address
+        return memoryview(self.values[start : start + count])
+
+    def setValues(self, address, values):
+        if isinstance(values, int):
+            values = [values]
+        start = address - self.address
+        self.values[start : start + len(values)] = values
+
+    def __iter__(self):
+        return ((self.address + i, int(v)) for i, v in enumerate(self.values))
+
+
+class NumpyBitBlock(BaseModbusDataBlock):
+    """
+    以 bit-packed uint8 陣列保存 coil / discrete input，每 8 個點佔 1 byte。
+    位元順序與 Modbus 相同 (little bit order)。
+    """
+
+    def __init__(self, address, count, default=False):
+        self.address = address
+        self.default_value = bool(default)
+        self.count = count
+        self.values = np.full(
+            (count + 7) // 8, 0xFF if default else 0x00, dtype=np.uint8
+        )
+
+    def default(self, count, value=False):
+        self.__init__(0x00, count, value)
+
+    def reset(self):
+        self.values.fill(0xFF if self.default_value else 0x00)
+
+    def validate(self, address, count=1):
+        start = address - self.address
+        return start >= 0 and start + count <= self.count
+
+    def _unpack(self, start, count):
+        """展開涵蓋 [start, start+count) 的 byte，回傳 (bits, 在 bits 內的偏移)"""
+        first = start // 8
+        last = (start + count + 7) // 8
+        bits = np.unpackbits(self.values[first:last], bitorder="little")
+        return bits, start - first * 8, first
+
+    def getValues(self, address, count=1):
+        start = address - self.address
+        bits, offset, _ = self._unpack(start, count)
+        return memoryview(bits[offset : offset + count])
+
+    def setValues(self, address, values):
+        if isinstance(values, (bool, int)):
+            values = [values]
+        start = address - self.address
+        count = len(values)
+        bits, offset, first = self._unpack(start, count)
+        bits[offset : offset + count] = np.asarray(values, dtype=bool)
+        packed = np.packbits(bits, bitorder="little")
+        self.values[first : first + len(packed)] = packed
+
+    def setRegisterBits(self, address, registers, count=None):
+        """
+        直接把 16-bit 暫存器展開成點位寫入 (bit0 在前)，
+        省去逐位元轉成 Python list 的成本。
+        """
+        words = np.asarray(registers, dtype="<u2")
+        bits = np.unpackbits(words.view(np.uint8), bitorder="little")
+        if count is not None:
+            bits = bits[:count]
+        self.setValues(address, bits)
+
+    def __iter__(self):
+        bits = np.unpackbits(self.values, bitorder="little")[: self.count]
+        return ((self.address + i, bool(v)) for i, v in enumerate(bits))
@@ -1,4 +1,5 @@
 # 標準函式庫
+import os
 import sys
 import time
 from threading import Thread
@@ -11,24 +12,48 @@ from pymodbus.datastore import ModbusSlaveContext, ModbusServerContext, ModbusSe
 from pymodbus.device import ModbusDeviceIdentification
 from pymodbus.transaction import ModbusSocketFramer
 
+from async_server import AsyncModbusServer
+from change_publisher import ChangePublisher, DEFAULT_SOCKET_PATH, diff_values
+from rack_gateway import RackGateway
+from rtu_gateway import RtuBus, RtuGatewayServer
+
 
 logging.basicConfig()
 log = logging.getLogger()
 log.setLevel(logging.INFO)
 
 
-input_registers = [0] * 5000
-input_coils = [0] * 5000
-slave_context = ModbusSlaveContext(
-    ir=ModbusSequentialDataBlock(0, input_registers),
-    di=ModbusSequentialDataBlock(0, input_coils),
-)
+try:
+    from numpy_datastore import NumpyBitBlock, NumpyRegisterBlock
+except ImportError as e:
+    # 沒有安裝 numpy 時退回 pymodbus 內建的 list datastore
+    log.warning(f"numpy datastore unavailable ({e}), using pymodbus list datastore")
+    NumpyBitBlock = NumpyRegisterBlock = None
+
+
+DATASTORE_SIZE = 5000
+
+if NumpyRegisterBlock is not None:
+    slave_context = ModbusSlaveContext(
+        ir=NumpyRegisterBlock(0, DATASTORE_SIZE),
+        di=NumpyBitBlock(0, DATASTORE_SIZE),
+    )
+else:
+    input_registers = [0] * DATASTORE_SIZE
+    input_coils = [0] * DATASTORE_SIZE
+    slave_context = ModbusSlaveContext(
+        ir=ModbusSequentialDataBlock(0, input_registers),
+        di=ModbusSequentialDataBlock(0, input_coils),
+    )
 context = ModbusServerContext(slaves=slave_context, single=True)
 
 
 def sync_holding_to_input_with_mapping(
-    proxy_client, context, address_mapping, interval=5
+    proxy_client, context, address_mapping, interval=5, publisher=None
 ):
+    # 每段映射上一輪的值，用來比對並發佈變化事件
+    snapshots = {}
+
     while True:
         try:
             for holding_start, holding_length, input_start in address_mapping:
@@ -43,16 +68,40 @@ def sync_holding_to_input_with_mapping(
                     values = response.registers
 
                     if holding_start >= 1700:
-                        bits = []
-                        for reg in values:
-                            bits.extend([(reg >> i) & 1 for i in range(16)])
-
-                        required_bits = bits[: holding_length * 16]
-
-                        context[0x00].setValues(2, input_start, required_bits)
+                        slave = context[0x00]
+                        di_block = slave.store["d"]
+                        if hasattr(di_block, "setRegisterBits"):
+                            # ModbusSlaveContext 非 zero_mode 時位址 +1
+                            address = input_start + (0 if slave.zero_mode else 1)
+                            di_block.setRegisterBits(
+                                address, values, holding_length * 16
+                            )
+                            required_bits = (
+                                di_block.getValues(address, holding_length * 16)
+                                if publisher is not None
+                                else None
+                            )
+                        else:
+                            bits = []
+                            for reg in values:
+                                bits.extend([(reg >> i) & 1 for i in range(16)])
+
+                            required_bits = bits[: holding_length * 16]
+
+                            slave.setValues(2, input_start, required_bits)
+                        table, current = "di", required_bits
 
                     else:
                         context[0x00].setValues(4, input_start, values)
+                        table, current = "ir", values
+
+                    if publisher is not None:
+                        key = (table, input_start)
+                        publisher.publish(
+                            table,
+                            diff_values(snapshots.get(key), current, input_start),
+                        )
+                        snapshots[key] = list(current)
 
         except Exception as e:
             log.error(f"Error during sync: {e}")
@@ -98,13 +147,43 @@ class ModbusProxyRequestHandler(ModbusBaseRequestHandler):
 
 class ModbusProxyServer:
     def __init__(
-        self, server_host, server_port, target_host, target_port, address_mapping
+        self,
+        server_host,
+        server_port,
+        target_host,
+        target_port,
+        address_mapping,
+        change_socket_path=None,
+        server_mode="sync",
+        max_connections=256,
+        idle_timeout=60,
+        rtu_port=None,
+        rtu_gateway_port=5021,
+        rack_gateway_port=None,
     ):
         self.server_host = server_host
         self.server_port = server_port
         self.target_host = target_host
         self.target_port = target_port
         self.address_mapping = address_mapping
+        # "sync": pymodbus ModbusTcpServer (每條連線一個 thread)
+        # "async": asyncio server，適合大量並行連線
+        self.server_mode = server_mode
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        # 指定 rtu_port 時由 proxy 獨佔 RS-485，並以 Modbus TCP 對外提供
+        self.rtu_port = rtu_port
+        self.rtu_gateway_port = rtu_gateway_port
+        self.rtu_bus = None
+        self.rtu_server = None
+        # 指定 rack_gateway_port 時由 proxy 獨佔所有 rack 控制器的連線
+        self.rack_gateway_port = rack_gateway_port
+        self.rack_gateway = None
+        self.rack_server = None
+
+        self.publisher = (
+            ChangePublisher(change_socket_path) if change_socket_path else None
+        )
 
         self.context = context
 
@@ -124,29 +203,81 @@ class ModbusProxyServer:
         self.identity.MajorMinorRevision = "1.0"
 
     def start(self):
+        if self.publisher is not None:
+            self.publisher.start()
+
         self.sync_thread = Thread(
             target=sync_holding_to_input_with_mapping,
             args=(self.client, self.context, self.address_mapping),
+            kwargs={"publisher": self.publisher},
             daemon=True,
         )
         self.sync_thread.start()
 
-        self.server = ModbusTcpServer(
-            context=self.context,
-            identity=self.identity,
-            address=(self.server_host, self.server_port),
-            framer=ModbusSocketFramer,
-        )
+        if self.server_mode == "async":
+            self.server = AsyncModbusServer(
+                context=self.context,
+                identity=self.identity,
+                address=(self.server_host, self.server_port),
+                max_connections=self.max_connections,
+                idle_timeout=self.idle_timeout,
+            )
+        else:
+            self.server = ModbusTcpServer(
+                context=self.context,
+                identity=self.identity,
+                address=(self.server_host, self.server_port),
+                framer=ModbusSocketFramer,
+            )
         self.server_thread = Thread(target=self.server.serve_forever, daemon=True)
         self.server_thread.start()
         log.info(
-            f"Modbus Proxy Server started on {self.server_host}:{self.server_port}"
+            f"Modbus Proxy Server ({self.server_mode}) started on {self.server_host}:{self.server_port}"
         )
 
+        if self.rtu_port:
+            self.rtu_bus = RtuBus(port=self.rtu_port)
+            self.rtu_bus.start()
+            self.rtu_server = RtuGatewayServer(
+                self.rtu_bus,
+                address=(self.server_host, self.rtu_gateway_port),
+                max_connections=self.max_connections,
+                idle_timeout=self.idle_timeout,
+            )
+            self.rtu_thread = Thread(target=self.rtu_server.serve_forever, daemon=True)
+            self.rtu_thread.start()
+            log.info(
+                f"RTU gateway for {self.rtu_port} started on {self.server_host}:{self.rtu_gateway_port}"
+            )
+
+        if self.rack_gateway_port:
+            self.rack_gateway = RackGateway()
+            self.rack_gateway.start()
+            self.rack_server = AsyncModbusServer(
+                context=self.rack_gateway.context,
+                identity=self.identity,
+                address=(self.server_host, self.rack_gateway_port),
+                max_connections=self.max_connections,
+                idle_timeout=self.idle_timeout,
+            )
+            self.rack_thread = Thread(target=self.rack_server.serve_forever, daemon=True)
+            self.rack_thread.start()
+            log.info(
+                f"Rack gateway started on {self.server_host}:{self.rack_gateway_port}"
+            )
+
     def stop(self):
         try:
             self.server.server_close()
             self.client.close()
+            if self.publisher is not None:
+                self.publisher.stop()
+            if self.rtu_server is not None:
+                self.rtu_server.server_close()
+                self.rtu_bus.stop()
+            if self.rack_server is not None:
+                self.rack_server.server_close()
+                self.rack_gateway.stop()
             log.info("Modbus Proxy Server stopped")
         except Exception as e:
             log.error("Error stopping the server: %s", e)
@@ -170,6 +301,13 @@ if __name__ == "__main__":
         target_host="192.168.3.250",
         target_port=502,
         address_mapping=address_mapping,
+        change_socket_path=DEFAULT_SOCKET_PATH,
+        server_mode=os.environ.get("PROXY_SERVER_MODE", "sync"),
+        max_connections=int(os.environ.get("PROXY_MAX_CONNECTIONS", 256)),
+        idle_timeout=float(os.environ.get("PROXY_IDLE_TIMEOUT", 60)),
+        rtu_port=os.environ.get("RTU_GATEWAY_SERIAL"),
+        rtu_gateway_port=int(os.environ.get("RTU_GATEWAY_PORT", 5021)),
+        rack_gateway_port=int(os.environ.get("RACK_GATEWAY_PORT", 0)) or None,
     )
     server.start()
     print("Modbus Proxy Server is running. Press Ctrl+C to stop.")
@@ -0,0 +1,270 @@
+# 標準函式庫
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from threading import Thread
+
+# 第三方套件
+import logging
+from pymodbus.client.sync import ModbusTcpClient
+from pymodbus.datastore import (
+    ModbusSequentialDataBlock,
+    ModbusServerContext,
+    ModbusSlaveContext,
+)
+
+
+log = logging.getLogger()
+
+
+RACK_COUNT = 10
+# rackN 的狀態暫存器在 192.168.3.(19+N)；漏液 / 斷線 coil 與開度暫存器在 192.168.3.(9+N)
+RACK_HOST = "192.168.3.{}"
+REGISTER_HOST_BASE = 19
+CONTROL_HOST_BASE = 9
+
+# 對外提供的位址表 (zero based，所有 unit 共用)：
+#   holding  0-9   rack1-10 開度命令，寫入後排入佇列由 gateway 寫給 rack；
+#                  寫 RELEASE 表示不再控制該 rack
+#   input    0-9   rack1-10 狀態暫存器原始值
+#   input   10-19  rack1-10 最後一次成功寫出的開度
+#   discrete 0-9   rack1-10 漏液
+#   discrete 10-19 rack1-10 斷線
+#   discrete 20-29 rack1-10 狀態暫存器 host 連線正常
+#   discrete 30-39 rack1-10 coil / 開度 host 連線正常
+#   discrete 40-49 rack1-10 開度寫出成功 (pass)
+RELEASE = 0xFFFF
+STATUS_OFFSET = 0
+OPENING_OFFSET = 10
+LEAK_OFFSET = 0
+BROKEN_OFFSET = 10
+REGISTER_ONLINE_OFFSET = 20
+CONTROL_ONLINE_OFFSET = 30
+PASS_OFFSET = 40
+
+# 連續失敗第二次起開始退避，1、2、4 ... 最多 30 秒才重試一次
+BACKOFF_BASE = 1
+BACKOFF_MAX = 30
+
+
+class RackLink:
+    """對一台 rack 裝置的常駐連線，失敗時關閉並依次數退避"""
+
+    def __init__(self, name, host, port, timeout):
+        self.name = name
+        self.client = ModbusTcpClient(host=host, port=port, timeout=timeout)
+        self.failures = 0
+        self.next_attempt = 0
+        self.future = None
+
+    def due(self, now):
+        return now >= self.next_attempt and (self.future is None or self.future.done())
+
+    def call(self, method, *args):
+        try:
+            response = getattr(self.client, method)(*args)
+            if response.isError():
+                raise ValueError(response)
+        except Exception as e:
+            self.client.close()
+            self.failures += 1
+            if self.failures > 1:
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (self.failures - 2))
+                self.next_attempt = time.monotonic() + delay
+            if self.failures == 1:
+                log.warning(f"{self.name} error: {e}")
+            raise
+        self.failures = 0
+        self.next_attempt = 0
+        return response
+
+    def close(self):
+        self.client.close()
+
+
+class RackCommandBlock(ModbusSequentialDataBlock):
+    """holding 區塊；寫入的開度同時排入 gateway 的命令佇列"""
+
+    def __init__(self, gateway):
+        super().__init__(0, [0] * RACK_COUNT)
+        self.gateway = gateway
+
+    def setValues(self, address, values):
+        if not isinstance(values, list):
+            values = [values]
+        super().setValues(address, values)
+        for offset, value in enumerate(values):
+            self.gateway.submit(address + offset, value)
+
+
+class RackGateway:
+    """
+    獨佔所有 rack 控制器連線的 gateway。
+
+    每 interval 秒同時輪詢全部 rack 的狀態暫存器與漏液 coil，並把結果寫進
+    context 供 AsyncModbusServer 對外提供；plc.py 與 webUI 都只向 gateway 讀寫，
+    不再各自連 rack。開度命令經 submit() 排入單一佇列，每輪取出後只在值改變、
+    重新連線或距上次寫出超過 write_refresh 秒時才寫給 rack。
+    每輪最多等 sweep_timeout 秒，尚未回應的裝置視為離線，下一輪不重送。
+    """
+
+    def __init__(
+        self,
+        port=502,
+        count=RACK_COUNT,
+        timeout=0.5,
+        interval=1.0,
+        sweep_timeout=1.5,
+        write_refresh=10,
+    ):
+        self.count = count
+        self.interval = interval
+        self.sweep_timeout = sweep_timeout
+        self.write_refresh = write_refresh
+
+        self.status_links = []
+        self.control_links = []
+        for index in range(1, count + 1):
+            self.status_links.append(
+                RackLink(
+                    f"rack{index} reg",
+                    RACK_HOST.format(REGISTER_HOST_BASE + index),
+                    port,
+                    timeout,
+                )
+            )
+            self.control_links.append(
+                RackLink(
+                    f"rack{index} coil",
+                    RACK_HOST.format(CONTROL_HOST_BASE + index),
+                    port,
+                    timeout,
+                )
+            )
+
+        self.commands = queue.Queue()
+        self.desired = [None] * count
+        self.written = [None] * count
+        self.written_at = [0.0] * count
+
+        self.context = ModbusServerContext(
+            slaves=ModbusSlaveContext(
+                zero_mode=True,
+                hr=RackCommandBlock(self),
+                ir=ModbusSequentialDataBlock(0, [0] * (2 * count)),
+                di=ModbusSequentialDataBlock(0, [False] * (5 * count)),
+                co=ModbusSequentialDataBlock(0, [False]),
+            ),
+            single=True,
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=2 * count, thread_name_prefix="rack_gateway"
+        )
+        self.running = False
+        self.worker = None
+
+    def start(self):
+        self.running = True
+        self.worker = Thread(target=self._run, daemon=True)
+        self.worker.start()
+        log.info(f"Rack gateway started for {self.count} racks")
+
+    def stop(self):
+        self.running = False
+        self.commands.put(None)
+        self.executor.shutdown(wait=False)
+        for link in self.status_links + self.control_links:
+            link.close()
+
+    def submit(self, index, value):
+        """排入 rack (0 based) 的開度命令"""
+        if 0 <= index < self.count:
+            self.commands.put((index, value))
+
+    def _drain_commands(self, timeout):
+        deadline = time.monotonic() + timeout
+        while self.running:
+            try:
+                command = self.commands.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                return
+            if command is None:
+                return
+            index, value = command
+            self.desired[index] = None if value == RELEASE else value
+
+    def _set(self, fx, address, values):
+        self.context[0].setValues(fx, address, values)
+
+    def _poll_status(self, index):
+        link = self.status_links[index]
+        try:
+            response = link.call("read_holding_registers", 0, 1)
+        except Exception:
+            self._mark_offline(link, index)
+            return
+        self._set(4, STATUS_OFFSET + index, [response.registers[0]])
+        self._set(2, REGISTER_ONLINE_OFFSET + index, [True])
+
+    def _poll_control(self, index):
+        link = self.control_links[index]
+        desired = self.desired[index]
+        try:
+            if desired is not None and (
+                desired != self.written[index]
+                or time.monotonic() - self.written_at[index] >= self.write_refresh
+            ):
+                link.call("write_register", 0, desired)
+                self.written[index] = desired
+                self.written_at[index] = time.monotonic()
+                self._set(4, OPENING_OFFSET + index, [desired])
+                self._set(2, PASS_OFFSET + index, [True])
+
+            response = link.call("read_coils", 0, 2)
+        except Exception:
+            self._mark_offline(link, index)
+            return
+        self._set(2, LEAK_OFFSET + index, [response.bits[0]])
+        self._set(2, BROKEN_OFFSET + index, [response.bits[1]])
+        self._set(2, CONTROL_ONLINE_OFFSET + index, [True])
+
+    def _submit_link(self, link, task, index, now):
+        if not link.due(now):
+            # 退避中或上一輪還沒回應的裝置維持離線
+            self._mark_offline(link, index)
+            return None
+        link.future = self.executor.submit(task, index)
+        return link.future
+
+    def _mark_offline(self, link, index):
+        if link is self.status_links[index]:
+            self._set(2, REGISTER_ONLINE_OFFSET + index, [False])
+            return
+        # 重新連線後一定重寫一次開度
+        self.written[index] = None
+        self._set(2, CONTROL_ONLINE_OFFSET + index, [False])
+        if self.desired[index] is not None:
+            self._set(2, PASS_OFFSET + index, [False])
+
+    def sweep(self):
+        now = time.monotonic()
+        futures = []
+        for index in range(self.count):
+            for link, task in (
+                (self.status_links[index], self._poll_status),
+                (self.control_links[index], self._poll_control),
+            ):
+                future = self._submit_link(link, task, index, now)
+                if future is not None:
+                    futures.append(future)
+        if futures:
+            wait(futures, timeout=self.sweep_timeout)
+
+    def _run(self):
+        while self.running:
+            start = time.monotonic()
+            try:
+                self.sweep()
+            except Exception as e:
+                log.error(f"Rack gateway sweep failed: {e}")
+            self._drain_commands(self.interval - (time.monotonic() - start))
@@ -0,0 +1,254 @@
+# 標準函式庫
+import asyncio
+import struct
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from threading import Condition, Thread
+
+# 第三方套件
+import logging
+import serial
+
+from async_server import AsyncModbusServer, MBAP_HEADER
+
+
+log = logging.getLogger()
+
+
+# Modbus exception code 0x0B: Gateway Target Device Failed to Respond
+GATEWAY_TARGET_NO_RESPONSE = 0x0B
+# 會被快取的讀取功能碼 (coils / discrete inputs / holding / input registers)
+READ_FUNCTIONS = (0x01, 0x02, 0x03, 0x04)
+# 寫入後回應固定 4 bytes (address + value/quantity) 的功能碼
+FIXED_WRITE_FUNCTIONS = (0x05, 0x06, 0x0F, 0x10)
+
+
+def crc16(frame):
+    crc = 0xFFFF
+    for byte in frame:
+        crc ^= byte
+        for _ in range(8):
+            if crc & 1:
+                crc = (crc >> 1) ^ 0xA001
+            else:
+                crc >>= 1
+    return struct.pack("<H", crc)
+
+
+def inter_frame_delay(baudrate, bits_per_char=11):
+    """
+    RTU 規範的 t3.5 靜默時間。
+    19200 bps 以上固定為 1.75 ms，以下為 3.5 個字元時間。
+    """
+    if baudrate > 19200:
+        return 0.00175
+    return 3.5 * bits_per_char / baudrate
+
+
+def exception_pdu(function_code, exception_code=GATEWAY_TARGET_NO_RESPONSE):
+    return bytes([function_code | 0x80, exception_code])
+
+
+class RtuBus:
+    """
+    獨佔一條 RS-485 線路的 bus worker。
+
+    每個請求端 (client key) 有自己的佇列，worker 以 round-robin 輪流取出，
+    避免單一連線的大量請求把其他人餓死。讀取結果依 (unit, PDU) 快取 cache_ttl 秒，
+    對同一 unit 的寫入會清除該 unit 的快取。
+    """
+
+    def __init__(
+        self,
+        port="/dev/ttyS0",
+        baudrate=19200,
+        parity="E",
+        stopbits=1,
+        bytesize=8,
+        timeout=0.5,
+        cache_ttl=1.0,
+    ):
+        # serial_for_url 也接受一般裝置路徑，另可用 socket:// 等 URL 做測試
+        self.serial = serial.serial_for_url(
+            port,
+            baudrate=baudrate,
+            parity=parity,
+            stopbits=stopbits,
+            bytesize=bytesize,
+            timeout=timeout,
+        )
+        bits_per_char = 1 + bytesize + (0 if parity == "N" else 1) + stopbits
+        self.frame_gap = inter_frame_delay(baudrate, bits_per_char)
+        self.cache_ttl = cache_ttl
+
+        self.queues = OrderedDict()
+        self.condition = Condition()
+        self.cache = {}
+        self.last_frame_end = 0.0
+        self.running = False
+        self.worker = None
+
+    def start(self):
+        self.running = True
+        self.worker = Thread(target=self._run, daemon=True)
+        self.worker.start()
+        log.info(
+            f"RTU bus started on {self.serial.port} "
+            f"(t3.5 = {self.frame_gap * 1000:.2f} ms)"
+        )
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        self.serial.close()
+
+    def submit(self, client_key, unit_id, pdu):
+        """排入一個請求，回傳 Future，結果為回應 PDU (不含 unit 與 CRC)"""
+        future = Future()
+
+        if pdu[0] in READ_FUNCTIONS and self.cache_ttl > 0:
+            cached = self.cache.get((unit_id, pdu))
+            if cached is not None and time.monotonic() - cached[0] < self.cache_ttl:
+                future.set_result(cached[1])
+                return future
+
+        with self.condition:
+            self.queues.setdefault(client_key, deque()).append((unit_id, pdu, future))
+            self.condition.notify()
+        return future
+
+    def forget(self, client_key):
+        """請求端斷線時丟棄尚未送出的請求"""
+        with self.condition:
+            pending = self.queues.pop(client_key, ())
+        for _, _, future in pending:
+            future.cancel()
+
+    def _next_request(self):
+        with self.condition:
+            while self.running and not self.queues:
+                self.condition.wait()
+            if not self.running:
+                return None
+            # 取出最前面的 client，服務一筆後移到隊尾
+            client_key, queue = next(iter(self.queues.items()))
+            request = queue.popleft()
+            if queue:
+                self.queues.move_to_end(client_key)
+            else:
+                del self.queues[client_key]
+            return request
+
+    def _run(self):
+        while True:
+            request = self._next_request()
+            if request is None:
+                return
+            unit_id, pdu, future = request
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                response = self._transact(unit_id, pdu)
+            except Exception as e:
+                log.error(f"RTU transaction to unit {unit_id} failed: {e}")
+                response = exception_pdu(pdu[0])
+            future.set_result(response)
+
+    def _transact(self, unit_id, pdu):
+        frame = bytes([unit_id]) + pdu
+        frame += crc16(frame)
+
+        # 確保與上一個 frame 之間至少有 t3.5 的靜默時間
+        wait = self.last_frame_end + self.frame_gap - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+        self.serial.reset_input_buffer()
+        self.serial.write(frame)
+        self.serial.flush()
+
+        # broadcast 不會有回應
+        if unit_id == 0:
+            self.last_frame_end = time.monotonic()
+            return None
+
+        response = self._read_response(unit_id)
+        self.last_frame_end = time.monotonic()
+
+        if response is None:
+            return exception_pdu(pdu[0])
+
+        response_pdu = response[1:-2]
+        if pdu[0] in READ_FUNCTIONS and not response_pdu[0] & 0x80:
+            self.cache[(unit_id, pdu)] = (time.monotonic(), response_pdu)
+        elif pdu[0] not in READ_FUNCTIONS:
+            self.cache = {k: v for k, v in self.cache.items() if k[0] != unit_id}
+        return response_pdu
+
+    def _read_response(self, unit_id):
+        header = self.serial.read(2)
+        if len(header) < 2 or header[0] != unit_id:
+            return None
+
+        function_code = header[1]
+        if function_code & 0x80:
+            remaining = 1 + 2
+        elif function_code in READ_FUNCTIONS:
+            count = self.serial.read(1)
+            if not count:
+                return None
+            header += count
+            remaining = count[0] + 2
+        elif function_code in FIXED_WRITE_FUNCTIONS:
+            remaining = 4 + 2
+        else:
+            # 其他功能碼長度不固定，讀到線路靜默為止
+            remaining = None
+
+        if remaining is None:
+            body = b""
+            while True:
+                chunk = self.serial.read(self.serial.in_waiting or 1)
+                if not chunk:
+                    break
+                body += chunk
+                time.sleep(self.frame_gap)
+                if not self.serial.in_waiting:
+                    break
+        else:
+            body = self.serial.read(remaining)
+            if len(body) < remaining:
+                return None
+
+        frame = header + body
+        if crc16(frame[:-2]) != frame[-2:]:
+            log.warning(f"CRC mismatch from unit {unit_id}: {frame.hex()}")
+            return None
+        return frame
+
+
+class RtuGatewayServer(AsyncModbusServer):
+    """
+    Modbus TCP -> RTU gateway。
+
+    TCP 請求原封不動轉成 RTU frame 交給 RtuBus 排隊，
+    每條 TCP 連線是一個獨立的公平排程單位。
+    """
+
+    def __init__(self, bus, address=("0.0.0.0", 5021), **kwargs):
+        super().__init__(context=None, address=address, **kwargs)
+        self.bus = bus
+
+    async def process(self, transaction_id, unit_id, pdu, peer):
+        response_pdu = await asyncio.wrap_future(self.bus.submit(peer, unit_id, pdu))
+        if response_pdu is None:
+            return None
+        return (
+            MBAP_HEADER.pack(transaction_id, 0, len(response_pdu) + 1, unit_id)
+            + response_pdu
+        )
+
+    def connection_closed(self, peer):
+        self.bus.forget(peer)
@@ -7,6 +7,7 @@ from datetime import datetime
 from functools import lru_cache
 from mylib.models.sensor_log_model import SensorLogModel
 from mylib.models.sensor_log_model_factory import SensorLogModelFactory
+from mylib.utils.SensorColumnarUtil import SensorColumnarUtil
 
 
 class SensorCsvAdapter:
@@ -19,6 +20,12 @@ class SensorCsvAdapter:
         "TELEMETRY_SENSOR_LOG_ROOT", "home/user/service/webUI/logs/sensor"
     )
 
+    # webUI 同時寫的欄式壓縮檔 (sensor.log.YYYY-MM-DD.col)
+    COLUMNAR_ROOT = os.getenv(
+        "TELEMETRY_SENSOR_COLUMNAR_ROOT",
+        os.path.join(os.path.dirname(SENSOR_ROOT.rstrip("/")), "sensor_columnar"),
+    )
+
     # 新增配置：要讀取的最近天數，可以設為環境變數
     DAYS_TO_LOAD = int(os.getenv("TELEMETRY_DAYS_TO_LOAD", "7"))  # 默認為7天
 
@@ -30,12 +37,102 @@ class SensorCsvAdapter:
             return None
         return cls.SENSOR_ROOT
 
+    @classmethod
+    def _csv_time_range(cls, csv_path: str) -> tuple:
+        """CSV 第一筆與最後一筆資料的時間，只讀檔頭與檔尾"""
+        with open(csv_path, mode="rb") as f:
+            f.readline()
+            first = f.readline()
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 4096))
+            lines = [line for line in f.read().splitlines() if line.strip()]
+        return (
+            datetime.fromisoformat(first.decode("utf-8").split(",")[0]),
+            datetime.fromisoformat(lines[-1].decode("utf-8").split(",")[0]),
+        )
+
+    @classmethod
+    def _columnar_path(cls, csv_path: str) -> str | None:
+        """
+        回傳可取代 csv_path 的欄式檔路徑。
+        欄式檔須涵蓋 CSV 的第一筆到最後一筆：功能上線當天的檔案缺前段，
+        當日檔案與 webUI 異常結束時的檔案缺少還在記憶體、未寫出的最後一段，
+        這些情況都改讀 CSV。
+        """
+        col_path = os.path.join(
+            cls.COLUMNAR_ROOT, os.path.basename(csv_path)[: -len(".csv")] + ".col"
+        )
+        if not os.path.isfile(col_path):
+            return None
+        try:
+            first_csv_time, last_csv_time = cls._csv_time_range(csv_path)
+            col_range = SensorColumnarUtil.time_range(col_path)
+        except (ValueError, OSError, IndexError):
+            return None
+        if col_range is None:
+            return None
+        first_col_time, last_col_time = col_range
+        if first_col_time > first_csv_time or last_col_time < last_csv_time:
+            return None
+        return col_path
+
+    @classmethod
+    def _model_columns(cls, model_name: str) -> set:
+        """model 會用到的 CSV 欄位 (alias)，欄式檔其餘欄位不必解壓"""
+        model_class = SensorLogModelFactory.get_model(model_name)
+        return {
+            field_info.alias or field_name
+            for field_name, field_info in model_class.model_fields.items()
+            if field_name != "time"
+        }
+
+    @classmethod
+    def _file_date(cls, path: str):
+        """sensor.log.YYYY-MM-DD.csv 的日期，檔名不符時回傳 None"""
+        try:
+            return datetime.strptime(
+                os.path.basename(path)[len("sensor.log.") : -len(".csv")], "%Y-%m-%d"
+            ).date()
+        except ValueError:
+            return None
+
+    @classmethod
+    def _read_rows(cls, path: str, columns: set = None, start: datetime = None, end: datetime = None):
+        """
+        逐列回傳 {"time": datetime, 欄位: 值}
+        @param columns 只讀這些欄位 (欄式檔才有效)，None 表示全部
+        @param start/end 時間範圍 (皆含)，None 表示不限
+        """
+        col_path = cls._columnar_path(path)
+        if col_path:
+            yield from SensorColumnarUtil.iter_records(
+                col_path, columns=columns, start=start, end=end
+            )
+            return
+        with open(path, mode="r", encoding="utf-8") as f:
+            reader = csv.DictReader(f)  # 使用 DictReader 自動處理 header
+            for row in reader:
+                # 核心步驟：將 'time' 字串轉換為 datetime 物件
+                try:
+                    row["time"] = datetime.fromisoformat(row["time"])
+                except (ValueError, KeyError):
+                    # 如果時間格式錯誤或沒有 'time' 欄位，則跳過此行
+                    continue
+                if (start and row["time"] < start) or (end and row["time"] > end):
+                    continue
+                yield row
+
     @classmethod
     @lru_cache(maxsize=1)  # 使用LRU快取，避免重複讀取和處理檔案
-    def get_all_sensor_data_as_list_of_dicts(cls) -> list[dict]:
+    def get_all_sensor_data_as_list_of_dicts(
+        cls, start: datetime = None, end: datetime = None
+    ) -> list[dict]:
         """
         掃描日誌目錄，讀取最近 N 天的 CSV 檔案，並將它們合併成一個按時間排序的字典列表。
 
+        Args:
+            start/end: 查詢的時間範圍 (皆含)，None 表示不限；範圍外的檔案與欄式 block 不讀取
+
         Returns:
             A list of dictionaries containing all sensor data, or an empty list if no data found.
         """
@@ -47,6 +144,16 @@ class SensorCsvAdapter:
             glob.glob(os.path.join(root_path, "sensor.log.*.csv")), reverse=True
         )
         files_to_process = all_files[: cls.DAYS_TO_LOAD]
+        # 每個檔案只含當天資料，整天都在範圍外的檔案不必開啟
+        files_to_process = [
+            path
+            for path in files_to_process
+            if (file_date := cls._file_date(path)) is None
+            or (
+                (start is None or file_date >= start.date())
+                and (end is None or file_date <= end.date())
+            )
+        ]
 
         if not files_to_process:
             print(f"Warning: No sensor CSV files found to process.")
@@ -56,22 +163,16 @@ class SensorCsvAdapter:
             f"Total files found: {len(all_files)}. Processing the latest {len(files_to_process)} files (up to {cls.DAYS_TO_LOAD} days)."
         )
 
+        columns = cls._model_columns("SensorLogModel")
         all_records = []
         for path in reversed(files_to_process):
             try:
-                with open(path, mode="r", encoding="utf-8") as f:
-                    reader = csv.DictReader(f)  # 使用 DictReader 自動處理 header
-                    for row in reader:
-                        # 核心步驟：將 'time' 字串轉換為 datetime 物件
-                        try:
-                            row["time"] = datetime.fromisoformat(row["time"])
-                        except (ValueError, KeyError):
-                            # 如果時間格式錯誤或沒有 'time' 欄位，則跳過此行
-                            continue
-                        # select fields: fan1-6 for customer SMC
-                        # sensor_log = SensorLogModel.model_validate(row) # parse_obj() is deprecated
-                        sensor_log = SensorLogModelFactory.create_model("SensorLogModel", row)
-                        all_records.append(sensor_log.to_dict())
+                # 已換日的檔案優先讀欄式檔，省去文字解析
+                for row in cls._read_rows(path, columns=columns, start=start, end=end):
+                    # select fields: fan1-6 for customer SMC
+                    # sensor_log = SensorLogModel.model_validate(row) # parse_obj() is deprecated
+                    sensor_log = SensorLogModelFactory.create_model("SensorLogModel", row)
+                    all_records.append(sensor_log.to_dict())
             except Exception as e:
                 print(f"Error reading or processing file {path}: {e}")
                 continue
@@ -12,6 +12,8 @@ from pydantic import BaseModel, Field
 """
 讀取 /home/user/service/webUI/json/ 裡的json檔
 error log (latest 500 entries): signal_records.json
+  webUI 只在 signal_records.journal 追加異動，定期才整理回 json 檔，
+  讀取時需把 journal 套用到 json 檔內容上 (與 webUI AlarmStore 相同規則)
 """
 class WebAppSignalRecordModel(BaseModel):
     signal_name: str        = Field(default="")
@@ -37,14 +39,72 @@ class WebAppJsonReader:
             # raise ProjError(HTTPStatus.NOT_FOUND.value, f"{json_filepath} is not exist!")
             raise ProjRedfishError(ProjRedfishErrorCode.RESOURCE_NOT_FOUND, f"{json_filepath} is not exist!")
 
+    @classmethod
+    def _index_records(cls, records: list, key: str) -> tuple:
+        """Return ({key: [open records]}, {(key, on_time)}) for records"""
+        open_records = {}
+        seen = set()
+        for record in records:
+            seen.add((record[key], record["on_time"]))
+            if record["off_time"] is None:
+                open_records.setdefault(record[key], []).append(record)
+        return open_records, seen
+
+    @classmethod
+    def _replay_journal(cls, records: list, journal_path: str, key: str = "signal_value") -> list:
+        """Apply webUI journal entries (oldest first) onto records (newest first)"""
+        if not FileUtil.exists(journal_path):
+            return records
+        records = list(reversed(records))
+        # 未結束的紀錄與已出現過的 (key, on_time) 隨每行更新，不必每行重掃 records
+        open_records, seen = cls._index_records(records, key)
+        for line in FileUtil.readlines(journal_path):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue # 寫到一半的最後一行
+            op = entry.get("op")
+            if op == "on":
+                record = entry["record"]
+                ident = (record[key], record["on_time"])
+                if record[key] not in open_records and ident not in seen:
+                    records.append(record)
+                    seen.add(ident)
+                    if record["off_time"] is None:
+                        open_records[record[key]] = [record]
+            elif op == "off":
+                for record in open_records.pop(entry["key"], []):
+                    record["off_time"] = entry["off_time"]
+            elif op == "close_all":
+                for group in open_records.values():
+                    for record in group:
+                        record["off_time"] = entry["off_time"]
+                open_records = {}
+            elif op == "delete":
+                # 刪除很少見，直接重建索引
+                records = [
+                    r for r in records
+                    if not (r["signal_name"] == entry["signal_name"] and r["on_time"] == entry["on_time"])
+                ]
+                open_records, seen = cls._index_records(records, key)
+            elif op == "clear":
+                records = []
+                open_records, seen = {}, set()
+        # 與 AlarmStore 相同的排序：on_time 相同時依名稱
+        records.sort(key=lambda x: (x["on_time"], x["signal_name"], x["signal_value"] or ""))
+        return records[::-1]
+
     @classmethod
     @cached(cache=TTLCache(maxsize=1, ttl=10))
     def read_all_errorlog_entries(cls) -> List[WebAppSignalRecordModel]:
-        """Read all error logs from signal_records.json
+        """Read all error logs from signal_records.json (+ signal_records.journal)
         @note: signal_records.json records max 500s records
         """
         error_log_path = cls._error_log_path()
         log_json_ary = json.loads(FileUtil.read(error_log_path))
+        journal_path = os.path.splitext(error_log_path)[0] + ".journal"
+        # webUI 保留的紀錄可能遠多於 500 筆，這裡只取最新 500 筆
+        log_json_ary = cls._replay_journal(log_json_ary, journal_path)[:500]
         ret = []
         for info in log_json_ary:
             tmp_record = WebAppSignalRecordModel(**info)
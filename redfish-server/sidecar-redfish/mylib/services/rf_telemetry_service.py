@@ -69,7 +69,18 @@ class RfTelemetryService(BaseService):
         # --- 快取已過期，執行更新邏輯 ---
         print(f"[{datetime.now()}] Cache expired. Updating telemetry data...")
 
-        all_records = SensorCsvAdapter.get_all_sensor_data_as_list_of_dicts()
+        # 快取最多保留 MAX_REPORTS 個報告區間，更早的資料不必讀取；
+        # 起點對齊報告區間，同一區間內的更新沿用 adapter 的快取
+        now = datetime.now()
+        bucket_minute = (
+            now.minute // cls.REPORTING_INTERVAL_MINUTES
+        ) * cls.REPORTING_INTERVAL_MINUTES
+        window_start = now.replace(
+            minute=bucket_minute, second=0, microsecond=0
+        ) - timedelta(minutes=cls.REPORTING_INTERVAL_MINUTES * (cls.MAX_REPORTS - 1))
+        all_records = SensorCsvAdapter.get_all_sensor_data_as_list_of_dicts(
+            start=window_start
+        )
 
         if not all_records:
             print("No sensor data found during update.")
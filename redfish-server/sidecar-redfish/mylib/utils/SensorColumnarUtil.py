@@ -0,0 +1,117 @@
+import calendar
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+
+"""
+讀取 webUI 寫的 sensor log 欄式壓縮檔 (logs/sensor_columnar/sensor.log.YYYY-MM-DD.col)
+格式定義見 webUI/web/sensor_columnar.py，這裡只實作讀取
+"""
+
+class SensorColumnarUtil:
+    MAGIC = b"SLCOL1\n"
+    META_LENGTH = struct.Struct("<I")
+    EPOCH = datetime(1970, 1, 1)
+
+    @classmethod
+    def _to_seconds(cls, value: datetime) -> int:
+        return calendar.timegm(value.timetuple())
+
+    @classmethod
+    def _unpack(cls, payload: bytes, typecode: str) -> array:
+        data = array(typecode)
+        data.frombytes(zlib.decompress(payload))
+        if sys.byteorder == "big":
+            data.byteswap()
+        return data
+
+    @classmethod
+    def scan_blocks(cls, file) -> list:
+        """
+        @return {list} [(meta, payload offset), ...], 忽略寫到一半的 block
+        """
+        file.seek(0)
+        if file.read(len(cls.MAGIC)) != cls.MAGIC:
+            return []
+        file.seek(0, os.SEEK_END)
+        size = file.tell()
+        file.seek(len(cls.MAGIC))
+
+        blocks = []
+        while True:
+            header = file.read(cls.META_LENGTH.size)
+            if len(header) < cls.META_LENGTH.size:
+                break
+            (meta_length,) = cls.META_LENGTH.unpack(header)
+            try:
+                meta = json.loads(file.read(meta_length))
+            except ValueError:
+                break
+            start = file.tell()
+            if start + meta["size"] > size:
+                break
+            blocks.append((meta, start))
+            file.seek(start + meta["size"])
+        return blocks
+
+    @classmethod
+    def time_range(cls, path: str) -> Optional[tuple]:
+        """
+        @return {tuple} 檔案內第一筆與最後一筆資料的時間 (first, last)；空檔回傳 None
+        """
+        with open(path, "rb") as file:
+            blocks = cls.scan_blocks(file)
+        if not blocks:
+            return None
+        return (
+            cls.EPOCH + timedelta(seconds=min(meta["t_min"] for meta, _ in blocks)),
+            cls.EPOCH + timedelta(seconds=max(meta["t_max"] for meta, _ in blocks)),
+        )
+
+    @classmethod
+    def iter_records(cls, path: str, columns: Optional[set] = None,
+                     start: Optional[datetime] = None, end: Optional[datetime] = None) -> Iterator[dict]:
+        """
+        逐列回傳 {"time": datetime, 欄位: 值}，格式與 csv.DictReader 讀 CSV 相近
+        @param columns 只解壓這些欄位，None 表示全部
+        @param start/end 時間範圍 (皆含)，範圍外的 block 不會被讀取
+        """
+        t_start = cls._to_seconds(start) if start else None
+        t_end = cls._to_seconds(end) if end else None
+
+        with open(path, "rb") as file:
+            for meta, offset in cls.scan_blocks(file):
+                if t_start is not None and meta["t_max"] < t_start:
+                    continue
+                if t_end is not None and meta["t_min"] > t_end:
+                    continue
+
+                file.seek(offset + meta["time"]["offset"])
+                times = cls._unpack(file.read(meta["time"]["length"]), "q")
+                values = {}
+                for column in meta["columns"]:
+                    if columns is not None and column["name"] not in columns:
+                        continue
+                    file.seek(offset + column["offset"])
+                    payload = file.read(column["length"])
+                    if column["type"] == "f4":
+                        # float32 還原成寫入時的 7 位有效數字
+                        values[column["name"]] = [float(f"{v:.7g}") for v in cls._unpack(payload, "f")]
+                    else:
+                        dictionary = column["dict"]
+                        values[column["name"]] = [dictionary[code] for code in cls._unpack(payload, "H")]
+
+                for index, seconds in enumerate(times):
+                    if t_start is not None and seconds < t_start:
+                        continue
+                    if t_end is not None and seconds > t_end:
+                        continue
+                    record = {"time": cls.EPOCH + timedelta(seconds=seconds)}
+                    for name, column_values in values.items():
+                        record[name] = column_values[index]
+                    yield record
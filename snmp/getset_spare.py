@@ -747,14 +747,31 @@ def trap(trap_bool_lists):
                 index += 1
 
 
+scc_data_path = f"{os.path.dirname(log_path)}/webUI/web/json/scc_data.json"
+scc_data_stamp = None
+
+
+def load_scc_data():
+    """
+    webUI 只在 trap enable 設定改變時以 atomic rename 取代 scc_data.json，
+    檔案 (inode, mtime) 沒變就沿用上次解析的內容。
+    """
+    global data_details, scc_data_stamp
+
+    stat = os.stat(scc_data_path)
+    stamp = (stat.st_ino, stat.st_mtime_ns)
+    if stamp == scc_data_stamp:
+        return
+    with open(scc_data_path, "r") as file:
+        data_details = json.load(file)
+    scc_data_stamp = stamp
+
+
 def Mbus_get():
-    global float_values, trap_bool_lists, ats_list, cnt, data_details
+    global float_values, trap_bool_lists, ats_list, cnt
 
     while True:
-        with open(
-            f"{os.path.dirname(log_path)}/webUI/web/json/scc_data.json", "r"
-        ) as file:
-            data_details = json.load(file)
+        load_scc_data()
 
         if cnt > 5:
             try:
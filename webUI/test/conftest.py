@@ -0,0 +1,13 @@
+'''
+webUI 模組的測試共用設定。
+模組在 Linux 上以 web.xxx 匯入，其他平台直接以 xxx 匯入，兩個路徑都加入 sys.path。
+'''
+import os
+import sys
+import logging
+
+webui_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(webui_root)
+sys.path.append(os.path.join(webui_root, "web"))
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
@@ -0,0 +1,125 @@
+import os
+import json
+import logging
+import pytest
+from alarm_store import AlarmStore
+
+
+def make_record(index, name="Temp_High", off_time="done"):
+    on_time = f"2024-01-01 00:{index // 60:02d}:{index % 60:02d}"
+    return {
+        "signal_name": name,
+        "on_time": on_time,
+        "off_time": on_time if off_time == "done" else off_time,
+        "signal_value": f"{name} alarm",
+    }
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "signal_records.json")
+
+
+def seed(path, records):
+    # JSON 檔與 webUI 相同為新到舊
+    with open(path, "w") as file:
+        json.dump(records[::-1], file)
+
+
+def test_query_pages_newest_first(store_path):
+    """[TestCase] page 分頁依 on_time 新到舊，總數不受 limit 影響"""
+    seed(store_path, [make_record(i) for i in range(25)])
+    store = AlarmStore(store_path)
+
+    first = store.query(page=1, limit=10)
+    third = store.query(page=3, limit=10)
+    logging.info(f"first page: {[r['on_time'] for r in first['records']]}")
+    assert first["total_records"] == 25
+    assert [r["on_time"] for r in first["records"]] == [
+        make_record(i)["on_time"] for i in range(24, 14, -1)
+    ]
+    assert [r["on_time"] for r in third["records"]] == [
+        make_record(i)["on_time"] for i in range(4, -1, -1)
+    ]
+    assert third["next_cursor"] is None
+
+
+def test_query_cursor_matches_pages(store_path):
+    """[TestCase] 以 next_cursor 接續取得的內容與依 page 分頁相同"""
+    records = [make_record(i, name) for i in range(12) for name in ("Prsr_Low", "Temp_High")]
+    seed(store_path, records)
+    store = AlarmStore(store_path)
+
+    by_cursor = []
+    cursor = None
+    while True:
+        result = store.query(cursor=cursor, limit=5)
+        by_cursor.extend(result["records"])
+        cursor = result["next_cursor"]
+        if cursor is None:
+            break
+
+    by_page = []
+    for page in range(1, 6):
+        by_page.extend(store.query(page=page, limit=5)["records"])
+    assert by_cursor == by_page
+    assert len(by_cursor) == 24
+
+
+def test_query_filters(store_path):
+    """[TestCase] signal_name / search / state / 時間範圍篩選"""
+    records = [make_record(i, "Temp_High" if i % 2 else "Prsr_Low") for i in range(10)]
+    records.append(make_record(10, "Temp_High", off_time=None))
+    seed(store_path, records)
+    store = AlarmStore(store_path)
+
+    assert store.query(signal_names=["Temp_High"])["total_records"] == 6
+    assert store.query(search="prsr")["total_records"] == 5
+    assert store.query(state="open")["total_records"] == 1
+    assert store.query(state="closed")["total_records"] == 10
+    ranged = store.query(since=make_record(2)["on_time"], until=make_record(5)["on_time"])
+    assert [r["on_time"] for r in ranged["records"]] == [
+        make_record(i)["on_time"] for i in (4, 3, 2)
+    ]
+    with pytest.raises(ValueError):
+        store.query(cursor="not-a-cursor")
+
+
+def test_signal_on_off_and_journal(store_path):
+    """[TestCase] on / off 只追加 journal，另一個 process 的 store 能讀到相同內容"""
+    store = AlarmStore(store_path, compact_every=100)
+    assert store.signal_on("Temp_High", "Temp_High alarm")
+    assert not store.signal_on("Temp_High", "Temp_High alarm")
+    assert store.signal_off("Temp_High", "Temp_High alarm")
+    assert not store.signal_off("Temp_High", "Temp_High alarm")
+
+    journal_path = os.path.splitext(store_path)[0] + ".journal"
+    with open(journal_path) as file:
+        assert [json.loads(line)["op"] for line in file] == ["on", "off"]
+    with open(store_path) as file:
+        assert json.load(file) == []
+
+    other = AlarmStore(store_path)
+    assert other.view() == store.view()
+    assert other.view()[0]["off_time"] is not None
+
+
+def test_compaction(store_path):
+    """[TestCase] 累積 compact_every 筆後寫回 JSON、清空 journal，並只保留 max_records 筆"""
+    seed(store_path, [make_record(i) for i in range(5)])
+    store = AlarmStore(store_path, max_records=4, compact_every=3)
+    journal_path = os.path.splitext(store_path)[0] + ".journal"
+
+    store.delete([{"signal_name": "Temp_High", "on_time": make_record(0)["on_time"]}])
+    store.signal_on("Prsr_Low", "Prsr_Low alarm")
+    assert os.path.getsize(journal_path) > 0
+    store.signal_off("Prsr_Low", "Prsr_Low alarm")
+
+    assert os.path.getsize(journal_path) == 0
+    with open(store_path) as file:
+        saved = json.load(file)
+    logging.info(f"compacted: {saved}")
+    assert len(saved) == 4
+    assert saved[0]["signal_name"] == "Prsr_Low"
+    assert saved == store.view()
+    assert AlarmStore(store_path).view() == saved
@@ -0,0 +1,183 @@
+import logging
+import pytest
+import bulk_write
+from bulk_write import BulkWriter, ModbusWriter, WritePlan
+
+
+class FakeResponse:
+    def __init__(self, error=False, registers=None, bits=None):
+        self.error = error
+        self.registers = registers
+        self.bits = bits
+
+    def isError(self):
+        return self.error
+
+
+class FakePlc:
+    """記錄每次寫入請求；fail_once 內的位址第一次寫入時回傳錯誤"""
+
+    def __init__(self, fail_once=()):
+        self.memory = {"register": {}, "coil": {}}
+        self.fail_once = set(fail_once)
+        self.writes = []
+        self.methods = []
+        self.connections = 0
+
+    def client(self, **kwargs):
+        return FakeClient(self, **kwargs)
+
+
+class FakeClient:
+    def __init__(self, plc, host=None, port=None, timeout=None):
+        self.plc = plc
+        self.host = host
+        self.port = port
+
+    def connect(self):
+        self.plc.connections += 1
+        return True
+
+    def close(self):
+        pass
+
+    def _write(self, kind, address, values):
+        self.plc.writes.append((kind, address, list(values)))
+        if (kind, address) in self.plc.fail_once:
+            self.plc.fail_once.discard((kind, address))
+            return FakeResponse(error=True)
+        for offset, value in enumerate(values):
+            self.plc.memory[kind][address + offset] = value
+        return FakeResponse()
+
+    def write_registers(self, address, values, unit=None):
+        self.plc.methods.append("write_registers")
+        return self._write("register", address, values)
+
+    def write_coils(self, address, values, unit=None):
+        self.plc.methods.append("write_coils")
+        return self._write("coil", address, values)
+
+    def write_register(self, address, value, unit=None):
+        self.plc.methods.append("write_register")
+        return self._write("register", address, [value])
+
+    def write_coil(self, address, value, unit=None):
+        self.plc.methods.append("write_coil")
+        return self._write("coil", address, [value])
+
+    def read_holding_registers(self, address, count, unit=None):
+        memory = self.plc.memory["register"]
+        return FakeResponse(registers=[memory.get(address + i, 0) for i in range(count)])
+
+    def read_coils(self, address, count, unit=None):
+        memory = self.plc.memory["coil"]
+        # pymodbus 的 bits 以 8 個為單位補齊
+        padded = count + (-count % 8)
+        return FakeResponse(bits=[memory.get(address + i, False) for i in range(padded)])
+
+
+@pytest.fixture
+def plc(monkeypatch):
+    plc = FakePlc()
+    monkeypatch.setattr(bulk_write, "ModbusTcpClient", plc.client)
+    return plc
+
+
+def test_plan_blocks_merge_contiguous_addresses():
+    """[TestCase] 連續位址合併成一個區塊，重複寫入以最後一次為準，verify 不同時分開"""
+    plan = WritePlan()
+    plan.registers(100, [1, 2])
+    plan.registers(102, [3])
+    plan.registers(101, [9])
+    plan.registers(200, [5])
+    plan.registers(103, [0, 0], verify=False)
+    plan.coils(8192 + 500, [True, False])
+    plan.coils(8192 + 502, [1])
+
+    blocks = plan.blocks()
+    logging.info(f"blocks: {blocks}")
+    assert [(b.kind, b.address, b.values, b.verify) for b in blocks] == [
+        ("register", 100, [1, 9, 3], True),
+        ("register", 103, [0, 0], False),
+        ("register", 200, [5], True),
+        ("coil", 8192 + 500, [True, False, True], True),
+    ]
+    assert len(plan) == 9
+
+
+def test_plan_blocks_split_at_request_limit():
+    """[TestCase] 超過單一請求上限的連續位址拆成多個區塊"""
+    plan = WritePlan().registers(0, list(range(bulk_write.MAX_REGISTERS + 5)))
+    assert [len(block.values) for block in plan.blocks()] == [bulk_write.MAX_REGISTERS, 5]
+
+
+def test_bulk_writer_retries_only_failed_blocks(plc):
+    """[TestCase] 失敗的區塊在下一輪重新連線後重送，成功的區塊不再寫入"""
+    plc.fail_once = {("register", 200)}
+    plan = WritePlan().registers(100, [1, 2]).registers(200, [3]).coils(10, [True])
+
+    result = BulkWriter("plc", 502, retry_delay=0).write(plan)
+
+    assert result.ok
+    assert result.attempts == 2
+    assert plc.connections == 2
+    assert plc.writes == [
+        ("register", 100, [1, 2]),
+        ("register", 200, [3]),
+        ("coil", 10, [True]),
+        ("register", 200, [3]),
+    ]
+    assert plc.memory["register"] == {100: 1, 101: 2, 200: 3}
+
+
+def test_bulk_writer_reports_blocks_that_never_succeed(plc, monkeypatch):
+    """[TestCase] 重試次數用完仍失敗的區塊列在 failed"""
+    plan = WritePlan().registers(100, [1]).registers(300, [2])
+    original = FakeClient._write
+
+    def always_fail_300(self, kind, address, values):
+        if address == 300:
+            self.plc.writes.append((kind, address, list(values)))
+            return FakeResponse(error=True)
+        return original(self, kind, address, values)
+
+    monkeypatch.setattr(FakeClient, "_write", always_fail_300)
+    result = BulkWriter("plc", 502, max_retries=3, retry_delay=0).write(plan)
+
+    assert not result.ok
+    assert result.describe_failed() == ["register 300-300"]
+    assert plc.writes.count(("register", 100, [1])) == 1
+    assert plc.writes.count(("register", 300, [2])) == 3
+
+
+def test_modbus_writer_resumes_from_failed_item(plc):
+    """[TestCase] ModbusWriter 從失敗的那一項繼續，已成功的項目不重送"""
+    plc.fail_once = {("coil", 8192 + 516)}
+    writer = ModbusWriter("plc", 502, backoff_base=0, backoff_max=0)
+
+    outcome = writer.write(
+        [
+            ("coil", 8192 + 505, [True]),
+            ("coil", 8192 + 516, False),
+            ("register", 3000, 5),
+            ("register", 3010, [1, 2]),
+        ]
+    )
+
+    assert outcome.ok
+    assert plc.writes == [
+        ("coil", 8192 + 505, [True]),
+        ("coil", 8192 + 516, [False]),
+        ("coil", 8192 + 516, [False]),
+        ("register", 3000, [5]),
+        ("register", 3010, [1, 2]),
+    ]
+    # 單一值用 FC05 / FC06，多個值才用 FC16
+    assert plc.methods == [
+        "write_coil",
+        "write_coil",
+        "write_coil",
+        "write_register",
+        "write_registers",
+    ]
@@ -0,0 +1,92 @@
+import os
+import json
+import logging
+from datetime import date
+from log_retention import MANIFEST_FILE, LogRetention
+
+POLICIES = {
+    "error": (30, None),
+    "": (365, lambda filename: filename.endswith(".csv")),
+}
+
+
+def touch(path, size=10):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(b"x" * size)
+    return path
+
+
+def read_manifest(root):
+    with open(os.path.join(root, MANIFEST_FILE)) as file:
+        return json.load(file)["files"]
+
+
+def test_sweep_removes_expired_files(tmp_path):
+    """[TestCase] 依檔名日期與各目錄的保留天數刪檔，policy 以外的檔案不動"""
+    root = str(tmp_path)
+    old_log = touch(f"{root}/error/errorlog.log.2024-01-01")
+    new_log = touch(f"{root}/error/errorlog.log.2024-03-01")
+    live_log = touch(f"{root}/error/errorlog.log")
+    old_csv = touch(f"{root}/sensor.2023-01-01.csv")
+    other = touch(f"{root}/notes.2020-01-01.txt")
+
+    retention = LogRetention(root, POLICIES)
+    retention.sweep(today=date(2024, 3, 10))
+
+    assert not os.path.exists(old_log)
+    assert not os.path.exists(old_csv)
+    for path in (new_log, live_log, other):
+        assert os.path.exists(path)
+    manifest = read_manifest(root)
+    logging.info(f"manifest: {manifest}")
+    assert set(manifest) == {"error/errorlog.log.2024-03-01", "error/errorlog.log"}
+    assert manifest["error/errorlog.log"]["live"]
+
+
+def test_size_budget_removes_oldest_first(tmp_path):
+    """[TestCase] 超過 size_budget 時從最舊的帶日期檔案開始刪"""
+    root = str(tmp_path)
+    for day in (1, 2, 3):
+        touch(f"{root}/error/errorlog.log.2024-03-0{day}", size=100)
+    touch(f"{root}/error/errorlog.log", size=100)
+
+    retention = LogRetention(root, POLICIES, size_budget=250)
+    retention.sweep(today=date(2024, 3, 10))
+
+    remaining = sorted(os.listdir(f"{root}/error"))
+    assert remaining == ["errorlog.log", "errorlog.log.2024-03-03"]
+
+
+def test_register_merges_across_processes(tmp_path):
+    """[TestCase] 各行程登記的檔案合併在同一份 manifest，不會互相覆蓋"""
+    root = str(tmp_path)
+    first = touch(f"{root}/error/errorlog.log.2024-03-01")
+    second = touch(f"{root}/error/errorlog.log.2024-03-02")
+    ignored = touch(f"{root}/operation/oplog.log.2024-03-02")
+
+    poller = LogRetention(root, POLICIES)
+    worker = LogRetention(root, POLICIES)
+    poller.register(first)
+    worker.register(second)
+    worker.register(ignored)
+
+    assert set(read_manifest(root)) == {
+        "error/errorlog.log.2024-03-01",
+        "error/errorlog.log.2024-03-02",
+    }
+
+
+def test_rotator_registers_rotated_file(tmp_path):
+    """[TestCase] logging handler 輪替時改名並登記新檔"""
+    root = str(tmp_path)
+    source = touch(f"{root}/error/errorlog.log")
+    dest = f"{root}/error/errorlog.log.2024-03-01"
+
+    retention = LogRetention(root, POLICIES)
+    retention.rotator(source, dest)
+
+    assert os.path.exists(dest) and not os.path.exists(source)
+    entry = read_manifest(root)["error/errorlog.log.2024-03-01"]
+    assert entry["date"] == "2024-03-01"
+    assert not entry["live"]
@@ -0,0 +1,87 @@
+import pytest
+from pymodbus.pdu import ExceptionResponse
+from modbus_poll import ModbusPoller, ReadPlan, coalesce
+
+
+class FakeResponse:
+    def __init__(self, registers=None, bits=None):
+        self.registers = registers
+        self.bits = bits
+
+    def isError(self):
+        return False
+
+
+class FakeClient:
+    """holding register 的值等於位址；涵蓋 invalid 內位址的讀取回傳 IllegalAddress"""
+
+    host = "plc"
+    port = 502
+
+    def __init__(self, invalid=()):
+        self.invalid = set(invalid)
+        self.requests = []
+
+    def connect(self):
+        return True
+
+    def close(self):
+        pass
+
+    def read_holding_registers(self, address, count, unit=None):
+        self.requests.append(("hr", address, count))
+        if any(address <= bad < address + count for bad in self.invalid):
+            return ExceptionResponse(0x03, 0x02)
+        return FakeResponse(registers=list(range(address, address + count)))
+
+    def read_coils(self, address, count, unit=None):
+        self.requests.append(("coil", address, count))
+        return FakeResponse(bits=[bool(i % 2) for i in range(address, address + count)])
+
+
+@pytest.fixture
+def poller():
+    poller = ModbusPoller("plc", 502)
+    poller.client = FakeClient()
+    return poller
+
+
+def test_coalesce_keeps_original_parts():
+    """[TestCase] 間距內的範圍合併成一個區塊，並保留原始範圍"""
+    blocks = coalesce([(100, 2), (0, 4), (10, 2), (10, 2)], max_gap=10, max_count=120)
+    assert blocks == [(0, 12, [(0, 4), (10, 2)]), (100, 2, [(100, 2)])]
+
+
+def test_merged_block_is_read_once(poller):
+    """[TestCase] 合併後的區塊一次讀取，各段從同一份回應取值"""
+    plan = ReadPlan().add("hr", 0, 4).add("hr", 10, 2).add("coil", 8192 + 500, 2)
+    cycle = poller.poll(plan)
+
+    assert poller.client.requests == [("hr", 0, 12), ("coil", 8192 + 500, 2)]
+    assert cycle.read_holding_registers(10, 2).registers == [10, 11]
+    assert cycle.read_coils(8192 + 501, 1).bits == [True]
+
+
+def test_rejected_merged_block_falls_back_to_parts(poller):
+    """[TestCase] 合併區塊被 PLC 拒絕時改回逐段讀取，之後不再合併這一段"""
+    poller.client = FakeClient(invalid={6})
+    plan = ReadPlan().add("hr", 0, 4).add("hr", 10, 2)
+
+    cycle = poller.poll(plan)
+    assert poller.client.requests == [("hr", 0, 12), ("hr", 0, 4), ("hr", 10, 2)]
+    assert cycle.read_holding_registers(0, 4).registers == [0, 1, 2, 3]
+    assert cycle.read_holding_registers(10, 2).registers == [10, 11]
+    assert poller.status["requests"] == 3
+
+    poller.client.requests = []
+    poller.poll(plan)
+    assert poller.client.requests == [("hr", 0, 4), ("hr", 10, 2)]
+
+
+def test_failing_part_does_not_hide_other_parts(poller):
+    """[TestCase] 只有真正失敗的那一段回傳錯誤"""
+    poller.client = FakeClient(invalid={11})
+    cycle = poller.poll(ReadPlan().add("hr", 0, 4).add("hr", 10, 2))
+
+    assert not cycle.read_holding_registers(0, 4).isError()
+    assert cycle.read_holding_registers(10, 2).isError()
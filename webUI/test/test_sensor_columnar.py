@@ -0,0 +1,87 @@
+import math
+import logging
+from datetime import datetime, timedelta
+from sensor_columnar import ColumnarLogWriter, iter_records, read_columns
+
+COLUMNS = ["time", "Temp_Supply", "Prsr_Supply", "Mode"]
+
+
+def make_rows(start, count):
+    rows = []
+    for i in range(count):
+        timestamp = start + timedelta(seconds=15 * i)
+        mode = "auto" if i % 3 else "manual"
+        rows.append((timestamp, [20.5 + i * 0.25, 101.3, mode]))
+    return rows
+
+
+def test_round_trip(tmp_path):
+    """[TestCase] 寫入後讀回的時間、數值、字串欄位與寫入內容一致"""
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    rows = make_rows(start, 25)
+    writer = ColumnarLogWriter(str(tmp_path), block_rows=10)
+    for timestamp, values in rows:
+        writer.append(COLUMNS, timestamp, values)
+    writer.flush(fsync=False)
+
+    records = list(iter_records(writer.path_for("2024-01-01")))
+    logging.info(f"first record: {records[0]}")
+    assert len(records) == 25
+    for record, (timestamp, values) in zip(records, rows):
+        assert record["time"] == timestamp
+        assert record["Temp_Supply"] == values[0]
+        assert math.isclose(record["Prsr_Supply"], values[1], rel_tol=1e-6)
+        assert record["Mode"] == values[2]
+
+
+def test_time_range_and_columns(tmp_path):
+    """[TestCase] 只回傳 start / end (含) 之間的列與指定的欄位"""
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    writer = ColumnarLogWriter(str(tmp_path), block_rows=10)
+    for timestamp, values in make_rows(start, 40):
+        writer.append(COLUMNS, timestamp, values)
+    writer.flush(fsync=False)
+
+    data = read_columns(
+        writer.path_for("2024-01-01"),
+        columns=["Temp_Supply"],
+        start=start + timedelta(seconds=15 * 5),
+        end=start + timedelta(seconds=15 * 24),
+    )
+    assert set(data) == {"time", "Temp_Supply"}
+    assert data["time"][0] == start + timedelta(seconds=15 * 5)
+    assert data["time"][-1] == start + timedelta(seconds=15 * 24)
+    assert list(data["Temp_Supply"]) == [20.5 + i * 0.25 for i in range(5, 25)]
+
+
+def test_torn_block_is_dropped(tmp_path):
+    """[TestCase] 寫到一半的 block 讀取時忽略，下次寫入時截掉"""
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    writer = ColumnarLogWriter(str(tmp_path), block_rows=5)
+    for timestamp, values in make_rows(start, 10):
+        writer.append(COLUMNS, timestamp, values)
+    path = writer.path_for("2024-01-01")
+    with open(path, "r+b") as file:
+        file.seek(-7, 2)
+        file.truncate()
+    assert len(read_columns(path)["time"]) == 5
+
+    later = start + timedelta(hours=1)
+    for timestamp, values in make_rows(later, 5):
+        writer.append(COLUMNS, timestamp, values)
+    times = read_columns(path)["time"]
+    assert len(times) == 10
+    assert times[5] == later
+
+
+def test_rotation(tmp_path):
+    """[TestCase] 換日時寫出前一天未滿的 block，並以舊檔路徑呼叫 on_rotate"""
+    rotated = []
+    writer = ColumnarLogWriter(str(tmp_path), on_rotate=rotated.append)
+    for timestamp, values in make_rows(datetime(2024, 1, 1, 23, 59, 0), 6):
+        writer.append(COLUMNS, timestamp, values)
+    writer.flush(fsync=False)
+
+    assert rotated == [writer.path_for("2024-01-01")]
+    assert len(read_columns(writer.path_for("2024-01-01"))["time"]) == 4
+    assert len(read_columns(writer.path_for("2024-01-02"))["time"]) == 2
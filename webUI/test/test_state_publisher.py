@@ -0,0 +1,24 @@
+from state_publisher import JsonStatePublisher, JsonStateReader
+
+
+def test_reader_updates_targets_in_place(tmp_path):
+    """[TestCase] web 端就地更新 dict 與 list，既有參照讀得到 poller 發佈的新值"""
+    setting_limit = {"control": {"oil_temp_set_up": 55.0}}
+    error_data = ["M300 Coolant Supply Temperature Over Range (High) Warning"]
+    publisher = JsonStatePublisher(str(tmp_path))
+    assert publisher.publish_all({"limit.json": setting_limit, "errors.json": error_data}) == [
+        "limit.json",
+        "errors.json",
+    ]
+
+    limit_copy, errors_copy = {}, []
+    reader = JsonStateReader(str(tmp_path), {"limit.json": limit_copy, "errors.json": errors_copy})
+    assert reader.refresh() == ["limit.json", "errors.json"]
+    assert limit_copy == setting_limit
+    assert errors_copy == error_data
+
+    error_data.clear()
+    assert publisher.publish_all({"limit.json": setting_limit, "errors.json": error_data}) == ["errors.json"]
+    assert reader.refresh() == ["errors.json"]
+    assert errors_copy == []
+    assert reader.refresh() == []
@@ -0,0 +1,113 @@
+import os
+import gzip
+import logging
+from flask import Flask, url_for
+from static_assets import DIST_DIR, StaticAssets, build, load_manifest
+
+CSS = (
+    "@font-face { src: url('../fonts/icons.woff2?v=1#iefix'); }\n"
+    ".logo { background: url(\"../img/logo.png\"); }\n"
+    ".inline { background: url(data:image/png;base64,AAAA); }\n"
+    ".cdn { background: url(https://example.com/a.png); }\n"
+    ".missing { background: url(../img/missing.png); }\n"
+)
+
+
+def make_static(static_dir):
+    files = {
+        "css/site.css": CSS.encode(),
+        "fonts/icons.woff2": b"\x00woff2",
+        "img/logo.png": b"\x89PNG",
+        "js/app.js": b"console.log('x');\n" * 50,
+        ".hidden": b"skip",
+    }
+    for relpath, data in files.items():
+        path = os.path.join(static_dir, relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(data)
+
+
+def read_dist(static_dir, relpath):
+    with open(os.path.join(static_dir, DIST_DIR, relpath), "rb") as file:
+        return file.read()
+
+
+def test_build_writes_hashed_files(tmp_path):
+    """[TestCase] 建置雜湊檔名與 manifest，文字檔另外產生 .gz，略過隱藏檔"""
+    static_dir = str(tmp_path)
+    make_static(static_dir)
+    manifest = build(static_dir)
+    assets = manifest["assets"]
+    logging.info(f"assets: {assets}")
+
+    assert sorted(assets) == ["css/site.css", "fonts/icons.woff2", "img/logo.png", "js/app.js"]
+    assert assets["js/app.js"].startswith("js/app.") and assets["js/app.js"].endswith(".js")
+    assert read_dist(static_dir, assets["img/logo.png"]) == b"\x89PNG"
+    assert gzip.decompress(read_dist(static_dir, assets["js/app.js"] + ".gz")) == read_dist(
+        static_dir, assets["js/app.js"]
+    )
+    assert not os.path.exists(os.path.join(static_dir, DIST_DIR, assets["img/logo.png"] + ".gz"))
+    assert load_manifest(static_dir) == manifest
+
+
+def test_css_urls_point_to_hashed_files(tmp_path):
+    """[TestCase] CSS 的相對 url() 改指向雜湊檔並保留 query / fragment，其他 url 不動"""
+    static_dir = str(tmp_path)
+    make_static(static_dir)
+    assets = build(static_dir)["assets"]
+    css = read_dist(static_dir, assets["css/site.css"]).decode()
+
+    font = os.path.basename(assets["fonts/icons.woff2"])
+    logo = os.path.basename(assets["img/logo.png"])
+    assert f"url('../fonts/{font}?v=1#iefix')" in css
+    assert f'url("../img/{logo}")' in css
+    assert "url(data:image/png;base64,AAAA)" in css
+    assert "url(https://example.com/a.png)" in css
+    assert "url(../img/missing.png)" in css
+
+
+def test_rebuild_only_when_sources_change(tmp_path):
+    """[TestCase] 來源沒變時沿用 manifest；內容改變後產生新雜湊並清掉舊檔"""
+    static_dir = str(tmp_path)
+    make_static(static_dir)
+    first = build(static_dir)
+    assert build(static_dir) == first
+
+    with open(os.path.join(static_dir, "img/logo.png"), "wb") as file:
+        file.write(b"\x89PNG v2")
+    second = build(static_dir)
+
+    assert second["assets"]["img/logo.png"] != first["assets"]["img/logo.png"]
+    # 圖片雜湊改變，引用它的 CSS 也跟著改變
+    assert second["assets"]["css/site.css"] != first["assets"]["css/site.css"]
+    assert second["assets"]["js/app.js"] == first["assets"]["js/app.js"]
+    dist = os.path.join(static_dir, DIST_DIR)
+    assert not os.path.exists(os.path.join(dist, first["assets"]["img/logo.png"]))
+
+
+def test_url_for_and_precompressed_response(tmp_path):
+    """[TestCase] url_for 產生雜湊路徑，/static/dist/ 依 Accept-Encoding 回應 .gz"""
+    static_dir = str(tmp_path / "static")
+    make_static(static_dir)
+    assets = build(static_dir)["assets"]
+    app = Flask(__name__, static_folder=static_dir)
+    StaticAssets(app)
+
+    with app.test_request_context():
+        url = url_for("static", filename="js/app.js")
+        assert url == f"/static/{DIST_DIR}/{assets['js/app.js']}"
+        assert url_for("static", filename="other.js") == "/static/other.js"
+
+    client = app.test_client()
+    response = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "immutable" in response.headers["Cache-Control"]
+    assert gzip.decompress(response.data) == read_dist(static_dir, assets["js/app.js"])
+    response.close()
+
+    plain = client.get(url)
+    assert "Content-Encoding" not in plain.headers
+    assert plain.data == read_dist(static_dir, assets["js/app.js"])
+    plain.close()
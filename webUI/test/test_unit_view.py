@@ -0,0 +1,57 @@
+import math
+import pytest
+from unit_view import conversion_table, convert_units, unit_labels
+
+
+def test_threshold_conversion():
+    """[TestCase] 門檻值依欄位名稱換算，trap / Delay 欄位不換算"""
+    thrshd = {
+        "Thr_W_Temp": 40.0,
+        "Thr_W_DewPoint": 5.0,
+        "Thr_W_Prsr": 100.0,
+        "Thr_W_Flow": 50.0,
+        "Thr_W_Temp_trap": True,
+        "Delay_Temp": 10,
+    }
+    imperial = convert_units(thrshd, "thrshd", "imperial")
+    assert imperial["Thr_W_Temp"] == pytest.approx(104.0)
+    # 露點門檻是溫差，不加 32
+    assert imperial["Thr_W_DewPoint"] == pytest.approx(9.0)
+    assert imperial["Thr_W_Prsr"] == pytest.approx(14.5038)
+    assert imperial["Thr_W_Flow"] == pytest.approx(13.21)
+    assert imperial["Thr_W_Temp_trap"] is True
+    assert imperial["Delay_Temp"] == 10
+
+
+def test_round_trip_does_not_mutate():
+    """[TestCase] 換算回傳新的 dict，公制→英制→公制還原原值"""
+    measure = {"Temp_Supply": 25.0, "Prsr_Return": 200.0, "f1": 30.0, "Mode": "auto", "Temp_Off": None}
+    original = dict(measure)
+    back = convert_units(convert_units(measure, "measure", "imperial"), "measure", "metric")
+    assert measure == original
+    for key, value in original.items():
+        if isinstance(value, float):
+            assert math.isclose(back[key], value, rel_tol=1e-3)
+        else:
+            assert back[key] == value
+
+
+def test_control_and_sensor_value_rules():
+    """[TestCase] control 只換算設定溫度 / 壓力，sensor_value 依 Redfish 名稱換算"""
+    control = convert_units(
+        {"oil_temp_set": 30.0, "oil_pressure_set": 100.0, "pump_speed": 50},
+        "control",
+        "imperial",
+    )
+    assert control == {"oil_temp_set": 86.0, "oil_pressure_set": pytest.approx(14.5038), "pump_speed": 50}
+
+    sensor = convert_units({"CoolantSupplyTemperature": 0.0, "DewPoint": 10.0, "PumpSpeed": 80}, "sensor_value", "imperial")
+    assert sensor == {"CoolantSupplyTemperature": 32.0, "DewPoint": 50.0, "PumpSpeed": 80}
+
+
+def test_table_and_labels_are_cached():
+    """[TestCase] 同一組欄位只建一次換算表，單位文字只含有單位的欄位"""
+    keys = ("Temp_Supply", "Prsr_Return", "Mode")
+    assert conversion_table("measure", keys) is conversion_table("measure", keys)
+    assert unit_labels("measure", keys, "metric") == {"Temp_Supply": "°C", "Prsr_Return": "kPa"}
+    assert unit_labels("measure", keys, "imperial") == {"Temp_Supply": "°F", "Prsr_Return": "psi"}
@@ -0,0 +1,97 @@
+import io
+import logging
+import zipfile
+from flask import Response
+from zip_stream import collect_entries, estimate_size, stream_zip, zip_response
+
+
+def write_logs(directory):
+    files = {
+        "sensor.2024-01-02.csv": b"time,temp\n" + b"1,25.0\n" * 5000,
+        "sensor.2024-01-01.csv": b"time,temp\n1,24.0\n",
+        "sensor.2024-01-01.col": bytes(range(256)) * 10,
+        "notes.txt": b"skip me",
+    }
+    for name, data in files.items():
+        (directory / name).write_bytes(data)
+    return files
+
+
+def test_collect_entries(tmp_path):
+    """[TestCase] 依檔名排序並套用篩選與 prefix，大小在列出時固定"""
+    files = write_logs(tmp_path)
+    entries = collect_entries(str(tmp_path), lambda name: name.startswith("sensor"), "logs/")
+    logging.info(f"entries: {entries}")
+    assert [arcname for _, arcname, _ in entries] == [
+        "logs/sensor.2024-01-01.col",
+        "logs/sensor.2024-01-01.csv",
+        "logs/sensor.2024-01-02.csv",
+    ]
+    assert [size for _, _, size in entries] == [
+        len(files["sensor.2024-01-01.col"]),
+        len(files["sensor.2024-01-01.csv"]),
+        len(files["sensor.2024-01-02.csv"]),
+    ]
+    assert collect_entries(str(tmp_path / "missing"), lambda name: True) == []
+
+
+def test_stream_zip_round_trip(tmp_path):
+    """[TestCase] 串流產生的 zip 可正常解開；.col 以 store、csv 以 deflate 寫入"""
+    files = write_logs(tmp_path)
+    entries = collect_entries(str(tmp_path), lambda name: name.startswith("sensor"))
+    body = b"".join(stream_zip(entries))
+
+    with zipfile.ZipFile(io.BytesIO(body)) as archive:
+        assert archive.testzip() is None
+        for info in archive.infolist():
+            assert archive.read(info.filename) == files[info.filename]
+        assert archive.getinfo("sensor.2024-01-01.col").compress_type == zipfile.ZIP_STORED
+        assert archive.getinfo("sensor.2024-01-02.csv").compress_type == zipfile.ZIP_DEFLATED
+
+
+def test_growing_file_is_cut_at_listed_size(tmp_path):
+    """[TestCase] 列出後仍在寫入的檔案只讀到列出時的長度"""
+    path = tmp_path / "sensor.2024-01-03.csv"
+    path.write_bytes(b"a" * 100)
+    entries = collect_entries(str(tmp_path), lambda name: True)
+    with open(path, "ab") as file:
+        file.write(b"b" * 100)
+
+    body = b"".join(stream_zip(entries, compress=False))
+    with zipfile.ZipFile(io.BytesIO(body)) as archive:
+        assert archive.read("sensor.2024-01-03.csv") == b"a" * 100
+    assert estimate_size(entries, compress=False) == len(body)
+
+
+def test_zip_response_content_length(tmp_path):
+    """[TestCase] 全部 store 時附上精確的 Content-Length，需要壓縮時不附"""
+    write_logs(tmp_path)
+    entries = collect_entries(str(tmp_path), lambda name: name.startswith("sensor"))
+
+    stored = zip_response(Response, entries, "logs.zip", compress=False)
+    body = b"".join(stored.response)
+    assert stored.headers["Content-Length"] == str(len(body))
+    assert stored.headers["Content-Disposition"] == "attachment; filename=logs.zip"
+
+    deflated = zip_response(Response, entries, "logs.zip")
+    assert "Content-Length" not in deflated.headers
+    assert estimate_size(entries) is None
+
+
+def test_shrunk_or_removed_file_keeps_content_length(tmp_path):
+    """[TestCase] 列出後被截短或刪除的檔案補 0 到列出時的長度，zip 大小仍與 Content-Length 相同"""
+    shrunk = tmp_path / "sensor.2024-01-04.csv"
+    removed = tmp_path / "sensor.2024-01-05.csv"
+    shrunk.write_bytes(b"a" * 100)
+    removed.write_bytes(b"b" * 50)
+    entries = collect_entries(str(tmp_path), lambda name: True)
+    shrunk.write_bytes(b"c" * 10)
+    removed.unlink()
+
+    response = zip_response(Response, entries, "logs.zip", compress=False)
+    body = b"".join(response.response)
+    assert response.headers["Content-Length"] == str(len(body))
+    with zipfile.ZipFile(io.BytesIO(body)) as archive:
+        assert archive.testzip() is None
+        assert archive.read("sensor.2024-01-04.csv") == b"c" * 10 + bytes(90)
+        assert archive.read("sensor.2024-01-05.csv") == bytes(50)
@@ -0,0 +1,419 @@
+import base64
+import bisect
+import fcntl
+import heapq
+import itertools
+import json
+import os
+import platform
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+if platform.system() == "Linux":
+    onLinux = True
+else:
+    onLinux = False
+
+if onLinux:
+    from web.state_publisher import atomic_write
+else:
+    from state_publisher import atomic_write
+
+
+# 保留的紀錄筆數；查詢走索引，筆數多寡不影響分頁速度
+MAX_RECORDS = 10000
+
+
+def now_string():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def sort_key(record):
+    # on_time 相同時再依名稱排序，確保順序固定，cursor 才能定位
+    return (record["on_time"], record["signal_name"], record["signal_value"] or "")
+
+
+def newest_first(records, low, high):
+    for position in range(high - 1, low - 1, -1):
+        yield records[position]
+
+
+def encode_cursor(record):
+    raw = json.dumps(sort_key(record), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        return tuple(json.loads(base64.urlsafe_b64decode(cursor.encode())))
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+class AlarmStore:
+    """
+    記憶體中的告警紀錄 (signal_records.json / downtime_signal_records.json)。
+
+    紀錄依 on_time 由舊到新存放，另以 key 欄位 (signal_value 或 signal_name)
+    索引尚未結束的告警，on / off 都是 O(1)；每種 (signal_name, signal_value)
+    也各有一份依時間排序的清單，供 query() 以 bisect 計數與分頁。
+    每次異動只在 <name>.journal
+    追加一行 JSON，累積 compact_every 筆後才把完整清單 atomic 寫回 JSON 檔
+    並清空 journal；讀取端 (含 Redfish) 以 JSON 檔 + journal 重建相同內容。
+
+    寫入以 flock 保護，且會先套用其他 process 追加的 journal，
+    多個 process 共用同一份紀錄時不會互相覆蓋。
+    """
+
+    def __init__(self, path, key="signal_value", max_records=MAX_RECORDS, compact_every=200):
+        self.path = path
+        self.journal_path = os.path.splitext(path)[0] + ".journal"
+        self.lock_path = path + ".lock"
+        self.key = key
+        self.max_records = max_records
+        self.compact_every = compact_every
+
+        self.lock = threading.RLock()
+        self.records = []
+        self.keys = []
+        self.groups = {}
+        self.open_index = {}
+        self.ids = {}
+        self.snapshot_stamp = None
+        self.journal_offset = 0
+        self.journal_entries = 0
+
+        with self.lock, self._file_lock():
+            if not os.path.exists(self.path):
+                atomic_write(self.path, b"[]")
+            self._reload()
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _stamp(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_ino, st.st_mtime_ns)
+        except FileNotFoundError:
+            return None
+
+    def _reset(self):
+        self.records = []
+        # 與 records 平行的 sort_key，供 bisect
+        self.keys = []
+        # (signal_name, signal_value) -> (keys, records)
+        self.groups = {}
+        self.open_index = {}
+        self.ids = {}
+
+    def _reload(self):
+        self._reset()
+        self.snapshot_stamp = self._stamp()
+        try:
+            with open(self.path, "r") as file:
+                loaded = json.load(file)
+        except (FileNotFoundError, ValueError):
+            loaded = []
+
+        for record in sorted(loaded, key=sort_key):
+            self._insert(record)
+
+        self.journal_offset = 0
+        self.journal_entries = 0
+        self._replay_journal()
+
+    def _replay_journal(self):
+        try:
+            with open(self.journal_path, "rb") as file:
+                file.seek(self.journal_offset)
+                data = file.read()
+        except FileNotFoundError:
+            return
+
+        # 只套用完整的行，寫到一半的最後一行留到下次
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                self._apply(json.loads(line))
+            except ValueError:
+                continue
+            self.journal_entries += 1
+        self.journal_offset += end
+
+    def refresh(self):
+        """套用其他 process 寫入的異動；JSON 檔被 compaction 換掉時整份重讀"""
+        with self.lock:
+            if self._stamp() != self.snapshot_stamp:
+                self._reload()
+                return
+            try:
+                size = os.path.getsize(self.journal_path)
+            except FileNotFoundError:
+                size = 0
+            if size < self.journal_offset:
+                self._reload()
+            elif size > self.journal_offset:
+                self._replay_journal()
+
+    def _insert(self, record):
+        identity = (record[self.key], record["on_time"])
+        if identity in self.ids:
+            return False
+        key = sort_key(record)
+        group = self.groups.setdefault(
+            (record["signal_name"], record["signal_value"] or ""), ([], [])
+        )
+        # 新紀錄幾乎都在最後，bisect 後 insert 等同 append
+        for keys, records in ((self.keys, self.records), group):
+            position = bisect.bisect_right(keys, key)
+            keys.insert(position, key)
+            records.insert(position, record)
+        self.ids[identity] = record
+        if record["off_time"] is None:
+            self.open_index[record[self.key]] = record
+        return True
+
+    def _remove(self, record):
+        key = sort_key(record)
+        group_id = (record["signal_name"], record["signal_value"] or "")
+        group = self.groups[group_id]
+        for keys, records in ((self.keys, self.records), group):
+            position = bisect.bisect_left(keys, key)
+            while records[position] is not record:
+                position += 1
+            del keys[position]
+            del records[position]
+        if not group[1]:
+            del self.groups[group_id]
+        self.ids.pop((record[self.key], record["on_time"]), None)
+        if self.open_index.get(record[self.key]) is record:
+            del self.open_index[record[self.key]]
+
+    def _apply(self, entry):
+        op = entry["op"]
+        if op == "on":
+            record = entry["record"]
+            if record[self.key] in self.open_index:
+                return False
+            return self._insert(record)
+        if op == "off":
+            record = self.open_index.pop(entry["key"], None)
+            if record is None:
+                return False
+            record["off_time"] = entry["off_time"]
+            return True
+        if op == "close_all":
+            for record in self.open_index.values():
+                record["off_time"] = entry["off_time"]
+            changed = bool(self.open_index)
+            self.open_index = {}
+            return changed
+        if op == "delete":
+            position = bisect.bisect_left(self.keys, (entry["on_time"],))
+            targets = []
+            while position < len(self.keys) and self.keys[position][0] == entry["on_time"]:
+                if self.records[position]["signal_name"] == entry["signal_name"]:
+                    targets.append(self.records[position])
+                position += 1
+            for record in targets:
+                self._remove(record)
+            return bool(targets)
+        if op == "clear":
+            changed = bool(self.records)
+            self._reset()
+            return changed
+        return False
+
+    def _commit(self, entries):
+        """套用並追加到 journal，回傳實際有改變內容的筆數"""
+        with self.lock, self._file_lock():
+            self.refresh()
+            changed = [entry for entry in entries if self._apply(entry)]
+            if not changed:
+                return 0
+
+            payload = "".join(
+                json.dumps(entry, separators=(",", ":")) + "\n" for entry in changed
+            ).encode()
+            with open(self.journal_path, "ab") as file:
+                file.write(payload)
+            self.journal_offset += len(payload)
+            self.journal_entries += len(changed)
+
+            if self.journal_entries >= self.compact_every:
+                self._compact()
+            return len(changed)
+
+    def _compact(self):
+        if len(self.records) > self.max_records:
+            kept = self.records[-self.max_records :]
+            self._reset()
+            for record in kept:
+                self._insert(record)
+        atomic_write(
+            self.path, json.dumps(self.view(), indent=4).encode(), fsync=True
+        )
+        atomic_write(self.journal_path, b"")
+        self.snapshot_stamp = self._stamp()
+        self.journal_offset = 0
+        self.journal_entries = 0
+
+    def compact(self):
+        with self.lock, self._file_lock():
+            self.refresh()
+            self._compact()
+
+    def signal_on(self, signal_name, signal_value):
+        """同一 key 已有未結束的告警時不重複記錄"""
+        record = {
+            "signal_name": signal_name,
+            "on_time": now_string(),
+            "off_time": None,
+            "signal_value": signal_value,
+        }
+        self.refresh()
+        if record[self.key] in self.open_index:
+            return False
+        return self._commit([{"op": "on", "record": record}]) > 0
+
+    def signal_off(self, signal_name, signal_value):
+        key = signal_value if self.key == "signal_value" else signal_name
+        self.refresh()
+        if key not in self.open_index:
+            return False
+        return self._commit([{"op": "off", "key": key, "off_time": now_string()}]) > 0
+
+    def close_all(self):
+        return self._commit([{"op": "close_all", "off_time": now_string()}]) > 0
+
+    def delete(self, signals):
+        """signals 為 [{"signal_name", "on_time"}, ...]，回傳刪除的筆數"""
+        return self._commit(
+            [
+                {
+                    "op": "delete",
+                    "signal_name": signal.get("signal_name"),
+                    "on_time": signal.get("on_time"),
+                }
+                for signal in signals
+            ]
+        )
+
+    def clear(self):
+        return self._commit([{"op": "clear"}]) > 0
+
+    def view(self):
+        """與 JSON 檔相同的內容：新到舊，最多 max_records 筆"""
+        with self.lock:
+            return self.records[: -self.max_records - 1 : -1]
+
+    def _matches(self, record, names, search, since, until):
+        if names and record["signal_name"] not in names:
+            return False
+        if search and not (
+            search in record["signal_name"].lower()
+            or search in (record["signal_value"] or "").lower()
+        ):
+            return False
+        if since and record["on_time"] < since:
+            return False
+        if until and record["on_time"] >= until:
+            return False
+        return True
+
+    def query(
+        self,
+        signal_names=None,
+        search="",
+        state=None,
+        since=None,
+        until=None,
+        cursor=None,
+        page=1,
+        limit=20,
+    ):
+        """
+        新到舊分頁查詢，回傳 {"total_records", "records", "next_cursor"}。
+
+        signal_names / search 先在 (signal_name, signal_value) 的種類上比對，
+        時間範圍 (since 含、until 不含) 以 bisect 定位，總數不需展開清單。
+        state 為 "open" / "closed" 時只取未結束 / 已結束的告警。
+        有 cursor 時從上一頁最後一筆之後接續，否則依 page 計算位移。
+        """
+        names = set(signal_names or ())
+        search = (search or "").lower()
+        upper = decode_cursor(cursor) if cursor else None
+        offset = 0 if upper is not None else max(page - 1, 0) * limit
+
+        self.refresh()
+        with self.lock:
+            if names or search:
+                groups = [
+                    group
+                    for (name, value), group in self.groups.items()
+                    if (not names or name in names)
+                    and (not search or search in name.lower() or search in value.lower())
+                ]
+            else:
+                groups = [(self.keys, self.records)]
+
+            total = 0
+            ranges = []
+            for keys, records in groups:
+                low = bisect.bisect_left(keys, (since,)) if since else 0
+                high = bisect.bisect_left(keys, (until,)) if until else len(keys)
+                total += max(high - low, 0)
+                if upper is not None:
+                    high = min(high, bisect.bisect_left(keys, upper))
+                if high > low:
+                    ranges.append((records, low, high))
+
+            if state in ("open", "closed"):
+                open_records = [
+                    record
+                    for record in self.open_index.values()
+                    if self._matches(record, names, search, since, until)
+                ]
+
+            if state == "open":
+                total = len(open_records)
+                open_records.sort(key=sort_key, reverse=True)
+                stream = (r for r in open_records if upper is None or sort_key(r) < upper)
+            else:
+                if state == "closed":
+                    total -= len(open_records)
+                elif len(ranges) == 1:
+                    # 單一清單可直接以位置跳過前面的頁
+                    records, low, high = ranges[0]
+                    ranges = [(records, low, max(high - offset, low))]
+                    offset = 0
+                stream = heapq.merge(
+                    *(newest_first(*bounds) for bounds in ranges),
+                    key=sort_key,
+                    reverse=True,
+                )
+                if state == "closed":
+                    stream = (r for r in stream if r["off_time"] is not None)
+
+            page_records = [
+                dict(record)
+                for record in itertools.islice(stream, offset, offset + limit + 1)
+            ]
+
+        next_cursor = None
+        if len(page_records) > limit:
+            page_records = page_records[:limit]
+            next_cursor = encode_cursor(page_records[-1])
+        return {
+            "total_records": total,
+            "records": page_records,
+            "next_cursor": next_cursor,
+        }
@@ -1,14 +1,11 @@
 # 標準函式庫
-import csv
+import atexit
 from collections import OrderedDict
 import datetime as dt
 from datetime import datetime
-import glob
-from io import BytesIO
 import ipaddress
 import json
 import logging
-import math
 import os
 import platform
 import psutil
@@ -18,7 +15,6 @@ import socket
 import subprocess
 import threading
 import time
-import zipfile
 
 # 第三方套件
 import requests
@@ -26,8 +22,8 @@ import pyzipper
 from dotenv import load_dotenv, set_key
 from cryptography.fernet import Fernet, InvalidToken
 from flask import (
-    Flask, g, jsonify, redirect, render_template, request, 
-    send_from_directory, send_file, session
+    Flask, Response, g, jsonify, redirect, render_template, request, 
+    send_from_directory, session
 )
 from flask_login import (
     LoginManager, current_user, login_required, logout_user
@@ -44,6 +40,10 @@ from concurrent_log_handler import ConcurrentTimedRotatingFileHandler
 load_dotenv()
 app = Flask(__name__)
 
+# all：單一行程同時輪詢 PLC 與提供網頁 (預設，gunicorn 只能開 1 個 worker)
+# poller：只輪詢並發佈狀態 (web/poller.py)；web：不輪詢，只讀取 poller 發佈的狀態
+webui_role = os.getenv("WEBUI_ROLE", "all")
+
 log_path = os.getcwd()
 web_path = f"{log_path}/web"
 snmp_path = os.path.dirname(log_path)
@@ -105,16 +105,55 @@ else:
 app.register_blueprint(auth_bp)
 
 if onLinux:
-    from web.scc_app import scc_bp
+    from web.scc_app import apply_scc_model, bind_scc_state, scc_bp, scc_model
+    from web.modbus_poll import ModbusPoller, OnDemandReads, ReadPlan, SharedOnDemandReads
+    from web.state_publisher import JsonStatePublisher, JsonStateReader
+    from web.live_stream import LiveStateBroadcaster, SnapshotCache, scrub
+    from web.alarm_store import AlarmStore
+    from web.sensor_log import SensorLogWriter
+    from web.zip_stream import collect_entries, zip_response
+    from web.log_retention import LogRetention
+    from web.rack_poller import RackGatewayClient, RackPoller, rack_hosts
+    from web.unit_view import convert_units
+    from web.bulk_write import BulkWriter, ModbusWriter, WritePlan
+    from web.static_assets import StaticAssets
 else:
-    from scc_app import scc_bp
+    from scc_app import apply_scc_model, bind_scc_state, scc_bp, scc_model
+    from modbus_poll import ModbusPoller, OnDemandReads, ReadPlan, SharedOnDemandReads
+    from state_publisher import JsonStatePublisher, JsonStateReader
+    from live_stream import LiveStateBroadcaster, SnapshotCache, scrub
+    from alarm_store import AlarmStore
+    from sensor_log import SensorLogWriter
+    from zip_stream import collect_entries, zip_response
+    from log_retention import LogRetention
+    from rack_poller import RackGatewayClient, RackPoller, rack_hosts
+    from unit_view import convert_units
+    from bulk_write import BulkWriter, ModbusWriter, WritePlan
+    from static_assets import StaticAssets
 
 app.register_blueprint(scc_bp)
+# static/dist 由 gunicorn 啟動時建置 (web/static_assets.py)
+StaticAssets(app)
 
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = "/"
 
+log_size_budget = os.environ.get("LOG_SIZE_BUDGET_MB")
+log_retention = LogRetention(
+    f"{log_path}/logs",
+    {
+        "error": (1100, None),
+        "operation": (1100, None),
+        "sensor": (1100, None),
+        "sensor_columnar": (1100, None),
+        "journal": (1100, None),
+        # logs 底下的 csv 保留三年
+        "": (365 * 3, lambda filename: filename.endswith(".csv")),
+    },
+    size_budget=int(log_size_budget) * 1024 * 1024 if log_size_budget else None,
+)
+
 journal_dir = f"{log_path}/logs/journal"
 if not os.path.exists(journal_dir):
     os.makedirs(journal_dir)
@@ -131,6 +170,7 @@ journal_handler = RotatingFileHandler(
     encoding="UTF-8",
     delay=False,
 )
+journal_handler.rotator = log_retention.rotator
 
 formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
 journal_handler.setFormatter(formatter)
@@ -151,6 +191,7 @@ errlog_handler = ConcurrentTimedRotatingFileHandler(
     backupCount=1100,
     encoding="UTF-8",
 )
+errlog_handler.rotator = log_retention.rotator
 errlog_handler.setLevel(logging.INFO)
 formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
 errlog_handler.setFormatter(formatter)
@@ -172,6 +213,7 @@ oplog_handler = ConcurrentTimedRotatingFileHandler(
     encoding="UTF-8",
     delay=False,
 )
+oplog_handler.rotator = log_retention.rotator
 oplog_handler.setLevel(logging.INFO)
 formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
 oplog_handler.setFormatter(formatter)
@@ -194,9 +236,16 @@ pc2_active = False
 get_data_timeout = 5
 tcount_log = 0
 error_data = []
-signal_records = []
-downtime_signal_records = []
-imperial_thrshd_factory = {}
+signal_store = AlarmStore(f"{web_path}/json/signal_records.json", key="signal_value")
+downtime_signal_store = AlarmStore(
+    f"{web_path}/json/downtime_signal_records.json", key="signal_name"
+)
+sensor_log_writer = SensorLogWriter(
+    f"{log_path}/logs/sensor",
+    columnar_directory=f"{log_path}/logs/sensor_columnar",
+    on_rotate=log_retention.register,
+)
+atexit.register(sensor_log_writer.close)
 imperial_valve_factory = {}
 mode_input = {}
 export_data = {}
@@ -2196,12 +2245,12 @@ all_network_set = [
     },
 ]
 
-read_data = {
-    "status": False,
-    "systemset": False,
-    "control": False,
-    "engineerMode": False,
-}
+# sensorLogFlush / sensorLogClose：請寫入 sensor log 的 poller 寫出緩衝區 / 關閉當日檔案
+on_demand_names = ["systemset", "control", "engineerMode", "sensorLogFlush", "sensorLogClose"]
+if webui_role == "all":
+    read_data = OnDemandReads(on_demand_names)
+else:
+    read_data = SharedOnDemandReads(on_demand_names, f"{web_path}/json/on_demand")
 
 
 sensor_map = {
@@ -2642,22 +2691,6 @@ def collect_allnetwork_info():
     return network_info_list
 
 
-def delete_old_logs(location, days_to_keep=1100):
-    current_time = time.time()
-
-    for subdir in ["error", "operation", "sensor", "journal"]:
-        subdir_path = os.path.join(location, subdir)
-        if os.path.isdir(subdir_path):
-            for root, dirs, files in os.walk(subdir_path):
-                for filename in files:
-                    file_path = os.path.join(root, filename)
-                    if os.path.isfile(file_path):
-                        file_age = current_time - os.path.getmtime(file_path)
-                        if file_age > days_to_keep * 86400:
-                            os.remove(file_path)
-                            print(f"Deleted old log file: {file_path}")
-
-
 def write_sensor_log():
     try:
         column_names = (
@@ -2668,208 +2701,54 @@ def write_sensor_log():
             + list(fan_status_map["fan_power"].values())
             + list(fan_status_map["fan_rpm"].values())
         )
-        log_dir = f"{log_path}/logs/sensor"
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-        log_file = f"{log_dir}/sensor.log.{datetime.now().strftime('%Y-%m-%d')}.csv"
-    except Exception as e:
-        journal_logger.info(f"create sensor log file error: {e}")
-
-    try:
-        if not os.path.exists(log_file):
-            os.makedirs(log_dir, exist_ok=True)
-        with open(log_file, mode="a", newline="") as file:
-            writer = csv.writer(file)
-
-            if file.tell() == 0:
-                writer.writerow(column_names)
-            else:
-                with open(log_file, "r") as file:
-                    file.seek(0)
-                    file.readline()
-                    last_log_date = file.readline().split(",")[0]
-                    last_log_date = last_log_date.split()[0]
-
-                    current_date = datetime.now().strftime("%Y-%m-%d")
-
-                    if current_date != last_log_date:
-                        file.close()
-
-                        log_file = f"{log_dir}/sensor.log.{current_date}.csv"
-                        with open(log_file, mode="a", newline="") as new_file:
-                            writer = csv.writer(new_file)
-                            writer.writerow(column_names)
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(log_file, mode="a", newline="") as file:
-            writer = csv.writer(file)
-            writer.writerow(
-                [timestamp]
-                + list(logData["value"].values())
-                + list(logData["setting"].values())
-                + list(logData["temporary_data"].values())
-                + list(logData["fan_power"].values())
-                + list(logData["fan_rpm"].values())
-            )
+        sensor_log_writer.write(
+            column_names,
+            list(logData["value"].values())
+            + list(logData["setting"].values())
+            + list(logData["temporary_data"].values())
+            + list(logData["fan_power"].values())
+            + list(logData["fan_rpm"].values()),
+        )
     except Exception as e:
         journal_logger.info(f"write sensor log error: {e}")
 
 
-def load_signal_records():
-    try:
-        if not os.path.exists(f"{web_path}/json/signal_records.json"):
-            with open(f"{web_path}/json/signal_records.json", "w") as file:
-                file.write("[]")
-
-        with open(f"{web_path}/json/signal_records.json", "r") as json_file:
-            global signal_records
-            signal_records = json.load(json_file)
-            if len(signal_records) > 500:
-                signal_records = signal_records[:500]
-                with open(f"{web_path}/json/signal_records.json", "w") as json_file:
-                    json.dump(signal_records, json_file, indent=4)
-    except FileNotFoundError:
-        signal_records = []
-
-
-def load_downtime_signal_records():
-    try:
-        if not os.path.exists(f"{web_path}/json/downtime_signal_records.json"):
-            with open(f"{web_path}/json/downtime_signal_records.json", "w") as file:
-                file.write("[]")
-
-        with open(f"{web_path}/json/downtime_signal_records.json", "r") as json_file:
-            global downtime_signal_records
-            downtime_signal_records = json.load(json_file)
-            if len(downtime_signal_records) > 500:
-                downtime_signal_records = downtime_signal_records[:500]
-                with open(
-                    f"{web_path}/json/downtime_signal_records.json", "w"
-                ) as json_file:
-                    json.dump(downtime_signal_records, json_file, indent=4)
-    except FileNotFoundError:
-        downtime_signal_records = []
-
-
-def save_to_json():
-    signal_records.sort(key=lambda x: x["on_time"], reverse=True)
-    if not os.path.exists(f"{web_path}/json/signal_records.json"):
-        with open(f"{web_path}/json/signal_records.json", "w") as file:
-            file.write("[]")
-
-    with open(f"{web_path}/json/signal_records.json", "w") as json_file:
-        json.dump(signal_records, json_file, indent=4)
-
-
-def save_to_downtime_json():
-    downtime_signal_records.sort(key=lambda x: x["on_time"], reverse=True)
-    if not os.path.exists(f"{web_path}/json/downtime_signal_records.json"):
-        with open(f"{web_path}/json/downtime_signal_records.json", "w") as file:
-            file.write("[]")
-
-    with open(f"{web_path}/json/downtime_signal_records.json", "w") as json_file:
-        json.dump(downtime_signal_records, json_file, indent=4)
+def sync_sensor_log(close=False):
+    """
+    讓讀取端看得到 sensor log 緩衝區內的資料，close=True 時一併關閉當日檔案。
+    寫入器在 poller 內，分開執行時請 poller 代為處理並等待完成，逾時回傳 False。
+    """
+    if webui_role == "all":
+        if close:
+            sensor_log_writer.close()
+        else:
+            sensor_log_writer.flush()
+        return True
+    name = "sensorLogClose" if close else "sensorLogFlush"
+    if not read_data.request(name, get_data_timeout):
+        print(f"{name} timeout")
+        return False
+    return True
 
 
 def record_signal_on(signal_name, singnal_value):
-    load_signal_records()
-    max_records_to_check = min(50, len(signal_records))
-    for record in signal_records[:max_records_to_check]:
-        if (
-            record["signal_value"] == singnal_value
-            and record["on_time"] is not None
-            and record["off_time"] is None
-        ):
-            return
-        # if (
-        #     record["signal_name"] == signal_name
-        #     and record["on_time"] is not None
-        #     and record["off_time"] is None
-        # ):
-        #     return
-
-    record = {
-        "signal_name": signal_name,
-        "on_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "off_time": None,
-        "signal_value": singnal_value,
-    }
-    signal_records.append(record)
-    save_to_json()
+    signal_store.signal_on(signal_name, singnal_value)
 
 
 def record_downtime_signal_on(signal_name, singnal_value):
-    load_downtime_signal_records()
-    max_records_to_check = min(50, len(downtime_signal_records))
-    for record in downtime_signal_records[:max_records_to_check]:
-        if (
-            record["signal_name"] == signal_name
-            and record["on_time"] is not None
-            and record["off_time"] is None
-        ):
-            return
-
-    record = {
-        "signal_name": signal_name,
-        "on_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "off_time": None,
-        "signal_value": singnal_value,
-    }
-    downtime_signal_records.append(record)
-    save_to_downtime_json()
+    downtime_signal_store.signal_on(signal_name, singnal_value)
 
 
 def record_signal_off(signal_name, singnal_value):
-    load_signal_records()
-    max_records_to_check = min(50, len(signal_records))
-    for record in signal_records[:max_records_to_check]:
-        if (
-            record["signal_value"] == singnal_value
-            and record["on_time"] is not None
-            and record["off_time"] is None
-        ):
-            record["off_time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            save_to_json()
-            break
+    signal_store.signal_off(signal_name, singnal_value)
 
 
 def record_downtime_signal_off(signal_name, singnal_value):
-    load_downtime_signal_records()
-    max_records_to_check = min(50, len(downtime_signal_records))
-    for record in downtime_signal_records[:max_records_to_check]:
-        if (
-            record["signal_name"] == signal_name
-            and record["on_time"] is not None
-            and record["off_time"] is None
-        ):
-            record["off_time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            save_to_downtime_json()
-            break
-
-
-def delete_old_file():
-    log_dir = f"{log_path}/logs"
-    current_date = dt.date.today()
-    one_year_ago = current_date - dt.timedelta(days=365 * 3)
-    for file in glob.glob(os.path.join(log_dir, "*.csv")):
-        modified_date = dt.date.fromtimestamp(os.path.getmtime(file))
-        if modified_date < one_year_ago:
-            os.remove(file)
+    downtime_signal_store.signal_off(signal_name, singnal_value)
 
 
 def change_to_metric():
-    for key in thrshd:
-        if not key.endswith("_trap") and not key.startswith("Delay_"):
-            if "Temp" in key:
-                thrshd[key] = (thrshd[key] - 32) * 5.0 / 9.0
-
-            if "DewPoint" in key:
-                thrshd[key] = (thrshd[key]) * 5.0 / 9.0
-
-            if "Prsr" in key:
-                thrshd[key] = thrshd[key] * 6.89476
-
-            if "Flow" in key:
-                thrshd[key] = thrshd[key] / 0.2642
+    thrshd.update(convert_units(thrshd, "thrshd", "metric"))
 
     registers = []
     index = 0
@@ -2887,98 +2766,46 @@ def change_to_metric():
 
     i = 0
     for group in grouped_register:
-        try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
-                client.write_registers(1000 + i * 64, group)
-        except Exception as e:
-            print(f"write register thrshd issue:{e}")
-            return retry_modbus(1000 + i * 64, group, "register")
+        result = write_modbus(("register", 1000 + i * 64, group))
+        if result is not True:
+            return result
         i += 1
 
-    key_list = list(ctr_data["value"].keys())
-    for key in key_list:
-        if key == "oil_temp_set":
-            ctr_data["value"]["oil_temp_set"] = (
-                (ctr_data["value"]["oil_temp_set"] - 32) / 9.0 * 5.0
-            )
-
-        if key == "oil_pressure_set":
-            ctr_data["value"]["oil_pressure_set"] = (
-                ctr_data["value"]["oil_pressure_set"] * 6.89476
-            )
+    ctr_data["value"].update(convert_units(ctr_data["value"], "control", "metric"))
 
     temp1, temp2 = cvt_float_byte(ctr_data["value"]["oil_temp_set"])
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(993, [temp2, temp1])
-            client.write_registers(226, [temp2, temp1])
-    except Exception as e:
-        print(f"write oil temp error:{e}")
-        return retry_modbus_2reg(993, [temp2, temp1], 226, [temp2, temp1])
+    result = write_modbus(
+        ("register", 993, [temp2, temp1]),
+        ("register", 226, [temp2, temp1]),
+    )
+    if result is not True:
+        return result
 
     prsr1, prsr2 = cvt_float_byte(ctr_data["value"]["oil_pressure_set"])
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(991, [prsr2, prsr1])
-            client.write_registers(224, [prsr2, prsr1])
-    except Exception as e:
-        print(f"write oil pressure error:{e}")
-        return retry_modbus_2reg(991, [prsr2, prsr1], 224, [prsr2, prsr1])
-
-    key_list = list(measure_data.keys())
-    for key in key_list:
-        if "Temp" in key:
-            measure_data[key] = (measure_data[key] - 32) * 5.0 / 9.0
-
-        if "Prsr" in key:
-            measure_data[key] = measure_data[key] * 6.89476
+    result = write_modbus(
+        ("register", 991, [prsr2, prsr1]),
+        ("register", 224, [prsr2, prsr1]),
+    )
+    if result is not True:
+        return result
 
-        if "f1" in key or "f2" in key:
-            measure_data[key] = measure_data[key] / 0.2642
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            for i, (key, value) in enumerate(measure_data.items()):
-                word1, word2 = cvt_float_byte(value)
-                registers = [word2, word1]
-                client.write_registers(901 + i * 2, registers)
-    except Exception as e:
-        print(f"measure data input error:{e}")
-        return retry_modbus(901 + i * 2, registers, "register")
+    measure_data.update(convert_units(measure_data, "measure", "metric"))
+    writes = []
+    for i, (key, value) in enumerate(measure_data.items()):
+        word1, word2 = cvt_float_byte(value)
+        writes.append(("register", 901 + i * 2, [word2, word1]))
+    result = write_modbus(*writes)
+    if result is not True:
+        return result
     
     t1 = round((float(auto_mode_setting["t1"]) - 32) * 5.0 / 9.0)
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(980, [t1])
-    except Exception as e:
-        print(f"write t1:{e}")
-        return retry_modbus(980, [t1], "register")
+    result = write_modbus(("register", 980, [t1]))
+    if result is not True:
+        return result
 
 
 def change_to_imperial():
-    key_list = list(thrshd.keys())
-    for key in key_list:
-        if not key.endswith("_trap") and not key.startswith("Delay_"):
-            if "Temp" in key:
-                thrshd[key] = thrshd[key] * 9.0 / 5.0 + 32.0
-
-            if "DewPoint" in key:
-                thrshd[key] = thrshd[key] * 9.0 / 5.0
-
-            if "Prsr" in key:
-                thrshd[key] = thrshd[key] * 0.145038
-
-            if "Flow" in key:
-                thrshd[key] = thrshd[key] * 0.2642
+    thrshd.update(convert_units(thrshd, "thrshd", "imperial"))
 
     registers = []
     index = 0
@@ -2996,158 +2823,125 @@ def change_to_imperial():
 
     i = 0
     for group in grouped_register:
-        try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
-                client.write_registers(1000 + i * 64, group)
-        except Exception as e:
-            print(f"write register thrshd issue:{e}")
-            return retry_modbus(1000 + i * 64, group, "register")
+        result = write_modbus(("register", 1000 + i * 64, group))
+        if result is not True:
+            return result
         i += 1
 
-    try:
-        word1, word2 = cvt_float_byte(ctr_data["value"]["oil_pressure_set"])
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(224, [word2, word1])
-    except Exception as e:
-        print(f"write oil pressure error:{e}")
-        return retry_modbus(224, [word2, word1], "register")
+    word1, word2 = cvt_float_byte(ctr_data["value"]["oil_pressure_set"])
+    result = write_modbus(("register", 224, [word2, word1]))
+    if result is not True:
+        return result
 
-    try:
-        word1, word2 = cvt_float_byte(ctr_data["value"]["oil_temp_set"])
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(226, [word2, word1])
-    except Exception as e:
-        print(f"write oil pressure error:{e}")
-        return retry_modbus(226, [word2, word1], "register")
-
-    key_list = list(ctr_data["value"].keys())
-    for key in key_list:
-        if key == "oil_temp_set":
-            ctr_data["value"]["oil_temp_set"] = (
-                ctr_data["value"]["oil_temp_set"] * 9.0 / 5.0 + 32.0
-            )
+    word1, word2 = cvt_float_byte(ctr_data["value"]["oil_temp_set"])
+    result = write_modbus(("register", 226, [word2, word1]))
+    if result is not True:
+        return result
 
-        if key == "oil_pressure_set":
-            ctr_data["value"]["oil_pressure_set"] = (
-                ctr_data["value"]["oil_pressure_set"] * 0.145038
-            )
+    ctr_data["value"].update(convert_units(ctr_data["value"], "control", "imperial"))
 
     temp1, temp2 = cvt_float_byte(ctr_data["value"]["oil_temp_set"])
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(993, [temp2, temp1])
-    except Exception as e:
-        print(f"write oil temp error:{e}")
-        return retry_modbus(993, [temp2, temp1], "register")
+    result = write_modbus(("register", 993, [temp2, temp1]))
+    if result is not True:
+        return result
 
     pressure1, pressure2 = cvt_float_byte(ctr_data["value"]["oil_pressure_set"])
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(991, [pressure2, pressure1])
-    except Exception as e:
-        print(f"write oil pressure error:{e}")
-        return retry_modbus(991, [pressure2, pressure1], "register")
+    result = write_modbus(("register", 991, [pressure2, pressure1]))
+    if result is not True:
+        return result
 
-    key_list = list(measure_data.keys())
-    for key in key_list:
-        if "Temp" in key:
-            measure_data[key] = measure_data[key] * 9.0 / 5.0 + 32.0
+    measure_data.update(convert_units(measure_data, "measure", "imperial"))
 
-        if "Prsr" in key:
-            measure_data[key] = measure_data[key] * 0.145038
-
-        if "f1" in key or "f2" in key:
-            measure_data[key] = measure_data[key] * 0.2642
-
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            for i, (key, value) in enumerate(measure_data.items()):
-                word1, word2 = cvt_float_byte(value)
-                registers = [word2, word1]
-                client.write_registers(901 + i * 2, registers)
-    except Exception as e:
-        print(f"measure data input error:{e}")
-        return retry_modbus(901 + i * 2, registers, "register")
+    writes = []
+    for i, (key, value) in enumerate(measure_data.items()):
+        word1, word2 = cvt_float_byte(value)
+        writes.append(("register", 901 + i * 2, [word2, word1]))
+    result = write_modbus(*writes)
+    if result is not True:
+        return result
     
     t1 = round((auto_mode_setting["t1"]) * 9.0 / 5.0 + 32.0)
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(980, [t1])
-    except Exception as e:
-        print(f"write t1:{e}")
-        return retry_modbus(980, [t1], "register")
+    result = write_modbus(("register", 980, [t1]))
+    if result is not True:
+        return result
+
+def write_settings(plan):
+    """
+    以一條連線寫入 WritePlan 並讀回比對，只重送失敗的區塊。
+    成功回傳 True；失敗回傳與 write_modbus 相同的錯誤回應。
+    """
+    result = bulk_writer.write(plan)
+    if result.ok:
+        return True
+    print(f"bulk write failed: {result.describe_failed()}")
+    return jsonify(
+        {
+            "status": "error",
+            "title": "Error",
+            "message": "Writing failed",
+        }
+    )
 
-def auto_import(data):
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_register(960, int(data["fan"]))
-            client.write_register(961, int(data["pump"]))
 
-    except Exception as e:
-        print(f"auto setting:{e}")
-        return retry_modbus(960, [int(data["fan"]), int(data["pump"])], "register")
+def auto_import(data, plan=None):
+    staged = WritePlan() if plan is None else plan
+    staged.registers(960, [int(data["fan"]), int(data["pump"])])
+    if plan is None:
+        result = write_settings(staged)
+        if result is not True:
+            return result
 
     op_logger.info(
         "Auto Mode Redundant Sensor Broken Setting Inputs received successfully"
     )
     return "Inputs received successfully"
 
-def dpt_error_import(data):
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_register(974, int(data["fan"]))
-            client.write_register(980, int(data["t1"]))
-    except Exception as e:
-        print(f"auto setting:{e}")
-        return retry_modbus_2reg(974, [int(data["fan"])], 980, int(data["t1"]))
+def dpt_error_import(data, plan=None):
+    staged = WritePlan() if plan is None else plan
+    staged.registers(974, [int(data["fan"])])
+    staged.registers(980, [int(data["t1"])])
+    if plan is None:
+        result = write_settings(staged)
+        if result is not True:
+            return result
 
     op_logger.info(
         "Dew Point Error Setting Inputs received successfully"
     )
     return "Inputs received successfully"
 
-def auto_mode_import(data):
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            fan_rpm = data["fan"] * 160
-            client.write_register(533, int(fan_rpm))
-
-    except Exception as e:
-        print(f"auto setting:{e}")
-        return retry_modbus(533, [int(fan_rpm)], "register")
+def auto_mode_import(data, plan=None):
+    staged = WritePlan() if plan is None else plan
+    fan_rpm = data["fan"] * 160
+    staged.registers(533, [int(fan_rpm)])
+    if plan is None:
+        result = write_settings(staged)
+        if result is not True:
+            return result
 
     op_logger.info(
         "Fan Speed in Auto Mode Setting successfully"
     )
     return "Inputs received successfully"
 
-def threshold_import(input):
+factory_thrshd_views = {"metric": thrshd_factory}
+
+
+def factory_thrshd_view(unit):
+    """出廠門檻值換算成 unit；thrshd_factory 是固定的公制值，英制結果只算一次"""
+    view = factory_thrshd_views.get(unit)
+    if view is None:
+        view = convert_units(thrshd_factory, "thrshd", unit)
+        factory_thrshd_views[unit] = view
+    return view
+
+
+def threshold_import(input, plan=None):
     for key, value in input.items():
         if key in thrshd:
             thrshd[key] = value
 
     registers = []
-    grouped_register = []
     coil_registers = []
     index = 0
     thr_reg = (sum(1 for key in thrshd if "Thr_" in key)) * 2
@@ -3165,28 +2959,13 @@ def threshold_import(input):
                 registers.append(int(value))
             index += 1
 
-    grouped_register = [registers[i : i + 64] for i in range(0, len(registers), 64)]
-
-    i = 0
-    for group in grouped_register:
-        try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
-                client.write_registers(1000 + i * 64, group)
-        except Exception as e:
-            print(f"write register thrshd issue:{e}")
-            return retry_modbus(1000 + i * 64, group, "register")
-        i += 1
-
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_coils((8192 + 2000), coil_registers)
-    except Exception as e:
-        print(f"write trap error: {e}")
-        return retry_modbus((8192 + 2000), coil_registers, "coil")
+    staged = WritePlan() if plan is None else plan
+    staged.registers(1000, registers)
+    staged.coils((8192 + 2000), coil_registers)
+    if plan is None:
+        result = write_settings(staged)
+        if result is not True:
+            return result
 
     for key in thrshd.keys():
         value = thrshd[key]
@@ -3195,7 +2974,7 @@ def threshold_import(input):
     return "Setting Successful"
 
 
-def adjust_import(input):
+def adjust_import(input, plan=None):
     for key, value in input.items():
         if key in sensor_adjust:
             sensor_adjust[key] = value
@@ -3207,35 +2986,33 @@ def adjust_import(input):
         word1, word2 = cvt_float_byte(value)
         registers.append(word2)
         registers.append(word1)
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(1400, registers)
-    except Exception as e:
-        print(f"write sensor adjust error:{e}")
-        return retry_modbus(1400, registers, "register")
+
+    staged = WritePlan() if plan is None else plan
+    staged.registers(1400, registers)
+    if plan is None:
+        result = write_settings(staged)
+        if result is not True:
+            return result
 
     op_logger.info("Sensor Adjust Inputs received Successfully")
 
     return "Inputs received successfully"
 
-def rack_opening_import(data):
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(370, int(data))
-    except Exception as e:
-        print(f"rack opening setting:{e}")
-        return retry_modbus(370, [int(data)], "register")
+def rack_opening_import(data, plan=None):
+    staged = WritePlan() if plan is None else plan
+    staged.registers(370, [int(data)])
+    if plan is None:
+        result = write_settings(staged)
+        if result is not True:
+            return result
 
     op_logger.info(
         "Rack Opening Setting Inputs received successfully"
     )
     return "Inputs received successfully"
 
-def pid_import(data):
+def pid_import(data, plan=None):
+    staged = WritePlan() if plan is None else plan
     for key in data.keys():
         if key in pid_order:
             register = []
@@ -3255,15 +3032,10 @@ def pid_import(data):
                         and not pid_key == "sample_time_temp"
                     ):
                         register.append(int(data[key][pid_key]))
-            try:
-                with ModbusTcpClient(
-                    host=modbus_host, port=modbus_port, unit=modbus_slave_id
-                ) as client:
-                    client.write_register(sample_time_address, int(sample_time))
-                    client.write_registers(data_start_address, register)
-            except Exception as e:
-                print(f"write pid data error:{e}")
-                return retry_modbus(data_start_address, register, "register")
+            staged.registers(sample_time_address, [int(sample_time)])
+            staged.registers(data_start_address, register)
+    if plan is None:
+        return write_settings(staged)
 
 
 def unit_import(data):
@@ -3272,28 +3044,19 @@ def unit_import(data):
     elif data == "imperial":
         coil_value = True
 
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_coil(address=(8192 + 500), value=coil_value)
-    except Exception as e:
-        print(f"write in unit error:{e}")
-        return retry_modbus((8192 + 500), coil_value, "coil")
+    result = write_modbus(("coil", (8192 + 500), coil_value))
+    if result is not True:
+        return result
 
     change_data_by_unit()
 
 
-def log_interval_import(data):
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_register(3000, data)
-
-        return "Log Interval Updated Successfully"
-    except Exception as e:
-        print(f"error:{e}")
+def log_interval_import(data, plan=None):
+    staged = WritePlan() if plan is None else plan
+    staged.registers(3000, [data])
+    if plan is None and write_settings(staged) is not True:
+        return
+    return "Log Interval Updated Successfully"
 
 
 def snmp_import(data):
@@ -3518,11 +3281,13 @@ def network_set_import(interface_name, input):
         print(f"Unexpected error: {e}")
 
 
-def read_unit():
+def read_unit(source=None):
     try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
+        if source is None:
+            source = ModbusTcpClient(
+                host=modbus_host, port=modbus_port, unit=modbus_slave_id
+            )
+        with source as client:
             r = client.read_coils(address=(8192 + 500), count=1)
 
             if r.bits[0]:
@@ -3570,261 +3335,82 @@ def change_to_adjust(key):
     return new_key
 
 
-def retry_modbus(address, value, method, max_retries=3):
-    attempt = 0
+def write_modbus(*writes):
+    """
+    以共用連線依序寫入 (method, address, value)，method 為 "register" 或 "coil"。
+    失敗時帶抖動退避重試到 plc_writer 的期限為止；全部成功回傳 True，
+    否則回傳錯誤回應。
+    """
+    outcome = plc_writer.write(writes)
+    if outcome.ok:
+        return True
+    for failed in outcome.failed:
+        print(f"write {failed.method} {failed.address} failed: {failed.error}")
+    return jsonify(
+        {
+            "status": "error",
+            "title": "Error",
+            "message": "Writing failed",
+        }
+    )
+
 
-    while attempt < max_retries:
+def update_json_restore_times():
+    # 服務重啟時結束所有未結束的告警，並順便整理 journal
+    for store in (signal_store, downtime_signal_store):
         try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
-                if method == "register":
-                    client.write_registers(address, value)
-                elif method == "coil":
-                    client.write_coils(address, value)
-                return True
+            store.close_all()
+            store.compact()
         except Exception as e:
-            attempt += 1
-            print(f"Write attempt {attempt} failed: {e}")
-            if attempt == max_retries:
-                print("Max retries reached. Write failed.")
-                return jsonify(
-                    {
-                        "status": "error",
-                        "title": "Error",
-                        "message": "Writing failed",
-                    }
-                )
+            print(f"更新 JSON 文件時發生錯誤: {e}")
 
 
-def retry_modbus_both(address_reg, value_reg, address_coil, value_coil, max_retries=3):
-    attempt = 0
+def change_data_by_unit():
+    try:
+        with ModbusTcpClient(
+            host=modbus_host, port=modbus_port, unit=modbus_slave_id
+        ) as client:
+            last_unit = client.read_coils((8192 + 501), 1, unit=modbus_slave_id)
+            current_unit = client.read_coils((8192 + 500), 1, unit=modbus_slave_id)
 
-    while attempt < max_retries:
-        try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
-                client.write_registers(address_reg, value_reg)
-                client.write_coils(address_coil, value_coil)
-                return True
-        except Exception as e:
-            attempt += 1
-            print(f"Write attempt {attempt} failed: {e}")
-            if attempt == max_retries:
-                print("Max retries reached. Write failed.")
-                return jsonify(
-                    {
-                        "status": "error",
-                        "title": "Error",
-                        "message": "Writing failed",
-                    }
-                )
+            last_unit = last_unit.bits[0]
+            current_unit = current_unit.bits[0]
+    except Exception as e:
+        print(f"unit read error:{e}")
+        return
 
+    if current_unit:
+        system_data["value"]["unit"] = "imperial"
+    else:
+        system_data["value"]["unit"] = "metric"
 
-def retry_modbus_2reg(
-    address_reg1, value_reg1, address_reg2, value_reg2, max_retries=3
-):
-    attempt = 0
+    if last_unit:
+        system_data["value"]["last_unit"] = "imperial"
+    else:
+        system_data["value"]["last_unit"] = "metric"
 
-    while attempt < max_retries:
-        try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
-                client.write_registers(address_reg1, value_reg1)
-                client.write_registers(address_reg2, value_reg2)
-                return True
-        except Exception as e:
-            attempt += 1
-            print(f"Write attempt {attempt} failed: {e}")
-            if attempt == max_retries:
-                print("Max retries reached. Write failed.")
-                return jsonify(
-                    {
-                        "status": "error",
-                        "title": "Error",
-                        "message": "Writing failed",
-                    }
-                )
+    print(f"{last_unit} -> {current_unit}")
 
+    if current_unit and current_unit != last_unit:
+        change_to_imperial()
+    elif not current_unit and current_unit != last_unit:
+        change_to_metric()
 
-def retry_modbus_2coil(
-    address_coil1, value_coil1, address_coil2, value_coil2, max_retries=3
-):
-    attempt = 0
-
-    while attempt < max_retries:
-        try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
-                client.write_coils(address_coil1, value_coil1)
-                client.write_coils(address_coil2, value_coil2)
-                return True
-        except Exception as e:
-            attempt += 1
-            print(f"Write attempt {attempt} failed: {e}")
-            if attempt == max_retries:
-                print("Max retries reached. Write failed.")
-                return jsonify(
-                    {
-                        "status": "error",
-                        "title": "Error",
-                        "message": "Writing failed",
-                    }
-                )
-
-def retry_modbus_3coil(
-    address_coil1, value_coil1, address_coil2, value_coil2, address_coil3, value_coil3,max_retries=3
-):
-    attempt = 0
-
-    while attempt < max_retries:
-        try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
-                client.write_coils(address_coil1, value_coil1)
-                client.write_coils(address_coil2, value_coil2)
-                client.write_coils(address_coil3, value_coil3)
-                return True
-        except Exception as e:
-            attempt += 1
-            print(f"Write attempt {attempt} failed: {e}")
-            if attempt == max_retries:
-                print("Max retries reached. Write failed.")
-                return jsonify(
-                    {
-                        "status": "error",
-                        "title": "Error",
-                        "message": "Writing failed",
-                    }
-                )
-
-def retry_modbus_setmode_singlecoil(address_coil, value_coil, max_retries=3):
-    attempt = 0
-
-    while attempt < max_retries:
-        try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
-                client.write_coils(address_coil, value_coil)
-                return True
-        except Exception as e:
-            attempt += 1
-            print(f"Write attempt {attempt} failed: {e}")
-            if attempt == max_retries:
-                print("Max retries reached. Write failed.")
-                return False
-
-
-def retry_modbus_setmode(
-    address_coil1, value_coil1, address_coil2, value_coil2, max_retries=3
-):
-    attempt = 0
-
-    while attempt < max_retries:
-        try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
-                client.write_coils(address_coil1, value_coil1)
-                client.write_coils(address_coil2, value_coil2)
-                return True
-        except Exception as e:
-            attempt += 1
-            print(f"Write attempt {attempt} failed: {e}")
-            if attempt == max_retries:
-                print("Max retries reached. Write failed.")
-                return False
-
-
-def update_json_restore_times():
-    try:
-        if not os.path.exists(f"{web_path}/json/signal_records.json"):
-            with open(f"{web_path}/json/signal_records.json", "w") as file:
-                file.write("[]")
-        with open(f"{web_path}/json/signal_records.json", "r") as file:
-            data = json.load(file)
-
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        for entry in data:
-            if entry["off_time"] is None:
-                entry["off_time"] = current_time
-
-        with open(f"{web_path}/json/signal_records.json", "w") as file:
-            json.dump(data, file, indent=4)
-
-    except Exception as e:
-        print(f"更新 JSON 文件時發生錯誤: {e}")
-    try:
-        if not os.path.exists(f"{web_path}/json/downtime_signal_records.json"):
-            with open(f"{web_path}/json/downtime_signal_records.json", "w") as file:
-                file.write("[]")
-        with open(f"{web_path}/json/downtime_signal_records.json", "r") as file:
-            data = json.load(file)
-
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        for entry in data:
-            if entry["off_time"] is None:
-                entry["off_time"] = current_time
-
-        with open(f"{web_path}/json/downtime_signal_records.json", "w") as file:
-            json.dump(data, file, indent=4)
-
-    except Exception as e:
-        print(f"更新 JSON 文件時發生錯誤: {e}")
-
-
-def change_data_by_unit():
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            last_unit = client.read_coils((8192 + 501), 1, unit=modbus_slave_id)
-            current_unit = client.read_coils((8192 + 500), 1, unit=modbus_slave_id)
-
-            last_unit = last_unit.bits[0]
-            current_unit = current_unit.bits[0]
-
-            if current_unit:
-                system_data["value"]["unit"] = "imperial"
-            else:
-                system_data["value"]["unit"] = "metric"
-
-            if last_unit:
-                system_data["value"]["last_unit"] = "imperial"
-            else:
-                system_data["value"]["last_unit"] = "metric"
-
-            print(f"{last_unit} -> {current_unit}")
-
-            if current_unit and current_unit != last_unit:
-                change_to_imperial()
-            elif not current_unit and current_unit != last_unit:
-                change_to_metric()
-
-            client.write_coils((8192 + 501), [current_unit])
-
-    except Exception as e:
-        print(f"unit set error:{e}")
-        return retry_modbus((8192 + 501), [current_unit], "coil")
+    return write_modbus(("coil", (8192 + 501), [current_unit]))
 
 
 def return_to_manual_when_logout():
     try:
         with ModbusTcpClient(port=modbus_port, host=modbus_host) as client:
             r = client.read_coils((8192 + 516), 1)
-            if r.bits[0]:
-                client.write_coils((8192 + 516), [False])
-                client.write_coils((8192 + 505), [True])
+            engineer = r.bits[0]
     except Exception as e:
+        # 讀不到目前模式時照舊強制切回 manual
         print(f"return to manual error:{e}")
-        retry_modbus_2coil((8192 + 516), [False], (8192 + 505), [True])
+        engineer = True
+
+    if engineer:
+        write_modbus(("coil", (8192 + 516), [False]), ("coil", (8192 + 505), [True]))
 
 
 def cvt_registers_to_float(reg1, reg2):
@@ -3846,77 +3432,28 @@ def cvt_float_byte(value):
     return word1, word2
 
 
-def set_mode(value_to_write):
-    coil_value = False
-
-    if value_to_write == "auto":
-        coil_value = False
-    else:
-        coil_value = True
-
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_coil((8192 + 505), coil_value)
-    except Exception as e:
-        print(f"set op mode:{e}")
-        return retry_modbus_setmode_singlecoil((8192 + 505), coil_value)
-
-    if value_to_write == "engineer":
-        coil_value = True
-    else:
-        coil_value = False
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_coil((8192 + 516), coil_value)
-    except Exception as e:
-        print(f"set engineer mode:{e}")
-        return retry_modbus_setmode_singlecoil((8192 + 516), coil_value)
-
-    if value_to_write == "inspection":
-        coil_value = True
-    else:
-        coil_value = False
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_coil((8192 + 517), coil_value)
-    except Exception as e:
-        print(f"set inspection mode:{e}")
-        return retry_modbus_setmode_singlecoil((8192 + 517), coil_value)
+MODE_RUNNING = ("auto", "manual", "engineer", "inspection")
 
-    if value_to_write == "auto":
-        coil_value = True
-    elif value_to_write == "manual":
-        coil_value = True
-    elif value_to_write == "stop":
-        coil_value = False
-    elif value_to_write == "engineer":
-        coil_value = True
-    elif value_to_write == "inspection":
-        coil_value = True
-    else:
-        coil_value = False
 
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_coil(address=(8192 + 514), value=coil_value)
-            client.write_coil((8192 + 600), result_data["force_change_mode"])
-    except Exception as e:
-        print(f"setting force change mode and set mode error:{e}")
-        return retry_modbus_setmode(
-            (8192 + 514), coil_value, (8192 + 600), result_data["force_change_mode"]
-        )
+def set_mode(value_to_write):
+    # 505: auto / manual，516: engineer，517: inspection，514: 運轉 (stop 以外)
+    outcome = plc_writer.write(
+        [
+            ("coil", (8192 + 505), [value_to_write != "auto"]),
+            ("coil", (8192 + 516), [value_to_write == "engineer"]),
+            ("coil", (8192 + 517), [value_to_write == "inspection"]),
+            ("coil", (8192 + 514), [value_to_write in MODE_RUNNING]),
+            ("coil", (8192 + 600), [result_data["force_change_mode"]]),
+        ]
+    )
+    if not outcome.ok:
+        print(f"set mode error: {outcome.failed}")
+        return False
 
     op_logger.info("Mode Updated Successfully. Mode: %s", value_to_write)
     return True
 
+
 ### 轉換 freq
 def translate_pump_speed(speed):
     ps = (float(speed)) / 100 * 16000.0
@@ -3932,119 +3469,132 @@ def translate_fan_speed(speed):
 
 def set_p1_reg(speed):
     speed1, speed2 = cvt_float_byte(speed)
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(246, [speed2, speed1])
-        op_logger.info("Pump Speed Updated Successfully. Pump1 Speed: %s", speed)
-    except Exception as e:
-        print(f"pump speed reg setting error:{e}")
-        return retry_modbus(246, speed, "register")
+    result = write_modbus(("register", 246, [speed2, speed1]))
+    if result is not True:
+        return result
+    op_logger.info("Pump Speed Updated Successfully. Pump1 Speed: %s", speed)
 
 
 def set_p1(speed):
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_register((20480 + 6660), speed)
-    except Exception as e:
-        print(f"pump speed 1 setting error:{e}")
-        return retry_modbus((20480 + 6660), speed, "register")
+    return write_modbus(("register", (20480 + 6660), speed))
 
 
 def set_p2(speed):
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers((20480 + 6700), speed)
-    except Exception as e:
-        print(f"pump speed 2 setting error:{e}")
-        return retry_modbus((20480 + 6700), speed, "register")
+    return write_modbus(("register", (20480 + 6700), speed))
 
 
 def set_p3(speed):
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers((20480 + 6740), speed)
-    except Exception as e:
-        print(f"pump speed setting error:{e}")
-        return retry_modbus((20480 + 6740), speed, "register")
+    return write_modbus(("register", (20480 + 6740), speed))
 
 
 def set_fan_reg(speed):
     fan1, fan2 = cvt_float_byte(speed)
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(470, [fan2, fan1])
-        op_logger.info("Pump Speed Updated Successfully. Pump1 Speed: %s", speed)
-    except Exception as e:
-        print(f"fan speed setting error:{e}")
-        return retry_modbus(470, speed, "register")
+    result = write_modbus(("register", 470, [fan2, fan1]))
+    if result is not True:
+        return result
+    op_logger.info("Pump Speed Updated Successfully. Pump1 Speed: %s", speed)
 
 
 def set_fan1(speed):
     base_addr = 20480
     offsets = [7020, 7060, 7100, 7140]
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            for offset in offsets:
-                client.write_register(base_addr + offset, speed)
-    except Exception as e:
-        print(f"Fan speed1 setting error:{e}")
-        for offset in offsets:
-            result = retry_modbus(20480 + offset, [speed], "register")
-            if isinstance(result, dict) and result.get("status") == "error":
-                return result
-        return any(result)
+    return write_modbus(
+        *[("register", base_addr + offset, speed) for offset in offsets]
+    )
 
 
 def set_fan2(speed):
     base_addr = 20480
     offsets = [7380, 7420, 7460, 7500]
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            for offset in offsets:
-                client.write_register(base_addr + offset, speed)
-    except Exception as e:
-        print(f"Fan speed2 setting error:{e}")
-        for offset in offsets:
-            result = retry_modbus(20480 + offset, [speed], "register")
-            if isinstance(result, dict) and result.get("status") == "error":
-                return result
-        return any(result)
+    return write_modbus(
+        *[("register", base_addr + offset, speed) for offset in offsets]
+    )
 
 
 def set_p_check(p_check):
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_coils((8192 + 820), p_check)
-    except Exception as e:
-        print(f"Pump speed setting error:{e}")
-        return retry_modbus((8192 + 820), p_check, "coil")
+    return write_modbus(("coil", (8192 + 820), p_check))
 
 
 def set_f_check(f_check):
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_coils((8192 + 850), f_check)
-    except Exception as e:
-        print(f"Pump speed setting error:{e}")
-        return retry_modbus((8192 + 850), f_check, "coil")
+    return write_modbus(("coil", (8192 + 850), f_check))
+
+
+def build_poll_plan():
+    """
+    read_modbus_data 每輪固定讀取的位址，由 ModbusPoller 合併成 bulk 請求。
+    engineerMode / systemset 等按需讀取的位址不列入，會走同一條連線即時讀取。
+    """
+    def reg_count(keys):
+        return (keys // 16) + (1 if keys % 16 != 0 else 0)
+
+    plan = ReadPlan()
+    # PLC 連線檢查、版號、設定值
+    plan.add("hr", 0, 10).add("hr", 990, 1).add("hr", 3000, 1)
+    plan.add("hr", 991, 2).add("hr", 993, 2).add("hr", 303, 2)
+    plan.add("hr", 973, 1).add("hr", 740, 1)
+    # 感測值與臨時 log
+    plan.add("hr", 5000, len(sensorData["value"]) * 2)
+    plan.add("hr", 7000, 4)
+    plan.add("hr", 7004, len(sensorData["temporary_data"]) * 2)
+    plan.add("hr", 7016, len(sensorData["fan_power"]) * 2)
+    plan.add("hr", 7032, len(sensorData["fan_rpm"]) * 2)
+    # 轉速、運轉時間、校正值
+    plan.add("hr", 246, 2).add("hr", 470, 2).add("hr", 200, 6).add("hr", 350, 18)
+    plan.add("hr", 1400, len(sensor_adjust) * 2)
+    plan.add("hr", 1404, 2).add("hr", 1416, 2).add("hr", 1424, 2)
+    # 變頻器頻率
+    for address in (6660, 6700, 6740, 7020, 7060, 7100, 7140, 7380, 7420, 7460, 7500):
+        plan.add("hr", 20480 + address, 1)
+    # warning / alert / error / rack 狀態位元
+    plan.add("hr", 1700, reg_count(len(sensorData["warning"])))
+    plan.add("hr", 1705, reg_count(len(sensorData["alert"])))
+    plan.add("hr", 1708, reg_count(len(sensorData["error"]) - 1))
+    plan.add("hr", 1715, reg_count(len(sensorData["rack"])))
+
+    plan.add("coil", 8192 + 700, 1).add("coil", 8192 + 10, 2)
+    plan.add("coil", 2, 2).add("coil", 5, 1).add("coil", 10, 2)
+    plan.add("coil", 8192 + 803, 11).add("coil", 8192 + 500, 1)
+    for address in (505, 514, 516, 517):
+        plan.add("coil", 8192 + address, 1)
+    plan.add("coil", 8192 + 820, 3).add("coil", 8192 + 850, 8)
+    plan.add("coil", 8192 + 710, 10).add("coil", 8192 + 720, 10)
+    plan.add("coil", 8192 + 730, 10)
+
+    plan.add("di", 27, 5)
+    return plan
+
+
+poll_plan = build_poll_plan()
+modbus_poller = ModbusPoller(modbus_host, modbus_port, unit=modbus_slave_id)
+bulk_writer = BulkWriter(modbus_host, modbus_port, unit=modbus_slave_id)
+plc_writer = ModbusWriter(modbus_host, modbus_port, unit=modbus_slave_id)
+state_publisher = JsonStatePublisher(f"{web_path}/json")
+live_stream = LiveStateBroadcaster()
+sensor_snapshot = SnapshotCache()
+# poller 發佈、web worker 讀回的狀態；web 端以就地更新的方式同步這些 dict
+shared_state = {
+    "sensor_data.json": sensorData,
+    "ctr_data.json": ctr_data,
+    "system_data.json": system_data,
+    "measure_data.json": measure_data,
+    "version.json": ver_switch,
+    "poll_status.json": modbus_poller.status,
+    "state_thrshd.json": thrshd,
+    "state_sensor_adjust.json": sensor_adjust,
+    "state_pid_setting.json": pid_setting,
+    "state_inspection_time.json": inspection_time,
+    "state_auto_setting.json": auto_setting,
+    "state_dpt_error_setting.json": dpt_error_setting,
+    "state_auto_mode_setting.json": auto_mode_setting,
+    "state_rack_opening_setting.json": rack_opening_setting,
+    "state_sampling_rate.json": sampling_rate,
+    "scc_plc.json": scc_model,
+    "state_setting_limit.json": setting_limit,
+    "state_error_data.json": error_data,
+}
+if webui_role != "all":
+    # on-demand 讀取的完成時間跟著狀態一起發佈，web worker 讀回後才喚醒請求
+    shared_state["state_on_demand.json"] = read_data.done
 
 
 def read_modbus_data():
@@ -4058,12 +3608,9 @@ def read_modbus_data():
         previous_error_states, \
         previous_rack_states, \
         previous_warning_states
-    current_date = datetime.now().strftime("%Y-%m-%d")
-    last_date = datetime.now().strftime("%Y-%m-%d")
     flag = False
     sensorData["error"]["PLC"] = False
     start_time = time.time()
-    check_file_age = 0
     plc_status_cnt = 0
     plc_status_cnt = 0
     error_count = 0
@@ -4072,10 +3619,11 @@ def read_modbus_data():
     rack_count = 0
 
     while True:
+        # control 頁面的資料整輪都會讀到，在本輪開始前取走請求才算是請求之後的讀取
+        control_read = read_data.begin("control")
         try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
+            cycle = modbus_poller.poll(poll_plan)
+            with cycle as client:
                 r = client.read_holding_registers(0, 10)
                 if r.isError():
                     journal_logger.info(f"connect error: {r}")
@@ -4103,23 +3651,21 @@ def read_modbus_data():
                     prev_plc_error = True  # 記錄錯誤狀態
                     print(f"plc connection error: {e}")
 
+            if control_read:
+                read_data.fail("control")
             time.sleep(1)
             continue
 
         ### 從modbus讀取PLC的版號
         try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
+            with cycle as client:
                 r = client.read_holding_registers(990, 1)
                 sensorData["plc_version"] = r.registers[0]
         except Exception as e:
             print(f"plc version error: {e}")
     
         try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
+            with cycle as client:
                 read_oc = client.read_coils((8192 + 700), 1)
                 ctr_data["downtime_error"]["oc_issue"] = read_oc.bits[0]
 
@@ -4156,20 +3702,12 @@ def read_modbus_data():
                 ver_switch["leakage_sensor_3_switch"] = read_ver.bits[8]
                 ver_switch["leakage_sensor_4_switch"] = read_ver.bits[9]
                 ver_switch["leakage_sensor_5_switch"] = read_ver.bits[10]
-                
-                if not os.path.exists(f"{web_path}/json/version.json"):
-                    with open(f"{web_path}/json/version.json", "w") as file:
-                        file.write("")
-                with open(f"{web_path}/json/version.json", "w") as json_file:
-                    json.dump(ver_switch, json_file, indent=4)
-                    
+
         except Exception as e:
             print(f"read oc issue error: {e}")
 
         try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
+            with cycle as client:
                 read_sec = client.read_holding_registers(3000, 1, unit=modbus_slave_id)
                 sampling_rate["number"] = read_sec.registers[0]
 
@@ -4206,7 +3744,7 @@ def read_modbus_data():
             print(f"read sampling rate error:{e}")
 
         try:
-            with ModbusTcpClient(host=modbus_host, port=modbus_port) as client:
+            with cycle as client:
                 r = client.read_discrete_inputs(27, 5, unit=modbus_slave_id)
                 sensorData["mc"]["mc1_sw"] = r.bits[0]
                 sensorData["mc"]["mc2_sw"] = r.bits[1]
@@ -4217,9 +3755,7 @@ def read_modbus_data():
             print(f"read mc error: {e}")
 
         try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
+            with cycle as client:
                 value_reg = (len(sensorData["value"].keys())) * 2
                 r = client.read_holding_registers(5000, value_reg, unit=modbus_slave_id)
 
@@ -4237,9 +3773,7 @@ def read_modbus_data():
         # sensorData["value"]['fan_freq1']=5
         # 測試用開始
         try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
+            with cycle as client:
                 value_reg = (len(sensorData["eletricity"].keys())) * 2
                 r = client.read_holding_registers(7000, 4, unit=modbus_slave_id)
                 keys_list = list(sensorData["eletricity"].keys())
@@ -4255,9 +3789,7 @@ def read_modbus_data():
         # 測試用結束
         # 臨時log開始
         try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
+            with cycle as client:
                 value_reg = (len(sensorData["temporary_data"].keys())) * 2
                 r = client.read_holding_registers(7004, value_reg, unit=modbus_slave_id)
                 keys_list = list(sensorData["temporary_data"].keys())
@@ -4270,9 +3802,7 @@ def read_modbus_data():
         except Exception as e:
             print(f"read temporary data error:{e}")
         try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
+            with cycle as client:
                 value_reg = (len(sensorData["fan_power"].keys())) * 2
                 r = client.read_holding_registers(7016, value_reg, unit=modbus_slave_id)
                 keys_list = list(sensorData["fan_power"].keys())
@@ -4288,9 +3818,7 @@ def read_modbus_data():
             print(f"read fan power data error:{e}")
             
         try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
+            with cycle as client:
                 value_reg = (len(sensorData["fan_rpm"].keys())) * 2
                 r = client.read_holding_registers(7032, value_reg, unit=modbus_slave_id)
                 keys_list = list(sensorData["fan_rpm"].keys())
@@ -4305,9 +3833,7 @@ def read_modbus_data():
         
         # 臨時log結束
         try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
+            with cycle as client:
                 r = client.read_coils(address=(8192 + 500), count=1)
 
                 if not r.isError():
@@ -4416,20 +3942,10 @@ def read_modbus_data():
             tcount_log = 0
             start_time = time.time()
 
-        current_date = datetime.now().strftime("%Y-%m-%d")
-        if current_date != last_date:
-            delete_old_file()
-        last_date = datetime.now().strftime("%Y-%m-%d")
-
-        if check_file_age > 60:
-            delete_old_logs(f"{log_path}/logs")
-            check_file_age = 0
-        check_file_age += 1
+        log_retention.maybe_sweep()
 
         try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
+            with cycle as client:
                 r = client.read_holding_registers(1404, 2, unit=modbus_slave_id)
                 r2 = client.read_holding_registers(1416, 2, unit=modbus_slave_id)
                 r3 = client.read_holding_registers(1424, 2, unit=modbus_slave_id)
@@ -4486,11 +4002,9 @@ def read_modbus_data():
         except Exception as e:
             print(f"read temp spare adjust error:{e}")
 
-        read_unit()
+        read_unit(cycle)
         try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
+            with cycle as client:
                 r = client.read_coils(address=(8192 + 514), count=1)
 
                 if r.isError():
@@ -4533,9 +4047,7 @@ def read_modbus_data():
 
         try:
             ### 轉換 freq
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
+            with cycle as client:
                 inv1 = client.read_holding_registers(address=(20480 + 6660), count=1)
                 inv2 = client.read_holding_registers(address=(20480 + 6700), count=1)
                 inv3 = client.read_holding_registers(address=(20480 + 6740), count=1)
@@ -4703,9 +4215,7 @@ def read_modbus_data():
             print(f"read inv_en error:{e}")
 
         try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
+            with cycle as client:
                 r = client.read_holding_registers(address=246, count=2)
                 ps = cvt_registers_to_float(r.registers[0], r.registers[1])
 
@@ -4787,9 +4297,7 @@ def read_modbus_data():
                 if v:
                     address = inv_addresses.get(k)
                     try:
-                        with ModbusTcpClient(
-                            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-                        ) as client:
+                        with cycle as client:
                             r = client.read_holding_registers(
                                 address=(20480 + address), count=1
                             )
@@ -4833,9 +4341,7 @@ def read_modbus_data():
                 if v:
                     address = fan_inv_addresses.get(k)
                     try:
-                        with ModbusTcpClient(
-                            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-                        ) as client:
+                        with cycle as client:
                             r = client.read_holding_registers(
                                 address=(20480 + address), count=1
                             ) 
@@ -4862,9 +4368,7 @@ def read_modbus_data():
         ### 讀取pump runtime
         
         try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
+            with cycle as client:
                 r = client.read_holding_registers(address=200, count=6)
 
                 p1 = read_split_register(r.registers, 0)
@@ -4879,9 +4383,7 @@ def read_modbus_data():
         ### 讀取 fan runtime
 
         try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
+            with cycle as client:
                 r = client.read_holding_registers(address=350, count=18)
 
                 f1 = read_split_register(r.registers, 0)
@@ -4907,9 +4409,7 @@ def read_modbus_data():
             print(f"read pump runtime error: {e}")
 
         try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
+            with cycle as client:
                 read_rack = client.read_coils((8192 + 720), 10)
                 for i, (k, v) in enumerate(ctr_data["rack_set"].items()):
                     result_key = k.replace("_sw", "_sw_result")
@@ -4928,9 +4428,7 @@ def read_modbus_data():
             print(f"read rack control: {e}")
 
         try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
+            with cycle as client:
                 adjust_len = len(sensor_adjust.keys()) * 2
                 result = client.read_holding_registers(
                     1400, adjust_len, unit=modbus_slave_id
@@ -4958,9 +4456,7 @@ def read_modbus_data():
         error_data.clear()
 
         try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
+            with cycle as client:
                 warning_key_len = len(sensorData["warning"].keys())
                 warning_reg = (warning_key_len // 16) + (
                     1 if warning_key_len % 16 != 0 else 0
@@ -5022,9 +4518,7 @@ def read_modbus_data():
             print(f"read warning error issue:{e}")
 
         try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
+            with cycle as client:
                 alert_key_len = len(sensorData["alert"].keys())
                 alert_reg = (alert_key_len // 16) + (
                     1 if alert_key_len % 16 != 0 else 0
@@ -5090,9 +4584,7 @@ def read_modbus_data():
             print(f"read alert error issue:{e}")
 
         try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
+            with cycle as client:
                 err_key_len = len(sensorData["error"].keys()) - 1
                 err_reg = (err_key_len // 16) + (1 if err_key_len % 16 != 0 else 0)
                 result = client.read_holding_registers(
@@ -5281,9 +4773,7 @@ def read_modbus_data():
             print(f"read error issue:{e}")
             
         try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
+            with cycle as client:
                 rack_key_len = len(sensorData["rack"].keys())
                 rack_reg = (rack_key_len // 16) + (1 if rack_key_len % 16 != 0 else 0)
                 result = client.read_holding_registers(
@@ -5345,10 +4835,11 @@ def read_modbus_data():
             print(f"read rack error issue:{e}")
 
         # sensorData["error"] = False
-        read_data["control"] = False
+        if control_read:
+            read_data.complete("control")
 
-        if read_data["engineerMode"]:
-            read_unit()
+        if read_data.begin("engineerMode"):
+            read_unit(cycle)
             try:
                 thr_reg = (sum(1 for key in thrshd if "Thr_" in key)) * 2
                 delay_reg = sum(1 for key in thrshd if "Delay_" in key)
@@ -5357,9 +4848,7 @@ def read_modbus_data():
                 total_registers = thr_reg
                 read_num = 120
 
-                with ModbusTcpClient(
-                    host=modbus_host, port=modbus_port, unit=modbus_slave_id
-                ) as client:
+                with cycle as client:
                     for counted_num in range(0, total_registers, read_num):
                         count = min(read_num, total_registers - counted_num)
                         result = client.read_holding_registers(
@@ -5391,9 +4880,7 @@ def read_modbus_data():
                                     thrshd[keys_list[j]] = decoded_value_big_endian
                                     j += 1
 
-                with ModbusTcpClient(
-                    host=modbus_host, port=modbus_port, unit=modbus_slave_id
-                ) as client:
+                with cycle as client:
                     result = client.read_holding_registers(
                         1000 + thr_reg, delay_reg, unit=modbus_slave_id
                     )
@@ -5407,9 +4894,7 @@ def read_modbus_data():
                             thrshd[keys_list[j]] = result.registers[i]
                             j += 1
 
-                with ModbusTcpClient(
-                    host=modbus_host, port=modbus_port, unit=modbus_slave_id
-                ) as client:
+                with cycle as client:
                     r = client.read_coils((8192 + 2000), trap_reg)
 
                     if r.isError():
@@ -5428,9 +4913,7 @@ def read_modbus_data():
                 flag = True
 
             try:
-                with ModbusTcpClient(
-                    host=modbus_host, port=modbus_port, unit=modbus_slave_id
-                ) as client:
+                with cycle as client:
                     r = client.read_holding_registers(510, 1, unit=modbus_slave_id)
 
                     pid_setting["pressure"]["sample_time_pressure"] = r.registers[0]
@@ -5445,9 +4928,7 @@ def read_modbus_data():
                 print(f"read pid pressure error:{e}")
                 flag = True
             try:
-                with ModbusTcpClient(
-                    host=modbus_host, port=modbus_port, unit=modbus_slave_id
-                ) as client:
+                with cycle as client:
                     r = client.read_holding_registers(960, 2, unit=modbus_slave_id)
 
                     auto_setting["auto_broken_temperature"] = r.registers[0]
@@ -5457,9 +4938,7 @@ def read_modbus_data():
                 flag = True
                 
             try:
-                with ModbusTcpClient(
-                    host=modbus_host, port=modbus_port, unit=modbus_slave_id
-                ) as client:
+                with cycle as client:
                     r = client.read_holding_registers(974, 1, unit=modbus_slave_id)
                     r2 = client.read_holding_registers(980, 1, unit=modbus_slave_id)
                     dpt_error_setting["dpt_error_fan"] = r.registers[0]
@@ -5469,9 +4948,7 @@ def read_modbus_data():
                 flag = True
                 
             try:
-                with ModbusTcpClient(
-                    host=modbus_host, port=modbus_port, unit=modbus_slave_id
-                ) as client:
+                with cycle as client:
                     r = client.read_holding_registers(533, 1, unit=modbus_slave_id)
                     fan_speed = r.registers[0] / 160
                     auto_mode_setting["auto_mode_fan"] = fan_speed
@@ -5480,9 +4957,7 @@ def read_modbus_data():
                 flag = True
                 
             try:
-                with ModbusTcpClient(
-                    host=modbus_host, port=modbus_port, unit=modbus_slave_id
-                ) as client:
+                with cycle as client:
                     r = client.read_holding_registers(370, 1, unit=modbus_slave_id)
 
                     rack_opening_setting["setting_value"] = r.registers[0]
@@ -5491,9 +4966,7 @@ def read_modbus_data():
                 flag = True
 
             try:
-                with ModbusTcpClient(
-                    host=modbus_host, port=modbus_port, unit=modbus_slave_id
-                ) as client:
+                with cycle as client:
                     r = client.read_holding_registers(550, 1, unit=modbus_slave_id)
 
                     pid_setting["temperature"]["sample_time_temp"] = r.registers[0]
@@ -5511,59 +4984,35 @@ def read_modbus_data():
             with open(f"{web_path}/json/pid_setting.json", "w") as json_file:
                 json.dump(pid_setting, json_file)
 
-        if read_data["systemset"]:
+            if flag:
+                read_data.fail("engineerMode")
+            else:
+                read_data.complete("engineerMode")
+
+        if read_data.begin("systemset"):
             try:
-                with ModbusTcpClient(
-                    host=modbus_host, port=modbus_port, unit=modbus_slave_id
-                ) as client:
+                with cycle as client:
                     r = client.read_coils(address=(8192 + 500), count=1)
                     system_data["value"]["unit"] = "imperial" if r.bits[0] else "metric"
 
             except Exception as e:
                 print(f"unit error:{e}")
 
-            read_data["systemset"] = False
-
-        read_data["engineerMode"] = flag
-
-        flag = False
-
-        try:
-            if not os.path.exists(f"{web_path}/json/sensor_data.json"):
-                with open(f"{web_path}/json/sensor_data.json", "w") as file:
-                    file.write("")
-            with open(f"{web_path}/json/sensor_data.json", "w") as json_file:
-                json.dump(sensorData, json_file, indent=4)
-        except Exception as e:
-            print(f"sensor_data.json:{e}")
+            read_data.complete("systemset")
 
-        try:
-            if not os.path.exists(f"{web_path}/json/ctr_data.json"):
-                with open(f"{web_path}/json/ctr_data.json", "w") as file:
-                    file.write("")
-            with open(f"{web_path}/json/ctr_data.json", "w") as json_file2:
-                json.dump(ctr_data, json_file2, indent=4)
-        except Exception as e:
-            print(f"ctr_data.json:{e}")
+        if read_data.begin("sensorLogFlush"):
+            sensor_log_writer.flush()
+            read_data.complete("sensorLogFlush")
 
-        try:
-            if not os.path.exists(f"{web_path}/json/system_data.json"):
-                with open(f"{web_path}/json/system_data.json", "w") as file:
-                    file.write("")
+        if read_data.begin("sensorLogClose"):
+            sensor_log_writer.close()
+            read_data.complete("sensorLogClose")
 
-            with open(f"{web_path}/json/system_data.json", "w") as json_file3:
-                json.dump(system_data, json_file3, indent=4)
-        except Exception as e:
-            print(f"system_data.json:{e}")
+        flag = False
 
-        try:
-            if not os.path.exists(f"{web_path}/json/measure_data.json"):
-                with open(f"{web_path}/json/measure_data.json", "w") as file:
-                    file.write("")
-            with open(f"{web_path}/json/measure_data.json", "w") as json_file3:
-                json.dump(measure_data, json_file3, indent=4)
-        except Exception as e:
-            print(f"measure_data.json:{e}")
+        state_publisher.publish_all(shared_state)
+        sensor_snapshot.update(sensorData)
+        live_stream.update({"data": sensorData, "version": ver_switch})
 
         time.sleep(0.9)
 
@@ -5656,36 +5105,24 @@ class LogManager:
         end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
         today = datetime.now().date()
 
-        zip_buffer = BytesIO()
+        def in_range(file):
+            if file == self.filename_current:
+                file_date = today
+            else:
+                file_date_str = file.rsplit(".", 1)[-1]
+                file_date = datetime.strptime(file_date_str, "%Y-%m-%d").date()
+            return start_date <= file_date <= end_date
 
-        with zipfile.ZipFile(zip_buffer, "w") as zip_file:
-            for directory, is_old in [(self.current_dir, False), (self.old_dir, True)]:
-                if not os.path.exists(directory):
-                    continue
-                if is_old and current_user.id != "superuser":
-                    continue
-                for file in os.listdir(directory):
-                    try:
-                        file_path = os.path.join(directory, file)
-                        if file == self.filename_current:
-                            file_date = today
-                        else:
-                            file_date_str = file.rsplit(".", 1)[-1]
-                            file_date = datetime.strptime(file_date_str, "%Y-%m-%d").date()
-
-                        if start_date <= file_date <= end_date:
-                            arcname = f"old_{self.log_type}/{file}" if is_old else file
-                            zip_file.write(file_path, arcname=arcname)
-                    except (IndexError, ValueError):
-                        continue
-
-        zip_buffer.seek(0)
-
-        return send_file(
-            zip_buffer,
-            mimetype="application/zip",
-            as_attachment=True,
-            download_name=f"{self.log_type}logs_{start_date_str}_to_{end_date_str}.zip",
+        entries = collect_entries(self.current_dir, in_range)
+        if current_user.id == "superuser":
+            entries += collect_entries(
+                self.old_dir, in_range, prefix=f"old_{self.log_type}/"
+            )
+
+        return zip_response(
+            Response,
+            entries,
+            f"{self.log_type}logs_{start_date_str}_to_{end_date_str}.zip",
         )
 
     @staticmethod
@@ -5736,6 +5173,7 @@ def download_sensor_logs(filename):
         print(f'403')
 
     base_dir = os.path.join(log_path, "logs", "old_sensor") if archive else os.path.join(log_path, "logs", "sensor")
+    sync_sensor_log()
     return send_from_directory(base_dir, filename, as_attachment=True)
 
 @app.route("/download_logs/sensor/<date_range>")
@@ -5747,43 +5185,21 @@ def download_sensorlogs_by_range(date_range):
     start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
     end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
 
-    zip_buffer = BytesIO()
-
-    with zipfile.ZipFile(zip_buffer, "w") as zip_file:
-        files = os.listdir(f"{log_path}/logs/sensor")
+    def in_range(file):
+        file_date_str = file.rsplit(".")[2]
+        file_date = datetime.strptime(file_date_str, "%Y-%m-%d")
+        return start_date <= file_date <= end_date
 
-        for file in files:
-            try:
-                file_date_str = file.rsplit(".")[2]
-                file_date = datetime.strptime(file_date_str, "%Y-%m-%d")
+    sync_sensor_log()
+    entries = collect_entries(f"{log_path}/logs/sensor", in_range)
+    # ✅ Superuser 的額外處理：logs/old_sensor/，放在子資料夾中讓 zip 結構清晰
+    if current_user.id == "superuser":
+        entries += collect_entries(
+            os.path.join(log_path, "logs", "old_sensor"), in_range, prefix="old_sensor/"
+        )
 
-                if start_date <= file_date <= end_date:
-                    zip_file.write(f"{log_path}/logs/sensor/{file}", arcname=file)
-            except (IndexError, ValueError):
-                continue
-        # ✅ Superuser 的額外處理：logs/old_sensor/
-        if current_user.id == "superuser":
-            old_sensor_dir = os.path.join(log_path, "logs", "old_sensor")
-            if os.path.exists(old_sensor_dir):
-                old_files = os.listdir(old_sensor_dir)
-                for file in old_files:
-                    try:
-                        file_date_str = file.rsplit(".")[2]
-                        file_date = datetime.strptime(file_date_str, "%Y-%m-%d")
-
-                        if start_date <= file_date <= end_date:
-                            # arcname 放在子資料夾中，讓 zip 結構清晰
-                            arcname = f"old_sensor/{file}"
-                            zip_file.write(os.path.join(old_sensor_dir, file), arcname=arcname)
-                    except (IndexError, ValueError):
-                        continue
-    zip_buffer.seek(0)
-
-    return send_file(
-        zip_buffer,
-        mimetype="application/zip",
-        as_attachment=True,
-        download_name=f"sensorlogs_{start_date_str}_to_{end_date_str}.zip",
+    return zip_response(
+        Response, entries, f"sensorlogs_{start_date_str}_to_{end_date_str}.zip"
     )
 
 
@@ -5892,28 +5308,38 @@ def engineerMode():
 @app.route("/get_data")
 @login_required
 def get_data():
-    keys_list = list(sensorData["value"].keys())
+    snapshot = sensor_snapshot.current()
+    if snapshot is None:
+        # poller 尚未完成第一輪；與 snapshot 相同把 NaN 換成 0
+        return jsonify(scrub(sensorData))
 
-    for key in keys_list:
-        if isinstance(sensorData["value"][key], float) and math.isnan(
-            sensorData["value"][key]
-        ):
-            sensorData["value"][key] = 0
+    headers = {"ETag": f'"{snapshot.etag}"', "Cache-Control": "no-cache"}
+    if request.if_none_match.contains(snapshot.etag):
+        return Response(status=304, headers=headers)
+
+    headers["Vary"] = "Accept-Encoding"
+    body = snapshot.body
+    if snapshot.gzip_body is not None and "gzip" in request.accept_encodings:
+        body = snapshot.gzip_body
+        headers["Content-Encoding"] = "gzip"
+    return Response(body, mimetype="application/json", headers=headers)
 
-    return jsonify(sensorData)
+
+@app.route("/stream_data")
+@login_required
+def stream_data():
+    return Response(
+        live_stream.stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.route("/get_data_engineerMode")
 @login_required
 def get_data_engineerMode():
-    read_data["engineerMode"] = True
-    timeout = get_data_timeout
-    start_time = time.time()
-    while read_data["engineerMode"]:
-        if time.time() - start_time > timeout:
-            read_data["engineerMode"] = False
-            return jsonify({"error": "Request timeout"}), 504
-        time.sleep(0.5)
+    if not read_data.request("engineerMode", get_data_timeout):
+        return jsonify({"error": "Request timeout"}), 504
 
     return jsonify(
         {
@@ -5935,14 +5361,8 @@ def get_data_engineerMode():
 @app.route("/get_data_control")
 @login_required
 def get_data_control():
-    read_data["control"] = True
-    timeout = get_data_timeout
-    start_time = time.time()
-    while read_data["control"]:
-        if time.time() - start_time > timeout:
-            read_data["control"] = False
-            return jsonify({"error": "Request timeout"}), 504
-        time.sleep(0.5)
+    if not read_data.request("control", get_data_timeout):
+        return jsonify({"error": "Request timeout"}), 504
 
     return jsonify(ctr_data)
 
@@ -5950,14 +5370,8 @@ def get_data_control():
 @app.route("/get_data_systemset")
 @login_required
 def get_data_systemset():
-    read_data["systemset"] = True
-    timeout = get_data_timeout
-    start_time = time.time()
-    while read_data["systemset"]:
-        if time.time() - start_time > timeout:
-            read_data["systemset"] = False
-            return jsonify({"error": "Request timeout"}), 504
-        time.sleep(0.5)
+    if not read_data.request("systemset", get_data_timeout):
+        return jsonify({"error": "Request timeout"}), 504
 
     return jsonify(
         {
@@ -5973,6 +5387,12 @@ def get_data_version():
     return jsonify(ver_switch)
 
 
+@app.route("/get_poll_status")
+@login_required
+def get_poll_status():
+    return jsonify(modbus_poller.status)
+
+
 @app.route("/control")
 @login_required
 def controlPage():
@@ -5983,21 +5403,16 @@ def controlPage():
 @login_required
 def reset_pump_swap():
     word1, word2 = cvt_float_byte(24)
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(303, [word2, word1])
-        return jsonify(
-                {
-                    "status": "success",
-                    "title": "Success",
-                    "message": "Success",
-                }
-            )
-    except Exception as e:
-        print(f"set pump swap time error:{e}")
-        return retry_modbus(303, [word2, word1], "register")
+    result = write_modbus(("register", 303, [word2, word1]))
+    if result is not True:
+        return result
+    return jsonify(
+        {
+            "status": "success",
+            "title": "Success",
+            "message": "Success",
+        }
+    )
     
     
 @app.route("/set_operation_mode", methods=["POST"])
@@ -6043,15 +5458,12 @@ def set_operation_mode():
                 temp1, temp2 = cvt_float_byte(temp_change)
                 prsr1, prsr2 = cvt_float_byte(prsr_change)
 
-                try:
-                    with ModbusTcpClient(
-                        host=modbus_host, port=modbus_port, unit=modbus_slave_id
-                    ) as client:
-                        client.write_registers(226, [temp2, temp1])
-                        client.write_registers(224, [prsr2, prsr1])
-                except Exception as e:
-                    print(f"set temp error:{e}")
-                    return retry_modbus_2reg(226, [temp2, temp1], 224, [prsr2, prsr1])
+                result = write_modbus(
+                    ("register", 226, [temp2, temp1]),
+                    ("register", 224, [prsr2, prsr1]),
+                )
+                if result is not True:
+                    return result
             else:
                 if (temp > setting_limit["control"]["oil_temp_set_up"]) or (
                     temp < setting_limit["control"]["oil_temp_set_low"]
@@ -6076,15 +5488,12 @@ def set_operation_mode():
                 temp1, temp2 = cvt_float_byte(temp)
                 prsr1, prsr2 = cvt_float_byte(prsr)
 
-                try:
-                    with ModbusTcpClient(
-                        host=modbus_host, port=modbus_port, unit=modbus_slave_id
-                    ) as client:
-                        client.write_registers(226, [temp2, temp1])
-                        client.write_registers(224, [prsr2, prsr1])
-                except Exception as e:
-                    print(f"set temp error:{e}")
-                    return retry_modbus_2reg(226, [temp2, temp1], 224, [prsr2, prsr1])
+                result = write_modbus(
+                    ("register", 226, [temp2, temp1]),
+                    ("register", 224, [prsr2, prsr1]),
+                )
+                if result is not True:
+                    return result
 
         except Exception as e:
             print(f"change temp pressure error: {e}")
@@ -6100,14 +5509,9 @@ def set_operation_mode():
                 }
             )
         word1, word2 = cvt_float_byte(temp)
-        try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
-                client.write_registers(993, [word2, word1])
-        except Exception as e:
-            print(f"set temp error:{e}")
-            return retry_modbus(993, [word2, word1], "register")
+        result = write_modbus(("register", 993, [word2, word1]))
+        if result is not True:
+            return result
 
         if (
             prsr > setting_limit["control"]["oil_pressure_set_up"]
@@ -6121,24 +5525,14 @@ def set_operation_mode():
                 }
             )
         word1, word2 = cvt_float_byte(prsr)
-        try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
-                client.write_registers(991, [word2, word1])
-        except Exception as e:
-            print(f"set pressure error:{e}")
-            return retry_modbus(991, [word2, word1], "register")
+        result = write_modbus(("register", 991, [word2, word1]))
+        if result is not True:
+            return result
 
         word1, word2 = cvt_float_byte(swap)
-        try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
-                client.write_registers(303, [word2, word1])
-        except Exception as e:
-            print(f"set pump swap time error:{e}")
-            return retry_modbus(303, [word2, word1], "register")
+        result = write_modbus(("register", 303, [word2, word1]))
+        if result is not True:
+            return result
 
         if (
             sensorData["error"]["Inv1_Error"]
@@ -6429,24 +5823,14 @@ def thrshd_set():
 
     i = 0
     for group in grouped_register:
-        try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
-                client.write_registers(1000 + i * 64, group)
-        except Exception as e:
-            print(f"set thrshd error:{e}")
-            return retry_modbus(1000 + i * 64, group, "register")
+        result = write_modbus(("register", 1000 + i * 64, group))
+        if result is not True:
+            return result
         i += 1
 
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_coils((8192 + 2000), coil_registers)
-    except Exception as e:
-        print(f"write trap error: {e}")
-        return retry_modbus((8192 + 2000), coil_registers, "coil")
+    result = write_modbus(("coil", (8192 + 2000), coil_registers))
+    if result is not True:
+        return result
 
     for key in thrshd.keys():
         value = data[key]
@@ -6467,15 +5851,9 @@ def writeSensorAdjust():
         word1, word2 = cvt_float_byte(value)
         registers.append(word2)
         registers.append(word1)
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(1400, registers)
-
-    except Exception as e:
-        print(f"write sensor adjust error:{e}")
-        return retry_modbus(1400, registers, "register")
+    result = write_modbus(("register", 1400, registers))
+    if result is not True:
+        return result
 
     op_logger.info("Sensor Adjust Inputs received Successfully")
 
@@ -6493,14 +5871,9 @@ def unit_set():
     elif value_to_write == "imperial":
         coil_value = True
 
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_coil(address=(8192 + 500), value=coil_value)
-    except Exception as e:
-        print(f"write in unit error:{e}")
-        return retry_modbus((8192 + 500), coil_value, "coil")
+    result = write_modbus(("coil", (8192 + 500), coil_value))
+    if result is not True:
+        return result
 
     change_data_by_unit()
     op_logger.info("setting unit_set successfully")
@@ -7333,6 +6706,8 @@ def import_settings():
                 file.write("")
 
         uploaded_file.save(f"{web_path}/json/upload_file.json")
+        # PLC 寫入先累積在 plan，最後一次寫出並讀回比對
+        plan = WritePlan()
         with open(f"{web_path}/json/upload_file.json", "r") as file:
             data = json.load(file)
             if "network_set" in data:
@@ -7374,7 +6749,7 @@ def import_settings():
             if "sensor_adjust" in data:
                 if user_identity["ID"] == "superuser":
                     sensor_adjust = data["sensor_adjust"]
-                    adjust_import(sensor_adjust)
+                    adjust_import(sensor_adjust, plan)
                 else:
                     return jsonify(
                         {
@@ -7385,7 +6760,7 @@ def import_settings():
 
             if "pid_setting" in data:
                 pid_setting = data["pid_setting"]
-                pid_import(pid_setting)
+                pid_import(pid_setting, plan)
 
             if "unit" in data:
                 unit_value = data.get("unit")
@@ -7393,7 +6768,7 @@ def import_settings():
 
             if "log_interval" in data:
                 log_interval_value = data.get("log_interval")
-                log_interval_import(log_interval_value)
+                log_interval_import(log_interval_value, plan)
 
             if "snmp" in data:
                 snmp_value = data.get("snmp")
@@ -7402,27 +6777,16 @@ def import_settings():
             if "thrshd" in data:
                 read_unit()
                 if system_data["value"]["unit"] == "metric":
-                    thrshd = data["thrshd"]
-                    threshold_import(thrshd)
+                    threshold_import(data["thrshd"], plan)
                 else:
-                    thrshd = data["thrshd"]
-                    key_list = list(thrshd.keys())
-                    for key in key_list:
-                        if not key.endswith("_trap") and not key.startswith("Delay_"):
-                            thrshd[key] = thrshd[key]
-                            if "Temp" in key:
-                                thrshd[key] = thrshd[key] * 9.0 / 5.0 + 32.0
-
-                            if "DewPoint" in key:
-                                thrshd[key] = thrshd[key] * 9.0 / 5.0
-
-                            if "Prsr" in key:
-                                thrshd[key] = thrshd[key] * 0.145038
-
-                            if "Flow" in key:
-                                thrshd[key] = thrshd[key] * 0.2642
+                    threshold_import(
+                        convert_units(data["thrshd"], "thrshd", "imperial"), plan
+                    )
 
-                    threshold_import(thrshd)
+        if len(plan):
+            result = write_settings(plan)
+            if result is not True:
+                return result
 
         return jsonify({"status": "success", "message": "Data Imported Successfully"})
     else:
@@ -7715,86 +7079,57 @@ def reboot_all():
 @app.route("/store_sampling_rate", methods=["POST"])
 @login_required
 def store_sampling_rate():
-    try:
-        data = request.json
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_register(3000, data["sampleRate"])
+    data = request.json
+    result = write_modbus(("register", 3000, data["sampleRate"]))
+    if result is not True:
+        return result
 
-        op_logger.info("Log Interval: %s", data["sampleRate"])
-        return "Log Interval Updated Successfully"
-    except Exception as e:
-        print(f"error:{e}")
-        return retry_modbus(3000, data["sampleRate"], "register")
+    op_logger.info("Log Interval: %s", data["sampleRate"])
+    return "Log Interval Updated Successfully"
 
 
 @app.route("/Pump1reset", methods=["POST"])
 @login_required
 def Pump1reset():
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(200, [0, 0])
-            client.write_registers(270, [0] * 4)
-
-        op_logger.info("reset Pump1 Running Time successfully!")
-        return "Reset Pump1 Running Time Successfully"
-    except Exception as e:
+    result = write_modbus(("register", 200, [0] * 2), ("register", 270, [0] * 4))
+    if result is not True:
         op_logger.info("reset Pump1 Running Time failed!")
-        print(f"pump1 reset error:{e}")
-        return retry_modbus_2reg(200, [0] * 2, 270, [0] * 4)
+        return result
+
+    op_logger.info("reset Pump1 Running Time successfully!")
+    return "Reset Pump1 Running Time Successfully"
 
 
 @app.route("/Pump2reset", methods=["POST"])
 @login_required
 def Pump2reset():
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(202, [0, 0])
-            client.write_registers(274, [0] * 4)
-        op_logger.info("reset Pump2 Running Time successfully!")
-        return "Reset Pump2 Running Time Successfully"
-    except Exception as e:
+    result = write_modbus(("register", 202, [0] * 2), ("register", 274, [0] * 4))
+    if result is not True:
         op_logger.info("reset Pump2 Running Time failed!")
-        print(f"pump2 reset error:{e}")
-        return retry_modbus_2reg(202, [0] * 2, 274, [0] * 4)
+        return result
+    op_logger.info("reset Pump2 Running Time successfully!")
+    return "Reset Pump2 Running Time Successfully"
 
 
 @app.route("/Pump3reset", methods=["POST"])
 @login_required
 def Pump3reset():
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(204, [0, 0])
-            client.write_registers(278, [0] * 4)
-        op_logger.info("reset Pump3 Running Time successfully!")
-        return "Reset Pump3 Running Time Successfully"
-    except Exception as e:
+    result = write_modbus(("register", 204, [0] * 2), ("register", 278, [0] * 4))
+    if result is not True:
         op_logger.info("reset Pump3 Running Time failed!")
-        print(f"pump3 reset error:{e}")
-        return retry_modbus_2reg(204, [0] * 2, 278, [0] * 4)
+        return result
+    op_logger.info("reset Pump3 Running Time successfully!")
+    return "Reset Pump3 Running Time Successfully"
 
 @app.route("/filter_reset", methods=["POST"])
 @login_required
 def filter_reset():
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(366, [0, 0])
-            client.write_registers(342, [0] * 4)
-        op_logger.info("reset Filter Running Time successfully!")
-        return "Reset Filter Running Time Successfully"
-    except Exception as e:
+    result = write_modbus(("register", 366, [0] * 2), ("register", 342, [0] * 4))
+    if result is not True:
         op_logger.info("reset Filter Running Time failed!")
-        print(f"Filter reset error:{e}")
-        return retry_modbus_2reg(366, [0] * 2, 342, [0] * 4)
+        return result
+    op_logger.info("reset Filter Running Time successfully!")
+    return "Reset Filter Running Time Successfully"
 
 
 FAN_REGISTERS = {
@@ -7809,17 +7144,13 @@ FAN_REGISTERS = {
 }
 
 def reset_fan(fan_id, reg1, reg2):
-    try:
-        with ModbusTcpClient(host=modbus_host, port=modbus_port, unit=modbus_slave_id) as client:
-            client.write_registers(reg1, [0, 0])
-            client.write_registers(reg2, [0] * 4)
-
-        op_logger.info(f"Reset {fan_id} Running Time successfully!")
-        return f"Reset {fan_id} Running Time Successfully"
-    except Exception as e:
+    result = write_modbus(("register", reg1, [0] * 2), ("register", reg2, [0] * 4))
+    if result is not True:
         op_logger.info(f"Reset {fan_id} Running Time failed!")
-        print(f"{fan_id} reset error: {e}")
-        return retry_modbus_2reg(reg1, [0] * 2, reg2, [0] * 4)
+        return result
+
+    op_logger.info(f"Reset {fan_id} Running Time successfully!")
+    return f"Reset {fan_id} Running Time Successfully"
 
 @app.route("/<fan_id>reset", methods=["POST"])
 @login_required
@@ -7865,102 +7196,37 @@ class LogMover:
 
 @app.route("/restore_factory_setting_all", methods=["POST"])
 def restoreFactorySettingAll():
+    # 1、2、5 ~ 17 的 PLC 寫入先累積在 plan，於 18 切換模式前一次寫出並讀回比對
+    plan = WritePlan()
+    restored = []
+
     ###1. SystemSetting: Log Interval(sec) : 2
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_register(3000, 2)
+    plan.registers(3000, [2])
+    restored.append("Sampling Rate: 2")
 
-        op_logger.info("Sampling Rate: %s", 2)
-        # return "Log Interval Updated Successfully"
-    except Exception as e:
-        print(f"error:{e}")
-        # return retry_modbus(3000, 2, "register")
-    
     ###2.Control: Pump & Filter Running Time: Reset
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(200, [0, 0])
-            client.write_registers(270, [0] * 4)
-
-        op_logger.info("reset Pump1 Running Time successfully!")
-        # return "Reset Pump1 Running Time Successfully"
-    except Exception as e:
-        op_logger.info("reset Pump1 Running Time failed!")
-        print(f"pump1 reset error:{e}")
-        # return retry_modbus_2reg(200, [0] * 2, 270, [0] * 4)
-
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(202, [0, 0])
-            client.write_registers(274, [0] * 4)
-        op_logger.info("reset Pump2 Running Time successfully!")
-        # return "Reset Pump2 Running Time Successfully"
-    except Exception as e:
-        op_logger.info("reset Pump2 Running Time failed!")
-        print(f"pump2 reset error:{e}")
-        # return retry_modbus_2reg(202, [0] * 2, 274, [0] * 4)
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(204, [0, 0])
-            client.write_registers(278, [0] * 4)
-        op_logger.info("reset Pump3 Running Time successfully!")
-        # return "Reset Pump3 Running Time Successfully"
-    except Exception as e:
-        op_logger.info("reset Pump3 Running Time failed!")
-        print(f"pump3 reset error:{e}")
-        # return retry_modbus_2reg(204, [0] * 2, 278, [0] * 4)
-
-    
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(310, [0, 0, 0, 0])
-            client.write_registers(314, [0, 0, 0, 0])
-            client.write_registers(318, [0, 0, 0, 0])
-            client.write_registers(322, [0, 0, 0, 0])
-            client.write_registers(326, [0, 0, 0, 0])
-            client.write_registers(330, [0, 0, 0, 0])
-            client.write_registers(334, [0, 0, 0, 0])
-            client.write_registers(338, [0, 0, 0, 0])
-            client.write_registers(342, [0, 0, 0, 0])
-            
-            client.write_registers(350, [0] * 18)
-            
-        op_logger.info("reset Filter and Fan Running Time successfully!")
-        # return "Reset Filter Running Time Successfully"
-    except Exception as e:
-        print(f"Filter and Fan reset error:{e}")
-        op_logger.info("reset Filter and Fan Running Time failed!")
+    # 運轉時間寫入後 PLC 會繼續累計，不讀回比對
+    for running_time, total_time in ((200, 270), (202, 274), (204, 278)):
+        plan.registers(running_time, [0, 0], verify=False)
+        plan.registers(total_time, [0] * 4, verify=False)
+    restored.append("reset Pump1 Running Time successfully!")
+    restored.append("reset Pump2 Running Time successfully!")
+    restored.append("reset Pump3 Running Time successfully!")
+
+    plan.registers(310, [0] * 36, verify=False)
+    plan.registers(350, [0] * 18, verify=False)
+    restored.append("reset Filter and Fan Running Time successfully!")
 
     ###3. Error Table: 隱藏或刪除所有已經回復的Message(superuser保留)
     try:
-        global signal_records
-        if signal_records:
-            signal_records = []
-            save_to_json()
-        # return jsonify({"status": "success", "message": "All records deleted successfully."})
-        else:
+        if not signal_store.clear():
             # return jsonify({"status": "fail", "message": "No records to delete."})
             print("No records to delete.")
     except Exception as e:
         print(f"Error deleting records: {e}")
     
     try:
-        global downtime_signal_records
-        if downtime_signal_records:
-            downtime_signal_records = []
-            save_to_downtime_json()
-            # return jsonify({"status": "success", "message": "All records deleted successfully."})
-        else:
+        if not downtime_signal_store.clear():
             # return jsonify({"status": "fail", "message": "No records to delete."})
             print("No records to delete.")
 
@@ -7982,12 +7248,20 @@ def restoreFactorySettingAll():
         name="operation"
     ).move_logs()
 
+    # 寫入器常駐開著當日檔案，搬移前先關閉，下一筆會在原目錄開新檔
+    sync_sensor_log(close=True)
     LogMover(
         src_dir=os.path.join(log_path, "logs", "sensor"),
         dst_dir=os.path.join(log_path, "logs", "old_sensor"),
         name="sensor"
     ).move_logs()
 
+    LogMover(
+        src_dir=os.path.join(log_path, "logs", "sensor_columnar"),
+        dst_dir=os.path.join(log_path, "logs", "old_sensor_columnar"),
+        name="sensor_columnar"
+    ).move_logs()
+
     LogMover(
         src_dir=os.path.join(snmp_path, "RestAPI", "logs", "operation"),
         dst_dir=os.path.join(snmp_path, "RestAPI", "logs", "old_operation"),
@@ -7998,41 +7272,21 @@ def restoreFactorySettingAll():
     
     ###5. Engineer Mode: Sensor Adjustment Setting恢復預設值
     try:
-        adjust_import(adjust_factory)
+        adjust_import(adjust_factory, plan)
     except Exception as e:
         print(f"sensor adjust import error:{e}")
         
     ###6. Engineer Mode: Alert Threshold Setting恢復預設值
     try:
-        if system_data["value"]["unit"] == "metric":
-            threshold_import(thrshd_factory)
-        else:
-            key_list = list(thrshd_factory.keys())
-            for key in key_list:
-                if not key.endswith("_trap") and not key.startswith("Delay_"):
-                    imperial_thrshd_factory[key] = thrshd_factory[key]
-                    if "Temp" in key and "TempCds" not in key:
-                        imperial_thrshd_factory[key] = (
-                            thrshd_factory[key] * 9.0 / 5.0 + 32.0
-                        )
-
-                    if "TempCds" in key:
-                        imperial_thrshd_factory[key] = thrshd_factory[key] * 9.0 / 5.0
-
-                    if "Prsr" in key:
-                        imperial_thrshd_factory[key] = thrshd_factory[key] * 0.145038
-
-                    if "Flow" in key:
-                        imperial_thrshd_factory[key] = thrshd_factory[key] * 0.2642
-            threshold_import(imperial_thrshd_factory)
-        op_logger.info("Reset Threshold to Factory Setting Successfully")
+        threshold_import(factory_thrshd_view(system_data["value"]["unit"]), plan)
+        restored.append("Reset Threshold to Factory Setting Successfully")
     except Exception as e:  
         print(f"threshold import error:{e}")
     
     ###7. Engineer Mode: PID Setting恢復預設值
     try:
-        pid_import(pid_factory)
-        op_logger.info("Reset PID to Factory Setting Successfully")
+        pid_import(pid_factory, plan)
+        restored.append("Reset PID to Factory Setting Successfully")
     except Exception as e:  
         print(f"pid import error:{e}")      
         
@@ -8048,108 +7302,79 @@ def restoreFactorySettingAll():
         
     ###9. Engineer Mode: Auto Mode Redundant Sensor Broken Setting
     try:
-        auto_import(auto_factory)
+        auto_import(auto_factory, plan)
     except Exception as e:
         print(f"Auto Mode Redundant Sensor Broken Setting import error:{e}")
     
     ###10. Engineer Mode: When Dew Point Error in Auto Mode Setting
     try:
-        dpt_error_import(dpt_error_factory)
+        dpt_error_import(dpt_error_factory, plan)
     except Exception as e:
         print(f"Dew Point Error Setting to Factory Setting import error:{e}")
     
     ###11. Engineer Mode: Fan Speed in Auto Mode Setting
     try:
-        auto_mode_import(auto_mode_setting_factory)
+        auto_mode_import(auto_mode_setting_factory, plan)
     except Exception as e:
         print(f"Fan Speed in Auto Mode Setting import error:{e}")
     
     ###12. Engineer Mode: Rack Opening Setting
     try:
-        rack_opening_import(rack_opening_setting["factor_value"])
+        rack_opening_import(rack_opening_setting["factor_value"], plan)
     except Exception as e:
         print(f"Rack Opening Setting import error:{e}")
         
     ###13 Control page : reset pump swap time
-    try:
-        word1, word2 = cvt_float_byte(24)
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(303, [word2, word1])
-    except Exception as e:
-        print(f"set pump swap time error:{e}")
+    word1, word2 = cvt_float_byte(24)
+    plan.registers(303, [word2, word1])
         
     ### 14 Control page : reset auto mode temperature and pressure
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            temp1, temp2 = cvt_float_byte(35) ## 預設值35度C
-            prsr1, prsr2 = cvt_float_byte(30) ## 預設值30psi
-            
-            # Reset Auto Mode Temperature
-            client.write_registers(226, [temp2, temp1])
-            client.write_registers(993, [temp2, temp1])
-            
-            # Reset Auto Mode Pressure
-            client.write_registers(224, [prsr2, prsr1])  
-            client.write_registers(991, [prsr2, prsr1])
-            
-    except Exception as e:
-        print(f"reset auto mode temperature and pressure error:{e}")    
+    temp1, temp2 = cvt_float_byte(35) ## 預設值35度C
+    prsr1, prsr2 = cvt_float_byte(30) ## 預設值30psi
+
+    # Reset Auto Mode Temperature
+    plan.registers(226, [temp2, temp1])
+    plan.registers(993, [temp2, temp1])
+
+    # Reset Auto Mode Pressure
+    plan.registers(224, [prsr2, prsr1])
+    plan.registers(991, [prsr2, prsr1])
     
     ### 15 Control page : reset manual mode pump speed and fan speed
-    
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            speed1, speed2 = cvt_float_byte(70)
-            client.write_registers(246, [speed2, speed1])  # Reset Manual Mode Pump Speed
-            
-            fan1, fan2 = cvt_float_byte(70)
-            
-            client.write_registers(470, [fan2, fan1])  # Reset Manual Mode Fan Speed             
-    except Exception as e:
-        print(f"reset manual mode pump and fan speed error:{e}")
+    speed1, speed2 = cvt_float_byte(70)
+    plan.registers(246, [speed2, speed1])  # Reset Manual Mode Pump Speed
+
+    fan1, fan2 = cvt_float_byte(70)
+    plan.registers(470, [fan2, fan1])  # Reset Manual Mode Fan Speed
     
     ### 16 Engineer Mode: Reset Switch Version
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            # flow value filter : enabled
-            client.write_coils((8192 + 803),[False])
-            
-            # coolant quality meter : disabled
-            client.write_coils((8192 + 804),[True])
-            
-            # fan count : 6
-            client.write_coils((8192 + 805),[True] )
-            
-            # liquid level 1 & 2 : enabled
-            client.write_coils((8192 + 806),[False] * 2)
-            
-            # liquid level 3 : disabled , leakage sensor 1 ~ 5 : disabled
-            client.write_coils((8192 + 808),[True] * 6)
-                        
-            op_logger.info("Reset Switch Version Successfully")
-    except Exception as e:
-        print(f"reset Switch Version error:{e}")
+    # flow value filter : enabled
+    plan.coils((8192 + 803), [False])
+
+    # coolant quality meter : disabled
+    plan.coils((8192 + 804), [True])
+
+    # fan count : 6
+    plan.coils((8192 + 805), [True])
+
+    # liquid level 1 & 2 : enabled
+    plan.coils((8192 + 806), [False] * 2)
+
+    # liquid level 3 : disabled , leakage sensor 1 ~ 5 : disabled
+    plan.coils((8192 + 808), [True] * 6)
+    restored.append("Reset Switch Version Successfully")
     
     ### 17 Engineer Mode: Reset Rack Enable
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_coils(
-                (8192 + 710),
-                [False] * 11,
-            )
-            op_logger.info("Reset Rack Enable Successfully")
-    except Exception as e:
-        print(f"reset Rack Enable error:{e}")
+    plan.coils((8192 + 710), [False] * 11)
+    restored.append("Reset Rack Enable Successfully")
+
+    result = bulk_writer.write(plan)
+    if result.ok:
+        for message in restored:
+            op_logger.info(message)
+    else:
+        print(f"restore factory setting write error: {result.describe_failed()}")
+        op_logger.info("Restore factory setting to PLC failed!")
         
     ### 18 restore to stop mode
     try:
@@ -8173,15 +7398,11 @@ def restoreFactorySettingAll():
         print(f"SNMP Setting import error:{e}")
         
     ### 20. Restore MC Settig
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_coils((8192 + 840), [True] * 5)
-            op_logger.info("MC Setting Reset Successfully")
-    except Exception as e:
-        print(f"mc setting error:{e}")
-        return retry_modbus((8192 + 840), [True] * 5, "coil")
+    # PLC 會依運轉狀態改動 MC，不讀回比對
+    result = write_settings(WritePlan().coils((8192 + 840), [True] * 5, verify=False))
+    if result is not True:
+        return result
+    op_logger.info("MC Setting Reset Successfully")
     
     ### 21. Restore admin password
     try:
@@ -8253,18 +7474,12 @@ def store_pid_temp():
             if not key == "sample_time_temp":
                 registers.append(pid_setting["temperature"][key])
 
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_register(550, pid_setting["temperature"]["sample_time_temp"])
-            client.write_registers(553, registers)
-
-    except Exception as e:
-        print(f"error:{e}")
-        return retry_modbus_2reg(
-            550, pid_setting["temperature"]["sample_time_temp"], 553, registers
-        )
+    result = write_modbus(
+        ("register", 550, pid_setting["temperature"]["sample_time_temp"]),
+        ("register", 553, registers),
+    )
+    if result is not True:
+        return result
 
     registers = []
     for key in data["pressure"].keys():
@@ -8273,18 +7488,12 @@ def store_pid_temp():
             if not key == "sample_time_pressure":
                 registers.append(pid_setting["pressure"][key])
 
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_register(510, pid_setting["pressure"]["sample_time_pressure"])
-            client.write_registers(513, registers)
-
-    except Exception as e:
-        print(f"error:{e}")
-        return retry_modbus_2reg(
-            510, pid_setting["pressure"]["sample_time_pressure"], 513, registers
-        )
+    result = write_modbus(
+        ("register", 510, pid_setting["pressure"]["sample_time_pressure"]),
+        ("register", 513, registers),
+    )
+    if result is not True:
+        return result
 
     with open(f"{web_path}/json/pid_setting.json", "w") as json_file:
         json.dump(pid_setting, json_file)
@@ -8521,15 +7730,9 @@ def inspection_time_apply():
 
     pump_open_time = int(data.get("pump_open_time"))
 
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_registers(740, [pump_open_time])
-
-    except Exception as e:
-        print(f"inspection time error:{e}")
-        return retry_modbus(740, [pump_open_time], "register")
+    result = write_modbus(("register", 740, [pump_open_time]))
+    if result is not True:
+        return result
     op_logger.info("Inspection Time Updated Successfully")
     return "Inspection Time Updated Successfully"
 
@@ -8548,15 +7751,9 @@ def reset_current():
             "Fan_OverLoad2",
         ]
     ):
-        try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
-                client.write_coils((8192 + 800), button_pressed)
-
-        except Exception as e:
-            print(f"reset_current:{e}")
-            return retry_modbus((8192 + 800), [True], "coil")
+        result = write_modbus(("coil", (8192 + 800), [button_pressed]))
+        if result is not True:
+            return result
     else:
         return jsonify(status="error", message="Currently not overload")
 
@@ -8570,30 +7767,18 @@ def change_to_stop_mode():
 
 @app.route("/start_inspect", methods=["POST"])
 def start_inspect():
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_register(900, 1)
-            client.write_register(973, 1)
-    except Exception as e:
-        print(f"start inspect:{e}")
-        return retry_modbus_2reg(900, 1, 973, 1)
+    result = write_modbus(("register", 900, 1), ("register", 973, 1))
+    if result is not True:
+        return result
     op_logger.info("Begin Inspection")
     return jsonify(message="Begin Inspection")
 
 
 @app.route("/cancel_inspect", methods=["POST"])
 def cancel_inspect():
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_register(900, 2)
-            client.write_register(973, 2)
-    except Exception as e:
-        print(f"cancel inspect:{e}")
-        return retry_modbus_2reg(900, 2, 973, 2)
+    result = write_modbus(("register", 900, 2), ("register", 973, 2))
+    if result is not True:
+        return result
     op_logger.info("Cancel Inspection")
     return jsonify(message="Cancel Inspection")
 
@@ -8604,17 +7789,12 @@ def auto_setting_apply():
     auto_broken_pressure = data["auto_broken_pressure"]
 
 
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_register(960, int(auto_broken_temperature))
-            client.write_register(961, int(auto_broken_pressure))
-
-
-    except Exception as e:
-        print(f"auto setting:{e}")
- 
+    result = write_modbus(
+        ("register", 960, int(auto_broken_temperature)),
+        ("register", 961, int(auto_broken_pressure)),
+    )
+    if result is not True:
+        return result
     op_logger.info(f"Update Auto Setting Successfully. {data}")
     return jsonify(message="Update Auto Setting Successfully")
 
@@ -8635,15 +7815,9 @@ def dpt_error_setting_apply():
                 status="over_range",
                 message="Valid Input Range is between 32°F to 212°F",
             )
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_register(974, int(fan))
-            client.write_register(980, int(t1))
-    except Exception as e:
-        print(f"dpt error setting:{e}")
-        
+    result = write_modbus(("register", 974, int(fan)), ("register", 980, int(t1)))
+    if result is not True:
+        return result
     op_logger.info(f"Update Dew Point Error Setting Successfully. {data}")
     return jsonify(
         status="success", message="Update Dew Point Error Setting Successfully"
@@ -8655,14 +7829,9 @@ def auto_mode_setting_apply():
     data = request.get_json("data")
     fan = data["auto_mode_fan"]
     fan_rpm = fan * 160
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_register(533, int(fan_rpm))
-    except Exception as e:
-        print(f"fan speed in auto mode setting:{e}")
-
+    result = write_modbus(("register", 533, int(fan_rpm)))
+    if result is not True:
+        return result
     op_logger.info(f"Update Fan Speed in Auto Mode Setting Successfully. {data}")
     return jsonify(
         status="success", message="Update Fan Speed in Auto Mode Setting Successfully"
@@ -8672,13 +7841,9 @@ def auto_mode_setting_apply():
 def rack_opening_setting_apply():
     data = request.get_json("data")
     value = data["rack_opening_setting"]
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_register(370, int(value))
-    except Exception as e:
-        print(f"rack opening setting:{e}")
+    result = write_modbus(("register", 370, int(value)))
+    if result is not True:
+        return result
     op_logger.info(f"Update Rack Opening Setting Successfully. {data}")
     return jsonify(message="Update Rack Opening Setting Successfully")
 
@@ -8698,27 +7863,7 @@ def resetAdjust():
 
 @app.route("/resetThrshd", methods=["POST"])
 def resetThrshd():
-    if system_data["value"]["unit"] == "metric":
-        threshold_import(thrshd_factory)
-    else:
-        key_list = list(thrshd_factory.keys())
-        for key in key_list:
-            if not key.endswith("_trap") and not key.startswith("Delay_"):
-                imperial_thrshd_factory[key] = thrshd_factory[key]
-                if "Temp" in key:
-                    imperial_thrshd_factory[key] = (
-                        thrshd_factory[key] * 9.0 / 5.0 + 32.0
-                    )
-
-                if "DewPoint" in key:
-                    imperial_thrshd_factory[key] = thrshd_factory[key] * 9.0 / 5.0
-
-                if "Prsr" in key:
-                    imperial_thrshd_factory[key] = thrshd_factory[key] * 0.145038
-
-                if "Flow" in key:
-                    imperial_thrshd_factory[key] = thrshd_factory[key] * 0.2642
-        threshold_import(imperial_thrshd_factory)
+    threshold_import(factory_thrshd_view(system_data["value"]["unit"]))
     op_logger.info("Reset Threshold to Factory Setting Successfully")
     return jsonify(message="Reset Threshold to Factory Setting Successfully")
 
@@ -8788,24 +7933,13 @@ def set_rack_control():
                 failed_racks.append(rack_key)
                 continue
 
-            try:
-                with ModbusTcpClient(
-                    host=modbus_host,
-                    port=modbus_port,
-                    unit=modbus_slave_id,
-                    timeout=0.5,
-                ) as client:
-                    client.write_coils(coil_addr, [coil_val])
-                    ctr_data["rack_set"][key] = bool(coil_val)
-                    ctr_data["rack_set"][result_key] = True
-            except Exception as e:
-                print(f"failed to update rack control: {e}")
-                success = retry_modbus_setmode_singlecoil(
-                    coil_addr, coil_val if ctr_data["rack_pass"][pass_key] else 0
-                )
-                if not success:
-                    failed_racks.append(rack_key)
-                    continue
+            outcome = plc_writer.write([("coil", coil_addr, [coil_val])])
+            if not outcome.ok:
+                print(f"failed to update rack control: {outcome.failed}")
+                failed_racks.append(rack_key)
+                continue
+            ctr_data["rack_set"][key] = bool(coil_val)
+            ctr_data["rack_set"][result_key] = True
 
         if failed_racks:
             failed_racks_list = "".join([f"<li>{rack}</li>" for rack in failed_racks])
@@ -8826,14 +7960,9 @@ def set_rack_control():
 def set_rack_engineer():
     data = request.get_json()
 
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_coils((8192 + 710), data)
-    except Exception as e:
-        print(f"rack engineer error: {e}")
-        return retry_modbus((8192 + 710), data, "coil")
+    result = write_modbus(("coil", (8192 + 710), data))
+    if result is not True:
+        return result
 
     try:
         for i, v in enumerate(data):
@@ -8857,26 +7986,10 @@ def version_switch_admin():
     leakage_sensor_3_switch = data["leakage_sensor_3_switch"]
     leakage_sensor_4_switch = data["leakage_sensor_4_switch"]
     leakage_sensor_5_switch = data["leakage_sensor_5_switch"]
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_coils(
-                (8192 + 809),
-                [
-                    leakage_sensor_1_switch,
-                    leakage_sensor_2_switch,
-                    leakage_sensor_3_switch,
-                    leakage_sensor_4_switch,
-                    leakage_sensor_5_switch,
-                ],
-            )
-        op_logger.info(f"Version setting updated successfully. {data}")
-        return jsonify(status="success", message="Version setting updated successfully")
-    except Exception as e:
-        print(f"Error: {e}")
-        return retry_modbus(
-            (8092 + 809), 
+    result = write_modbus(
+        (
+            "coil",
+            (8192 + 809),
             [
                 leakage_sensor_1_switch,
                 leakage_sensor_2_switch,
@@ -8884,8 +7997,12 @@ def version_switch_admin():
                 leakage_sensor_4_switch,
                 leakage_sensor_5_switch,
             ],
-            "coil"
-        )
+        ),
+    )
+    if result is not True:
+        return result
+    op_logger.info(f"Version setting updated successfully. {data}")
+    return jsonify(status="success", message="Version setting updated successfully")
 
 @app.route("/version_switch", methods=["POST"])
 def version_switch():
@@ -8902,40 +8019,10 @@ def version_switch():
     leakage_sensor_3_switch = data["leakage_sensor_3_switch"]
     leakage_sensor_4_switch = data["leakage_sensor_4_switch"]
     leakage_sensor_5_switch = data["leakage_sensor_5_switch"]
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            # client.write_coils((8192 + 803), [median_switch])
-            # client.write_coils((8192 + 804), [coolant_quality_meter_switch])
-            # client.write_coils((8192 + 805), [fan_count_switch])
-            # client.write_coils((8192 + 806), [liquid_level_1_switch])
-            # client.write_coils((8192 + 807), [liquid_level_2_switch])
-            # client.write_coils((8192 + 808), [liquid_level_3_switch])
-            # client.write_coils((8192 + 809), [leakage_sensor_1_switch])
-            # client.write_coils((8192 + 810), [leakage_sensor_2_switch])
-            client.write_coils(
-                (8192 + 803),
-                [
-                    median_switch,
-                    coolant_quality_meter_switch,
-                    fan_count_switch,
-                    liquid_level_1_switch,
-                    liquid_level_2_switch,
-                    liquid_level_3_switch,
-                    leakage_sensor_1_switch,
-                    leakage_sensor_2_switch,
-                    leakage_sensor_3_switch,
-                    leakage_sensor_4_switch,
-                    leakage_sensor_5_switch
-                ],
-            )
-        op_logger.info(f"Version setting updated successfully. {data}")
-        return jsonify(status="success", message="Version setting updated successfully")
-    except Exception as e:
-        print(f"Error: {e}")
-        return retry_modbus(
-            (8092 + 803),
+    result = write_modbus(
+        (
+            "coil",
+            (8192 + 803),
             [
                 median_switch,
                 coolant_quality_meter_switch,
@@ -8949,10 +8036,18 @@ def version_switch():
                 leakage_sensor_4_switch,
                 leakage_sensor_5_switch,
             ],
-            "coil",
-        )
+        ),
+    )
+    if result is not True:
+        return result
+    op_logger.info(f"Version setting updated successfully. {data}")
+    return jsonify(status="success", message="Version setting updated successfully")
+
+
 
 
+# scc_app 的背景執行緒依這兩個 dict 產生 scc*.json
+bind_scc_state(sensorData, system_data)
 
 
 @app.before_request
@@ -8966,94 +8061,34 @@ def before_request():
     g.user_login_info = user_login_info
 
 
-@app.route("/get_signal_records", methods=["GET"])
-def get_signal_records():
+def query_signal_records(store):
+    limit = max(request.args.get("limit", default=20, type=int), 1)
     try:
-        load_signal_records()
-
-        page = request.args.get("page", default=1, type=int)
-        limit = request.args.get("limit", default=20, type=int)
-
-        filter_signal_names = request.args.getlist("signal_name")
-        search_keyword = request.args.get("search", default="", type=str).lower()
-
-        filtered_records = signal_records
-        if filter_signal_names:
-            filtered_records = [
-                record
-                for record in filtered_records
-                if record["signal_name"] in filter_signal_names
-            ]
-
-        if search_keyword:
-            filtered_records = [
-                record
-                for record in filtered_records
-                if search_keyword in record.get("signal_name", "").lower()
-                or search_keyword in record.get("signal_value", "").lower()
-            ]
+        result = store.query(
+            signal_names=request.args.getlist("signal_name"),
+            search=request.args.get("search", default="", type=str),
+            state=request.args.get("state"),
+            since=request.args.get("since"),
+            until=request.args.get("until"),
+            cursor=request.args.get("cursor"),
+            page=request.args.get("page", default=1, type=int),
+            limit=limit,
+        )
+    except ValueError as e:
+        return jsonify({"status": "fail", "message": str(e)}), 400
 
-        total_records = len(filtered_records)
-        total_pages = (total_records + limit - 1) // limit
+    result["total_pages"] = (result["total_records"] + limit - 1) // limit
+    return jsonify(result)
 
-        start = (page - 1) * limit
-        end = start + limit
-        paginated_records = filtered_records[start:end]
 
-        return jsonify(
-            {
-                "total_records": total_records,
-                "total_pages": total_pages,
-                "records": paginated_records,
-            }
-        )
-    except FileNotFoundError:
-        return jsonify([])
+@app.route("/get_signal_records", methods=["GET"])
+def get_signal_records():
+    return query_signal_records(signal_store)
 
 
 @app.route("/get_downtime_signal_records", methods=["GET"])
 def get_downtime_signal_records():
-    try:
-        load_downtime_signal_records()
-
-        page = request.args.get("page", default=1, type=int)
-        limit = request.args.get("limit", default=20, type=int)
-
-        filter_signal_names = request.args.getlist("signal_name")
-        search_keyword = request.args.get("search", default="", type=str).lower()
-
-        filtered_records = downtime_signal_records
-        if filter_signal_names:
-            filtered_records = [
-                record
-                for record in filtered_records
-                if record["signal_name"] in filter_signal_names
-            ]
-
-        if search_keyword:
-            filtered_records = [
-                record
-                for record in filtered_records
-                if search_keyword in record.get("signal_name", "").lower()
-                or search_keyword in record.get("signal_value", "").lower()
-            ]
-
-        total_records = len(filtered_records)
-        total_pages = (total_records + limit - 1) // limit
-
-        start = (page - 1) * limit
-        end = start + limit
-        paginated_records = filtered_records[start:end]
-
-        return jsonify(
-            {
-                "total_records": total_records,
-                "total_pages": total_pages,
-                "records": paginated_records,
-            }
-        )
-    except FileNotFoundError:
-        return jsonify([])
+    return query_signal_records(downtime_signal_store)
 
 
 @app.route("/delete_signal_records", methods=["POST"])
@@ -9061,23 +8096,7 @@ def delete_signal_records():
     data = request.get_json()
     signals_to_delete = data.get("signals", [])
 
-    global signal_records
-    initial_count = len(signal_records)
-
-    for signal in signals_to_delete:
-        signal_name = signal.get("signal_name")
-        on_time = signal.get("on_time")
-
-        signal_records = [
-            record
-            for record in signal_records
-            if not (
-                record["signal_name"] == signal_name and record["on_time"] == on_time
-            )
-        ]
-
-    if len(signal_records) < initial_count:
-        save_to_json()
+    if signal_store.delete(signals_to_delete):
         return jsonify(
             {"status": "success", "message": "Records deleted successfully."}
         )
@@ -9090,23 +8109,7 @@ def delete_downtime_signal_records():
     data = request.get_json()
     signals_to_delete = data.get("signals", [])
 
-    global downtime_signal_records
-    initial_count = len(downtime_signal_records)
-
-    for signal in signals_to_delete:
-        signal_name = signal.get("signal_name")
-        on_time = signal.get("on_time")
-
-        downtime_signal_records = [
-            record
-            for record in downtime_signal_records
-            if not (
-                record["signal_name"] == signal_name and record["on_time"] == on_time
-            )
-        ]
-
-    if len(downtime_signal_records) < initial_count:
-        save_to_downtime_json()
+    if downtime_signal_store.delete(signals_to_delete):
         return jsonify(
             {"status": "success", "message": "Records deleted successfully."}
         )
@@ -9124,7 +8127,7 @@ def delete_downtime_signal_records():
 #             client.write_coils((8192 + 840), [False])
 #     except Exception as e:
 #         print(f"mc power off error:{e}")
-#         return retry_modbus((8192 + 840), [False], "coil")
+#         return write_modbus(("coil", (8192 + 840), [False]))
 
 
 @app.route("/mc_setting", methods=["POST"])
@@ -9141,64 +8144,34 @@ def mc_setting():
     regs = [mc1, mc2, mc3, fan1, fan2]
     
     
-    try:
-        with ModbusTcpClient(
-            host=modbus_host, port=modbus_port, unit=modbus_slave_id
-        ) as client:
-            client.write_coils((8192 + 840), regs)
-    except Exception as e:
-        print(f"mc setting error:{e}")
-        return retry_modbus((8192 + 840), regs, "coil")
+    result = write_modbus(("coil", (8192 + 840), regs))
+    if result is not True:
+        return result
 
     if not mc1:
-        try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
-                client.write_coils((8192 + 820), [False])
-        except Exception as e:
-            print(f"setting error:{e}")
-            return retry_modbus((8192 + 820), [False], "coil")
+        result = write_modbus(("coil", (8192 + 820), [False]))
+        if result is not True:
+            return result
 
     if not mc2:
-        try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
-                client.write_coils((8192 + 821), [False])
-        except Exception as e:
-            print(f"mc setting error:{e}")
-            return retry_modbus((8192 + 821), [False], "coil")
+        result = write_modbus(("coil", (8192 + 821), [False]))
+        if result is not True:
+            return result
 
     if not mc3:
-        try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
-                client.write_coils((8192 + 822), [False])
-        except Exception as e:
-            print(f"mc setting error:{e}")
-            return retry_modbus((8192 + 822), [False], "coil")
+        result = write_modbus(("coil", (8192 + 822), [False]))
+        if result is not True:
+            return result
 
     if not fan1:
-        try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
-                client.write_coils((8192 + 850), [False] * 4)
-        except Exception as e:
-            print(f"mc setting error:{e}")
-            return retry_modbus((8192 + 850), [False] * 4, "coil")
+        result = write_modbus(("coil", (8192 + 850), [False] * 4))
+        if result is not True:
+            return result
 
     if not fan2:
-        try:
-            with ModbusTcpClient(
-                host=modbus_host, port=modbus_port, unit=modbus_slave_id
-            ) as client:
-                client.write_coils((8192 + 854), [False] * 4)
-        except Exception as e:
-            print(f"mc setting error:{e}")
-            return retry_modbus((8192 + 824), [False], "coil")
+        result = write_modbus(("coil", (8192 + 854), [False] * 4))
+        if result is not True:
+            return result
 
     if ctr_data["downtime_error"]["oc_issue"]:
         return {
@@ -9219,7 +8192,10 @@ def mc_setting():
     }
 
 
-update_json_restore_times()
+# 只有擁有告警狀態的 poller (或單一行程) 才能結束告警、整理 journal；
+# web worker 每次啟動都執行會關掉 poller 仍視為進行中的告警
+if webui_role in ("all", "poller"):
+    update_json_restore_times()
 
 def check_rack_leakage_sensor_status(rack_sensor, inputs, delay):
     try:
@@ -9372,527 +8348,67 @@ def send_error_log():
             time_data["errorlog_start"][key] = current_time
 
 
+# 設定 RACK_GATEWAY=host:port 時改經由 modbus_proxy 的 rack gateway 讀取，與 plc.py 共用
+rack_gateway = os.getenv("RACK_GATEWAY")
+if rack_gateway:
+    rack_poller = RackGatewayClient(*rack_gateway.rsplit(":", 1))
+else:
+    rack_poller = RackPoller(rack_hosts(), modbus_port)
+
+
+def update_rack_leak_control(racks):
+    # 漏液時依 rack_set 切換對應的 PLC coil (8192 + 720 起，每個 rack 一個)
+    try:
+        with ModbusTcpClient(host="192.168.3.250", port=502) as client:
+            for rack in racks:
+                index = int(rack[len("rack"):])
+                try:
+                    if not sensorData["rack_leak"][f"{rack}_leak"]:
+                        client.write_coils((8192 + 719 + index), [False])
+                        if ctr_data["rack_set"][f"{rack}_sw"]:
+                            sensorData["rack_prev"][rack] = True
+                    else:
+                        if sensorData["rack_prev"][rack]:
+                            client.write_coils((8192 + 719 + index), [True])
+                            sensorData["rack_prev"][rack] = False
+                except Exception as e:
+                    print(f"{rack} set control error: {e}")
+    except Exception as e:
+        print(f"rack set control error: {e}")
+
+
 def read_rack_status():
     global light, warning_light
-    host = {
-        "rack1_register": "192.168.3.20",
-        "rack2_register": "192.168.3.21",
-        "rack3_register": "192.168.3.22",
-        "rack4_register": "192.168.3.23",
-        "rack5_register": "192.168.3.24",
-        "rack6_register": "192.168.3.25",
-        "rack7_register": "192.168.3.26",
-        "rack8_register": "192.168.3.27",
-        "rack9_register": "192.168.3.28",
-        "rack10_register": "192.168.3.29",
-        "rack1_coil": "192.168.3.10",
-        "rack2_coil": "192.168.3.11",
-        "rack3_coil": "192.168.3.12",
-        "rack4_coil": "192.168.3.13",
-        "rack5_coil": "192.168.3.14",
-        "rack6_coil": "192.168.3.15",
-        "rack7_coil": "192.168.3.16",
-        "rack8_coil": "192.168.3.17",
-        "rack9_coil": "192.168.3.18",
-        "rack10_coil": "192.168.3.19",
-    }
 
     for key in time_data["errorlog_start"]:
         time_data["errorlog_start"][key] = time.perf_counter()
 
     while True:
-        if ctr_data["rack_visibility"]["rack1_enable"]:
-            try:
-                with ModbusTcpClient(
-                    host=host["rack1_register"], port=modbus_port, timeout=0.5
-                ) as client_rack1_reg:
-                    r = client_rack1_reg.read_holding_registers(0, 1)
-                    result = r.registers[0]
-                    sensorData["rack_status"]["rack1_status"] = (
-                        (result - 32767) / 32767 * 100
-                    )
-                    
-                    if sensorData["rack_status"]["rack1_status"] <=20:
-                        sensorData["rack_status"]["rack1_status"] = 0
-                    sensorData["rack_no_connection"]["rack1_status"] = False
-                    
-            except Exception as e:
-                sensorData["rack_no_connection"]["rack1_status"] = True
-                
-                print(f"rack1 reg error: {e}")
-                pass
-
-            try:
-                with ModbusTcpClient(
-                    host=host["rack1_coil"], port=modbus_port, timeout=0.5
-                ) as client_rack1_coil:
-                    r = client_rack1_coil.read_coils(0, 2)
-                    sensorData["rack_leak"]["rack1_leak"] = r.bits[0]
-                    sensorData["rack_broken"]["rack1_broken"] = r.bits[1]
-                    sensorData["rack_no_connection"]["rack1_leak"] = False
-                    
-            except Exception as e:
-                sensorData["rack_no_connection"]["rack1_leak"] = True
-                
-                print(f"rack1 reg error: {e}")
-                pass
-
-            try:
-                if not sensorData["rack_leak"]["rack1_leak"]:
-                    with ModbusTcpClient(host="192.168.3.250", port=502) as client:
-                        client.write_coils((8192 + 720), [False])
-                    if ctr_data["rack_set"]["rack1_sw"]:
-                        sensorData["rack_prev"]["rack1"] = True
-                else:
-                    if sensorData["rack_prev"]["rack1"]:
-                        with ModbusTcpClient(host="192.168.3.250", port=502) as client:
-                            client.write_coils((8192 + 720), [True])
-                        sensorData["rack_prev"]["rack1"] = False
-            except Exception as e:
-                print(f"rack1 set control error: {e}")
-
-            # check_rack_error("rack1")
-
-        if ctr_data["rack_visibility"]["rack2_enable"]:
-            try:
-                with ModbusTcpClient(
-                    host=host["rack2_register"], port=modbus_port, timeout=0.5
-                ) as client_rack2_reg:
-                    r = client_rack2_reg.read_holding_registers(0, 1)
-                    result = r.registers[0]
-                    sensorData["rack_status"]["rack2_status"] = (
-                        (result - 32767) / 32767 * 100
-                    )
-                    if sensorData["rack_status"]["rack2_status"] <= 20:
-                        sensorData["rack_status"]["rack2_status"] = 0
-                    sensorData["rack_no_connection"]["rack2_status"] = False
-                    
-            except Exception as e:
-                sensorData["rack_no_connection"]["rack2_status"] = True
-                
-                print(f"rack2 reg error: {e}")
-                pass
-
-            try:
-                with ModbusTcpClient(
-                    host=host["rack2_coil"], port=modbus_port, timeout=0.5
-                ) as client_rack2_coil:
-                    r = client_rack2_coil.read_coils(0, 2)
-                    sensorData["rack_leak"]["rack2_leak"] = r.bits[0]
-                    sensorData["rack_broken"]["rack2_broken"] = r.bits[1]
-                    sensorData["rack_no_connection"]["rack2_leak"] = False
-                    
-            except Exception as e:
-                sensorData["rack_no_connection"]["rack2_leak"] = True
-                
-                print(f"rack2 reg error: {e}")
-                pass
-
-            try:
-                if not sensorData["rack_leak"]["rack2_leak"]:
-                    with ModbusTcpClient(host="192.168.3.250", port=502) as client:
-                        client.write_coils((8192 + 721), [False])
-                    if ctr_data["rack_set"]["rack2_sw"]:
-                        sensorData["rack_prev"]["rack2"] = True
-                else:
-                    if sensorData["rack_prev"]["rack2"]:
-                        with ModbusTcpClient(host="192.168.3.250", port=502) as client:
-                            client.write_coils((8192 + 721), [True])
-                        sensorData["rack_prev"]["rack2"] = False
-            except Exception as e:
-                print(f"rack2 set control error: {e}")
-
-            # check_rack_error("rack2")
-
-        if ctr_data["rack_visibility"]["rack3_enable"]:
-            try:
-                with ModbusTcpClient(
-                    host=host["rack3_register"], port=modbus_port, timeout=0.5
-                ) as client_rack3_reg:
-                    r = client_rack3_reg.read_holding_registers(0, 1)
-                    result = r.registers[0]
-                    sensorData["rack_status"]["rack3_status"] = (
-                        (result - 32767) / 32767 * 100
-                    )
-                    if sensorData["rack_status"]["rack3_status"] <= 20:
-                        sensorData["rack_status"]["rack3_status"] = 0
-                    sensorData["rack_no_connection"]["rack3_status"] = False
-                    
-            except Exception as e:
-                sensorData["rack_no_connection"]["rack3_status"] = True
-                
-                print(f"rack3 reg error: {e}")
-                pass
-
-            try:
-                with ModbusTcpClient(
-                    host=host["rack3_coil"], port=modbus_port, timeout=0.5
-                ) as client_rack3_coil:
-                    r = client_rack3_coil.read_coils(0, 2)
-                    sensorData["rack_leak"]["rack3_leak"] =  r.bits[0]
-                    sensorData["rack_broken"]["rack3_broken"] =  r.bits[1]
-                    sensorData["rack_no_connection"]["rack3_leak"] = False
-                    
-            except Exception as e:
-                sensorData["rack_no_connection"]["rack3_leak"] = True
-                
-                print(f"rack3 reg error: {e}")
-                pass
-
-            try:
-                if not sensorData["rack_leak"]["rack3_leak"]:
-                    with ModbusTcpClient(host="192.168.3.250", port=502) as client:
-                        client.write_coils((8192 + 722), [False])
-                    if ctr_data["rack_set"]["rack3_sw"]:
-                        sensorData["rack_prev"]["rack3"] = True
-                else:
-                    if sensorData["rack_prev"]["rack3"]:
-                        with ModbusTcpClient(host="192.168.3.250", port=502) as client:
-                            client.write_coils((8192 + 722), [True])
-                        sensorData["rack_prev"]["rack3"] = False
-            except Exception as e:
-                print(f"rack3 set control error: {e}")
-
-            # check_rack_error("rack3")
-
-        if ctr_data["rack_visibility"]["rack4_enable"]:
-            try:
-                with ModbusTcpClient(
-                    host=host["rack4_register"], port=modbus_port, timeout=0.5
-                ) as client_rack4_reg:
-                    r = client_rack4_reg.read_holding_registers(0, 1)
-                    result = r.registers[0]
-                    sensorData["rack_status"]["rack4_status"] = (
-                        (result - 32767) / 32767 * 100
-                    )
-                    if sensorData["rack_status"]["rack4_status"] <= 20:
-                        sensorData["rack_status"]["rack4_status"] = 0
-                    sensorData["rack_no_connection"]["rack4_status"] = False
-                    
-            except Exception as e:
-                sensorData["rack_no_connection"]["rack4_status"] = True
-                
-                print(f"rack4 reg error: {e}")
-                pass
-
-            try:
-                with ModbusTcpClient(
-                    host=host["rack4_coil"], port=modbus_port, timeout=0.5
-                ) as client_rack4_coil:
-                    r = client_rack4_coil.read_coils(0, 2)
-                    sensorData["rack_leak"]["rack4_leak"] = r.bits[0]
-                    sensorData["rack_broken"]["rack4_broken"] = r.bits[1]
-                    sensorData["rack_no_connection"]["rack4_leak"] = False
-                    
-            except Exception as e:
-                sensorData["rack_no_connection"]["rack4_leak"] = True
-                
-                print(f"rack4 coil error: {e}")
-                pass
-
-            try:
-                if not sensorData["rack_leak"]["rack4_leak"]:
-                    with ModbusTcpClient(host="192.168.3.250", port=502) as client:
-                        client.write_coils((8192 + 723), [False])
-                    if ctr_data["rack_set"]["rack4_sw"]:
-                        sensorData["rack_prev"]["rack4"] = True
-                else:
-                    if sensorData["rack_prev"]["rack4"]:
-                        with ModbusTcpClient(host="192.168.3.250", port=502) as client:
-                            client.write_coils((8192 + 723), [True])
-                        sensorData["rack_prev"]["rack4"] = False
-            except Exception as e:
-                print(f"rack4 set control error: {e}")
-
-            # check_rack_error("rack4")
-
-        if ctr_data["rack_visibility"]["rack5_enable"]:
-            try:
-                with ModbusTcpClient(
-                    host=host["rack5_register"], port=modbus_port, timeout=0.5
-                ) as client_rack5_reg:
-                    r = client_rack5_reg.read_holding_registers(0, 1)
-                    result = r.registers[0]
-                    sensorData["rack_status"]["rack5_status"] = (
-                        (result - 32767) / 32767 * 100
-                    )
-                    if sensorData["rack_status"]["rack5_status"] <= 20:
-                        sensorData["rack_status"]["rack5_status"] = 0
-                    sensorData["rack_no_connection"]["rack5_status"] = False
-                    
-            except Exception as e:
-                sensorData["rack_no_connection"]["rack5_status"] = True
-                
-                print(f"rack5 reg error: {e}")
-                pass
-
-            try:
-                with ModbusTcpClient(
-                    host=host["rack5_coil"], port=modbus_port, timeout=0.5
-                ) as client_rack5_coil:
-                    r = client_rack5_coil.read_coils(0, 2)
-                    sensorData["rack_leak"]["rack5_leak"] = r.bits[0]
-                    sensorData["rack_broken"]["rack5_broken"] = r.bits[1]
-                    sensorData["rack_no_connection"]["rack5_leak"] = False
-                    
-            except Exception as e:
-                sensorData["rack_no_connection"]["rack5_leak"] = True
-                
-                print(f"rack5 coil error: {e}")
-                pass
-
-            try:
-                if not sensorData["rack_leak"]["rack5_leak"]:
-                    with ModbusTcpClient(host="192.168.3.250", port=502) as client:
-                        client.write_coils((8192 + 724), [False])
-                    if ctr_data["rack_set"]["rack5_sw"]:
-                        sensorData["rack_prev"]["rack5"] = True
-                else:
-                    if sensorData["rack_prev"]["rack5"]:
-                        with ModbusTcpClient(host="192.168.3.250", port=502) as client:
-                            client.write_coils((8192 + 724), [True])
-                        sensorData["rack_prev"]["rack5"] = False
-            except Exception as e:
-                print(f"rack5 set control error: {e}")
-
-            # check_rack_error("rack5")
-
-        if ctr_data["rack_visibility"]["rack6_enable"]:
-            try:
-                with ModbusTcpClient(
-                    host=host["rack6_register"], port=modbus_port, timeout=0.5
-                ) as client_rack6_reg:
-                    r = client_rack6_reg.read_holding_registers(0, 1)
-                    result = r.registers[0]
-                    sensorData["rack_status"]["rack6_status"] = (
-                        (result - 32767) / 32767 * 100
-                    )
-                    if sensorData["rack_status"]["rack6_status"] <= 20:
-                        sensorData["rack_status"]["rack6_status"] = 0
-                    sensorData["rack_no_connection"]["rack6_status"] = False
-            except Exception as e:
-                sensorData["rack_no_connection"]["rack6_status"] = True
-                print(f"rack6 reg error: {e}")
-                pass
-
-            try:
-                with ModbusTcpClient(
-                    host=host["rack6_coil"], port=modbus_port, timeout=0.5
-                ) as client_rack6_coil:
-                    r = client_rack6_coil.read_coils(0, 2)
-                    sensorData["rack_leak"]["rack6_leak"] = r.bits[0]
-                    sensorData["rack_broken"]["rack6_broken"] = r.bits[1]
-                    sensorData["rack_no_connection"]["rack6_leak"] = False
-            except Exception as e:
-                sensorData["rack_no_connection"]["rack6_leak"] = True
-                print(f"rack6 coil error: {e}")
-                pass
-
-            try:
-                if not sensorData["rack_leak"]["rack6_leak"]:
-                    with ModbusTcpClient(host="192.168.3.250", port=502) as client:
-                        client.write_coils((8192 + 725), [False])
-                    if ctr_data["rack_set"]["rack6_sw"]:
-                        sensorData["rack_prev"]["rack6"] = True
-                else:
-                    if sensorData["rack_prev"]["rack6"]:
-                        with ModbusTcpClient(host="192.168.3.250", port=502) as client:
-                            client.write_coils((8192 + 725), [True])
-                        sensorData["rack_prev"]["rack6"] = False
-            except Exception as e:
-                print(f"rack5 set control error: {e}")
-
-            # check_rack_error("rack6")
-
-        if ctr_data["rack_visibility"]["rack7_enable"]:
-            try:
-                with ModbusTcpClient(
-                    host=host["rack7_register"], port=modbus_port, timeout=0.5
-                ) as client_rack7_reg:
-                    r = client_rack7_reg.read_holding_registers(0, 1)
-                    result = r.registers[0]
-                    sensorData["rack_status"]["rack7_status"] = (
-                        (result - 32767) / 32767 * 100
-                    )
-                    if sensorData["rack_status"]["rack7_status"] <= 20:
-                        sensorData["rack_status"]["rack7_status"] = 0
-                    sensorData["rack_no_connection"]["rack7_status"] = False
-            except Exception as e:
-                sensorData["rack_no_connection"]["rack7_status"] = True
-                print(f"rack7 reg error: {e}")
-                pass
-
-            try:
-                with ModbusTcpClient(
-                    host=host["rack7_coil"], port=modbus_port, timeout=0.5
-                ) as client_rack7_coil:
-                    r = client_rack7_coil.read_coils(0, 2)
-                    sensorData["rack_leak"]["rack7_leak"] = r.bits[0]
-                    sensorData["rack_broken"]["rack7_broken"] = r.bits[1]
-                    sensorData["rack_no_connection"]["rack7_leak"] = False
-            except Exception as e:
-                sensorData["rack_no_connection"]["rack7_leak"] = True
-                print(f"rack7 coil error: {e}")
-                pass
-
-            try:
-                if not sensorData["rack_leak"]["rack7_leak"]:
-                    with ModbusTcpClient(host="192.168.3.250", port=502) as client:
-                        client.write_coils((8192 + 726), [False])
-                    if ctr_data["rack_set"]["rack7_sw"]:
-                        sensorData["rack_prev"]["rack7"] = True
-                else:
-                    if sensorData["rack_prev"]["rack7"]:
-                        with ModbusTcpClient(host="192.168.3.250", port=502) as client:
-                            client.write_coils((8192 + 726), [True])
-                        sensorData["rack_prev"]["rack7"] = False
-            except Exception as e:
-                print(f"rack7 set control error: {e}")
-
-            # check_rack_error("rack7")
-
-        if ctr_data["rack_visibility"]["rack8_enable"]:
-            try:
-                with ModbusTcpClient(
-                    host=host["rack8_register"], port=modbus_port, timeout=0.5
-                ) as client_rack8_reg:
-                    r = client_rack8_reg.read_holding_registers(0, 1)
-                    result = r.registers[0]
-                    sensorData["rack_status"]["rack8_status"] = (
-                        (result - 32767) / 32767 * 100
-                    )
-                    if sensorData["rack_status"]["rack8_status"] <= 20:
-                        sensorData["rack_status"]["rack8_status"] = 0
-                    sensorData["rack_no_connection"]["rack8_status"] = False
-
-            except Exception as e:
-                sensorData["rack_no_connection"]["rack8_status"] = True
-                print(f"rack8 reg error: {e}")
-                pass
-
-            try:
-                with ModbusTcpClient(
-                    host=host["rack8_coil"], port=modbus_port, timeout=0.5
-                ) as client_rack8_coil:
-                    r = client_rack8_coil.read_coils(0, 2)
-                    sensorData["rack_leak"]["rack8_leak"] = r.bits[0]
-                    sensorData["rack_broken"]["rack8_broken"] = r.bits[1]
-                    sensorData["rack_no_connection"]["rack8_leak"] = False
-            except Exception as e:
-                sensorData["rack_no_connection"]["rack8_leak"] = True
-                print(f"rack8 coil error: {e}")
-                pass
-
-            try:
-                if not sensorData["rack_leak"]["rack8_leak"]:
-                    with ModbusTcpClient(host="192.168.3.250", port=502) as client:
-                        client.write_coils((8192 + 727), [False])
-                    if ctr_data["rack_set"]["rack8_sw"]:
-                        sensorData["rack_prev"]["rack8"] = True
-                else:
-                    if sensorData["rack_prev"]["rack8"]:
-                        with ModbusTcpClient(host="192.168.3.250", port=502) as client:
-                            client.write_coils((8192 + 727), [True])
-                        sensorData["rack_prev"]["rack8"] = False
-            except Exception as e:
-                print(f"rack8 set control error: {e}")
-
-            # check_rack_error("rack8")
-
-        if ctr_data["rack_visibility"]["rack9_enable"]:
-            try:
-                with ModbusTcpClient(
-                    host=host["rack9_register"], port=modbus_port, timeout=0.5
-                ) as client_rack9_reg:
-                    r = client_rack9_reg.read_holding_registers(0, 1)
-                    result = r.registers[0]
-                    sensorData["rack_status"]["rack9_status"] = (
-                        (result - 32767) / 32767 * 100
-                    )
-                    if sensorData["rack_status"]["rack9_status"] <= 20:
-                        sensorData["rack_status"]["rack9_status"] = 0
-                    sensorData["rack_no_connection"]["rack9_status"] = False
-            except Exception as e:
-                sensorData["rack_no_connection"]["rack9_status"] = True
-                print(f"rack9 reg error: {e}")
-                pass
-
-            try:
-                with ModbusTcpClient(
-                    host=host["rack9_coil"], port=modbus_port, timeout=0.5
-                ) as client_rack9_coil:
-                    r = client_rack9_coil.read_coils(0, 2)
-                    sensorData["rack_leak"]["rack9_leak"] = r.bits[0]
-                    sensorData["rack_broken"]["rack9_broken"] = r.bits[1]
-                    sensorData["rack_no_connection"]["rack9_leak"] = False
-            except Exception as e:
-                sensorData["rack_no_connection"]["rack9_leak"] = True
-                print(f"rack9 coil error: {e}")
-                pass
-
-            try:
-                if not sensorData["rack_leak"]["rack9_leak"]:
-                    with ModbusTcpClient(host="192.168.3.250", port=502) as client:
-                        client.write_coils((8192 + 728), [False])
-                    if ctr_data["rack_set"]["rack9_sw"]:
-                        sensorData["rack_prev"]["rack9"] = True
-                else:
-                    if sensorData["rack_prev"]["rack9"]:
-                        with ModbusTcpClient(host="192.168.3.250", port=502) as client:
-                            client.write_coils((8192 + 728), [True])
-                        sensorData["rack_prev"]["rack9"] = False
-            except Exception as e:
-                print(f"rack9 set control error: {e}")
-
-            # check_rack_error("rack9")
-
-        if ctr_data["rack_visibility"]["rack10_enable"]:
-            try:
-                with ModbusTcpClient(
-                    host=host["rack10_register"], port=modbus_port, timeout=0.5
-                ) as client_rack10_reg:
-                    r = client_rack10_reg.read_holding_registers(0, 1)
-                    result = r.registers[0]
-                    sensorData["rack_status"]["rack10_status"] = (
-                        (result - 32767) / 32767 * 100
-                    )
-                    if sensorData["rack_status"]["rack10_status"] <= 20:
-                        sensorData["rack_status"]["rack10_status"] = 0
-                    sensorData["rack_no_connection"]["rack10_status"] = False
-
-            except Exception as e:
-                sensorData["rack_no_connection"]["rack10_status"] = True
-                print(f"rack10 reg error: {e}")
-                pass
-
-            try:
-                with ModbusTcpClient(
-                    host=host["rack10_coil"], port=modbus_port, timeout=0.5
-                ) as client_rack10_coil:
-                    r = client_rack10_coil.read_coils(0, 2)
-                    sensorData["rack_leak"]["rack10_leak"] = r.bits[0]
-                    sensorData["rack_broken"]["rack10_broken"] = r.bits[1]
-                    sensorData["rack_no_connection"]["rack10_leak"] = False
-            except Exception as e:
-                sensorData["rack_no_connection"]["rack10_leak"] = True
-                print(f"rack10 coil error: {e}")
-                pass
+        enabled_racks = [
+            key[: -len("_enable")]
+            for key, enabled in ctr_data["rack_visibility"].items()
+            if enabled
+        ]
+        readings = rack_poller.poll(enabled_racks)
+
+        for rack in enabled_racks:
+            reading = readings[rack]
+            if reading.register is not None:
+                status = (reading.register - 32767) / 32767 * 100
+                sensorData["rack_status"][f"{rack}_status"] = 0 if status <= 20 else status
+                sensorData["rack_no_connection"][f"{rack}_status"] = False
+            else:
+                sensorData["rack_no_connection"][f"{rack}_status"] = True
 
-            try:
-                if not sensorData["rack_leak"]["rack10_leak"]:
-                    with ModbusTcpClient(host="192.168.3.250", port=502) as client:
-                        client.write_coils((8192 + 729), [False])
-                    if ctr_data["rack_set"]["rack10_sw"]:
-                        sensorData["rack_prev"]["rack10"] = True
-                else:
-                    if sensorData["rack_prev"]["rack10"]:
-                        with ModbusTcpClient(host="192.168.3.250", port=502) as client:
-                            client.write_coils((8192 + 729), [True])
-                        sensorData["rack_prev"]["rack10"] = False
-            except Exception as e:
-                print(f"rack10 set control error: {e}")
+            if reading.bits is not None:
+                sensorData["rack_leak"][f"{rack}_leak"] = reading.bits[0]
+                sensorData["rack_broken"][f"{rack}_broken"] = reading.bits[1]
+                sensorData["rack_no_connection"][f"{rack}_leak"] = False
+            else:
+                sensorData["rack_no_connection"][f"{rack}_leak"] = True
 
-            # check_rack_error("rack10")
+        if enabled_racks:
+            update_rack_leak_control(enabled_racks)
         check_rack_com()
         for i, (key, enabled) in enumerate(ctr_data["rack_visibility"].items(), start=1):
             rack_name = f"rack{i}"
@@ -10023,14 +8539,30 @@ def read_rack_status():
         time.sleep(1)
 
 
-read_rack_status = threading.Thread(target=read_rack_status)
-read_rack_status.daemon = True
-read_rack_status.start()
+def update_live_state(changed):
+    if "sensor_data.json" in changed or "version.json" in changed:
+        sensor_snapshot.update(sensorData)
+        live_stream.update({"data": sensorData, "version": ver_switch})
+    if "state_on_demand.json" in changed:
+        read_data.notify()
+    if "scc_plc.json" in changed:
+        apply_scc_model()
+
 
+if webui_role in ("all", "poller"):
+    read_rack_status = threading.Thread(target=read_rack_status)
+    read_rack_status.daemon = True
+    read_rack_status.start()
 
-modbus_thread = threading.Thread(target=read_modbus_data)
-modbus_thread.daemon = True
-modbus_thread.start()
+    modbus_thread = threading.Thread(target=read_modbus_data)
+    modbus_thread.daemon = True
+    modbus_thread.start()
+else:
+    state_reader = JsonStateReader(
+        f"{web_path}/json", shared_state, on_change=update_live_state
+    )
+    update_live_state(state_reader.refresh())
+    state_reader.start()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,268 @@
+import random
+import threading
+import time
+from collections import namedtuple
+
+from pymodbus.client.sync import ModbusTcpClient
+from pymodbus.exceptions import ConnectionException
+
+
+# 單一寫入請求的上限，與 modbus_poll 的讀取上限一致
+MAX_REGISTERS = 120
+MAX_COILS = 256
+
+WRITE_METHODS = {
+    "register": "write_registers",
+    "coil": "write_coils",
+}
+# 只寫一個值時用 FC06 / FC05，與各 handler 原本的寫法相同
+SINGLE_WRITE_METHODS = {
+    "register": "write_register",
+    "coil": "write_coil",
+}
+READ_METHODS = {
+    "register": "read_holding_registers",
+    "coil": "read_coils",
+}
+
+WriteBlock = namedtuple("WriteBlock", ["kind", "address", "values", "verify"])
+
+
+class WritePlan:
+    """
+    一次要寫入 PLC 的所有 register / coil。
+
+    同一位址重複寫入時以最後一次為準；blocks() 把連續位址合併成
+    盡量少的寫入請求。verify=False 的位址 (運轉時間計數器等寫入後 PLC
+    會立即改動的值) 寫入後不讀回比對，也不會與需要比對的位址合併。
+    """
+
+    def __init__(self):
+        self.values = {kind: {} for kind in WRITE_METHODS}
+
+    def registers(self, address, values, verify=True):
+        for offset, value in enumerate(values):
+            self.values["register"][address + offset] = (int(value), verify)
+        return self
+
+    def coils(self, address, values, verify=True):
+        for offset, value in enumerate(values):
+            self.values["coil"][address + offset] = (bool(value), verify)
+        return self
+
+    def __len__(self):
+        return sum(len(values) for values in self.values.values())
+
+    def blocks(self):
+        blocks = []
+        for kind, values in self.values.items():
+            limit = MAX_REGISTERS if kind == "register" else MAX_COILS
+            current = None
+            for address in sorted(values):
+                value, verify = values[address]
+                if (
+                    current is not None
+                    and address == current.address + len(current.values)
+                    and verify == current.verify
+                    and len(current.values) < limit
+                ):
+                    current.values.append(value)
+                    continue
+                current = WriteBlock(kind, address, [value], verify)
+                blocks.append(current)
+        return blocks
+
+
+class BulkWriteResult:
+    def __init__(self, blocks, failed, attempts):
+        self.blocks = blocks
+        self.failed = failed
+        self.attempts = attempts
+
+    @property
+    def ok(self):
+        return not self.failed
+
+    def describe_failed(self):
+        return [
+            f"{block.kind} {block.address}-{block.address + len(block.values) - 1}"
+            for block in self.failed
+        ]
+
+
+class BulkWriter:
+    """
+    以一條連線執行 WritePlan：每個區塊一次寫入，寫完讀回比對。
+
+    寫入或比對失敗的區塊在該輪結束後關閉連線、重新連線，只重送失敗的區塊，
+    最多 max_retries 輪。
+    """
+
+    def __init__(self, host, port, unit=1, timeout=3, max_retries=3, retry_delay=0.5):
+        self.host = host
+        self.port = port
+        self.unit = unit
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+    def _write_block(self, client, block):
+        response = getattr(client, WRITE_METHODS[block.kind])(
+            block.address, block.values, unit=self.unit
+        )
+        if response.isError():
+            raise ValueError(response)
+        if not block.verify:
+            return
+
+        response = getattr(client, READ_METHODS[block.kind])(
+            block.address, len(block.values), unit=self.unit
+        )
+        if response.isError():
+            raise ValueError(response)
+        if block.kind == "register":
+            actual = list(response.registers)
+        else:
+            actual = list(response.bits[: len(block.values)])
+        if actual != block.values:
+            raise ValueError(f"readback mismatch {actual} != {block.values}")
+
+    def write(self, plan):
+        blocks = plan.blocks()
+        pending = blocks
+        attempts = 0
+        while pending and attempts < self.max_retries:
+            if attempts:
+                time.sleep(self.retry_delay)
+            attempts += 1
+            failed = []
+            client = ModbusTcpClient(host=self.host, port=self.port, timeout=self.timeout)
+            try:
+                if not client.connect():
+                    raise ConnectionException(f"{self.host}:{self.port}")
+                for index, block in enumerate(pending):
+                    try:
+                        self._write_block(client, block)
+                    except ConnectionException as e:
+                        print(f"bulk write attempt {attempts} failed: {e}")
+                        failed.extend(pending[index:])
+                        break
+                    except Exception as e:
+                        print(
+                            f"bulk write {block.kind} {block.address} "
+                            f"attempt {attempts} failed: {e}"
+                        )
+                        failed.append(block)
+            except Exception as e:
+                print(f"bulk write attempt {attempts} failed: {e}")
+                failed = pending
+            finally:
+                client.close()
+            pending = failed
+
+        if pending:
+            print("Max retries reached. Write failed.")
+        return BulkWriteResult(blocks, pending, attempts)
+
+
+WriteItemResult = namedtuple("WriteItemResult", ["method", "address", "ok", "error"])
+
+
+class WriteOutcome:
+    def __init__(self, results):
+        self.results = results
+
+    @property
+    def ok(self):
+        return all(result.ok for result in self.results)
+
+    @property
+    def failed(self):
+        return [result for result in self.results if not result.ok]
+
+
+class ModbusWriter:
+    """
+    各 handler 共用的 PLC 寫入。
+
+    常駐一條連線，把一組 (method, address, value) 依序送出，method 為
+    "register" 或 "coil"；只有一個值的項目以 FC06 / FC05 寫入，多個值才用
+    FC16 / FC15。某一項失敗時關閉連線，等待帶隨機抖動的指數退避後
+    重新連線，從失敗的那一項繼續，已成功的項目不重送；整個呼叫超過 deadline
+    秒就放棄，剩下的項目回報失敗。
+    """
+
+    def __init__(
+        self,
+        host,
+        port,
+        unit=1,
+        timeout=1,
+        deadline=3.0,
+        backoff_base=0.1,
+        backoff_max=1.0,
+    ):
+        self.client = ModbusTcpClient(host=host, port=port, timeout=timeout)
+        self.unit = unit
+        self.deadline = deadline
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lock = threading.Lock()
+
+    def _send(self, method, address, values):
+        if not self.client.connect():
+            raise ConnectionException(f"{self.client.host}:{self.client.port}")
+        if len(values) == 1:
+            response = getattr(self.client, SINGLE_WRITE_METHODS[method])(
+                address, values[0], unit=self.unit
+            )
+        else:
+            response = getattr(self.client, WRITE_METHODS[method])(
+                address, values, unit=self.unit
+            )
+        if response.isError():
+            raise ValueError(response)
+
+    def write(self, writes, deadline=None):
+        """回傳 WriteOutcome，results 與 writes 一一對應"""
+        end = time.monotonic() + (self.deadline if deadline is None else deadline)
+        results = []
+        if not self.lock.acquire(timeout=max(0, end - time.monotonic())):
+            error = "writer busy"
+            return WriteOutcome(
+                [WriteItemResult(m, a, False, error) for m, a, _ in writes]
+            )
+
+        try:
+            attempt = 0
+            index = 0
+            while index < len(writes):
+                method, address, value = writes[index]
+                values = value if isinstance(value, (list, tuple)) else [value]
+                try:
+                    self._send(method, address, list(values))
+                except Exception as e:
+                    self.client.close()
+                    attempt += 1
+                    delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+                    delay *= random.uniform(0.5, 1.0)
+                    print(f"Write {method} {address} attempt {attempt} failed: {e}")
+                    if time.monotonic() + delay >= end:
+                        print("Write deadline reached. Write failed.")
+                        results.append(WriteItemResult(method, address, False, str(e)))
+                        results.extend(
+                            WriteItemResult(m, a, False, "not sent")
+                            for m, a, _ in writes[index + 1 :]
+                        )
+                        break
+                    time.sleep(delay)
+                    continue
+                results.append(WriteItemResult(method, address, True, None))
+                index += 1
+        finally:
+            self.lock.release()
+        return WriteOutcome(results)
+
+    def close(self):
+        with self.lock:
+            self.client.close()
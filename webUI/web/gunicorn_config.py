@@ -1,5 +1,29 @@
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+web_dir = os.path.dirname(os.path.abspath(__file__))
+load_dotenv(os.path.join(web_dir, ".env"))
+
 bind = '0.0.0.0:5501'
-workers = 1
+# 輪詢在 app 內執行時 (WEBUI_ROLE=all) 多個 worker 會重複輪詢 PLC，只能開 1 個；
+# 輪詢拆到 web/poller.py 後 (WEBUI_ROLE=web) 才依 CPU 數開 worker
+if os.getenv("WEBUI_ROLE", "all") == "web":
+    workers = int(os.getenv("WEBUI_WORKERS", multiprocessing.cpu_count()))
+else:
+    workers = 1
 thread = 4
 timeout = 120
-worker_class = 'gevent'
\ No newline at end of file
+worker_class = 'gevent'
+
+
+def on_starting(server):
+    # master 啟動時建置一次雜湊 / 預壓縮的靜態檔，worker 載入 app 時直接讀 manifest
+    try:
+        from web.static_assets import build
+
+        manifest = build(os.path.join(web_dir, "static"))
+        server.log.info(f"static assets ready: {len(manifest['assets'])} files")
+    except Exception as e:
+        server.log.error(f"static assets build error: {e}")
@@ -0,0 +1,153 @@
+import gzip
+import hashlib
+import json
+import math
+import queue
+import threading
+import time
+from collections import namedtuple
+
+
+# 小於此大小的 body 壓縮效益不大，不另存 gzip 版本
+GZIP_MIN_SIZE = 1024
+
+Snapshot = namedtuple("Snapshot", ["etag", "body", "gzip_body"])
+
+
+def scrub(value):
+    """複製狀態並把 NaN 換成 0，瀏覽器的 JSON.parse 不接受 NaN"""
+    if isinstance(value, dict):
+        return {k: scrub(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [scrub(v) for v in value]
+    if isinstance(value, float) and math.isnan(value):
+        return 0
+    return value
+
+
+def diff_state(previous, current):
+    """回傳只含變動欄位的巢狀 dict；沒有變動回傳 None"""
+    if not isinstance(previous, dict) or not isinstance(current, dict):
+        return None if previous == current else current
+
+    patch = {}
+    for key, value in current.items():
+        if key not in previous:
+            patch[key] = value
+            continue
+        changed = diff_state(previous[key], value)
+        if changed is not None:
+            patch[key] = changed
+    return patch or None
+
+
+def sse_frame(event, payload):
+    # 與 flask jsonify 相同以 key 排序，前端拿到的欄位順序和 /get_data 一致
+    data = json.dumps(payload, separators=(",", ":"), sort_keys=True)
+    return f"event: {event}\ndata: {data}\n\n".encode()
+
+
+class LiveStateBroadcaster:
+    """
+    將 poller 每輪的狀態推送給所有連線中的 dashboard (Server-Sent Events)。
+
+    每次 update 只計算一次差異並編碼成 SSE frame，所有 client 共用同一份 bytes；
+    平常只送 "patch"，每 full_interval 秒送一次完整的 "full" frame。
+    處理不及的 client 佇列滿了就清空，改送 full frame 重新同步。
+    """
+
+    def __init__(self, full_interval=30, heartbeat=15, max_queue=32):
+        self.full_interval = full_interval
+        self.heartbeat = heartbeat
+        self.max_queue = max_queue
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self.state = None
+        self.full_frame = None
+        self.last_full = 0
+
+    def update(self, state):
+        snapshot = scrub(state)
+        now = time.time()
+        with self.lock:
+            previous = self.state
+            self.state = snapshot
+            self.full_frame = sse_frame("full", snapshot)
+
+            if previous is None or now - self.last_full >= self.full_interval:
+                frame = self.full_frame
+                self.last_full = now
+            else:
+                patch = diff_state(previous, snapshot)
+                if patch is None:
+                    return
+                frame = sse_frame("patch", patch)
+
+            subscribers = list(self.subscribers)
+
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(frame)
+            except queue.Full:
+                self._resync(subscriber)
+
+    def _resync(self, subscriber):
+        while True:
+            try:
+                subscriber.get_nowait()
+            except queue.Empty:
+                break
+        subscriber.put_nowait(self.full_frame)
+
+    def stream(self):
+        subscriber = queue.Queue(maxsize=self.max_queue)
+        with self.lock:
+            self.subscribers.add(subscriber)
+            if self.full_frame is not None:
+                subscriber.put_nowait(self.full_frame)
+        try:
+            # 讓瀏覽器斷線後 3 秒重連
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    yield subscriber.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    # 註解行當 heartbeat，避免 nginx / 瀏覽器判定閒置
+                    yield b": keepalive\n\n"
+        finally:
+            with self.lock:
+                self.subscribers.discard(subscriber)
+
+    @property
+    def client_count(self):
+        return len(self.subscribers)
+
+
+class SnapshotCache:
+    """
+    poller 每輪更新一次、已編碼好的 JSON 回應。
+
+    內容只在有變動時重新序列化 (與壓縮)，ETag 取自內容 hash；
+    request handler 直接回傳 current() 的 bytes，或在 ETag 相符時回 304。
+    Snapshot 建好後不再修改，整個物件一次替換，讀取端不需要加鎖。
+    """
+
+    def __init__(self, compress=True):
+        self.compress = compress
+        self.snapshot = None
+
+    def update(self, state):
+        # 與 flask jsonify 相同以 key 排序
+        body = json.dumps(scrub(state), separators=(",", ":"), sort_keys=True).encode()
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        if self.snapshot is not None and self.snapshot.etag == etag:
+            return False
+
+        gzip_body = None
+        if self.compress and len(body) >= GZIP_MIN_SIZE:
+            gzip_body = gzip.compress(body, compresslevel=6, mtime=0)
+        self.snapshot = Snapshot(etag, body, gzip_body)
+        return True
+
+    def current(self):
+        return self.snapshot
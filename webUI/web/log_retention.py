@@ -0,0 +1,199 @@
+import fcntl
+import json
+import os
+import platform
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+if platform.system() == "Linux":
+    onLinux = True
+else:
+    onLinux = False
+
+if onLinux:
+    from web.state_publisher import atomic_write
+else:
+    from state_publisher import atomic_write
+
+
+MANIFEST_FILE = ".retention_manifest.json"
+DATE_IN_NAME = re.compile(r"(\d{4}-\d{2}-\d{2})")
+
+
+def date_from_name(filename):
+    match = DATE_IN_NAME.search(filename)
+    if not match:
+        return None
+    try:
+        return datetime.strptime(match.group(1), "%Y-%m-%d").date().isoformat()
+    except ValueError:
+        return None
+
+
+class LogRetention:
+    """
+    以 manifest 記錄 log 檔的日期與大小，依 manifest 到期刪檔。
+
+    policies 為 {子目錄: (保留天數, 檔名篩選)}，子目錄相對於 root，"" 表示 root 本身。
+    檔名帶日期的檔案 (已換日、不再寫入) 記錄一次就不再 stat；沒有日期的
+    現行檔 (errorlog.log、journal.log...) 在 sweep 時才更新大小與 mtime。
+    換日時由寫入端呼叫 register()；sweep() 另以 listdir 補登漏掉的檔案，
+    不再逐檔 stat 整個目錄。size_budget (bytes) 有設定時，總量超過就從最舊的
+    帶日期檔案開始刪。
+    poller、web worker 各自登記輪替的檔案，manifest 是共用的：每次修改都在
+    檔案鎖內重新讀取 manifest 再合併寫回，不會覆蓋其他行程的登記。
+    """
+
+    def __init__(self, root, policies, size_budget=None, interval=6 * 3600):
+        self.root = root
+        self.policies = policies
+        self.size_budget = size_budget
+        self.interval = interval
+        self.manifest_path = os.path.join(root, MANIFEST_FILE)
+        self.lock_path = self.manifest_path + ".lock"
+        self.lock = threading.Lock()
+        self.files = self._load()
+        self.last_sweep = 0
+
+    def _load(self):
+        try:
+            with open(self.manifest_path, "r") as file:
+                return json.load(file)["files"]
+        except Exception:
+            return {}
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _save(self):
+        payload = json.dumps({"files": self.files, "updated": time.time()})
+        atomic_write(self.manifest_path, payload.encode())
+
+    def _policy(self, relpath):
+        subdir, filename = os.path.split(relpath)
+        policy = self.policies.get(subdir)
+        if policy is None:
+            return None
+        days, select = policy
+        if select is not None and not select(filename):
+            return None
+        return days
+
+    def _entry(self, path, filename):
+        st = os.stat(path)
+        named = date_from_name(filename)
+        return {
+            "date": named or date.fromtimestamp(st.st_mtime).isoformat(),
+            "size": st.st_size,
+            # 沒有日期或日期是今天的檔案仍在寫入，sweep 時要重新 stat
+            "live": named is None or named >= date.today().isoformat(),
+        }
+
+    def register(self, path):
+        """換日或輪替後登記檔案 (通常是剛結束寫入的舊檔)"""
+        relpath = os.path.relpath(path, self.root)
+        if self._policy(relpath) is None:
+            return
+        try:
+            entry = self._entry(path, os.path.basename(path))
+        except OSError:
+            return
+        with self.lock, self._file_lock():
+            self.files = self._load()
+            self.files[relpath] = entry
+            self._save()
+
+    def rotator(self, source, dest):
+        """給 logging handler 的 rotator，輪替同時登記到 manifest"""
+        if os.path.exists(source):
+            os.rename(source, dest)
+            self.register(dest)
+
+    def _reconcile(self):
+        # 只 listdir，已登記且帶日期的檔案不再 stat
+        seen = set()
+        for subdir in self.policies:
+            directory = os.path.join(self.root, subdir)
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for filename in names:
+                relpath = os.path.join(subdir, filename)
+                if self._policy(relpath) is None:
+                    continue
+                entry = self.files.get(relpath)
+                if entry is not None and not entry["live"]:
+                    seen.add(relpath)
+                    continue
+                try:
+                    path = os.path.join(directory, filename)
+                    if not os.path.isfile(path):
+                        continue
+                    self.files[relpath] = self._entry(path, filename)
+                    seen.add(relpath)
+                except OSError:
+                    continue
+        for relpath in list(self.files):
+            if relpath not in seen:
+                del self.files[relpath]
+
+    def _remove(self, relpath):
+        try:
+            os.remove(os.path.join(self.root, relpath))
+            print(f"Deleted old log file: {os.path.join(self.root, relpath)}")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"delete log file error: {e}")
+            return
+        del self.files[relpath]
+
+    def sweep(self, today=None):
+        today = today or date.today()
+        with self.lock, self._file_lock():
+            self.files = self._load()
+            self._reconcile()
+
+            for relpath, entry in list(self.files.items()):
+                days = self._policy(relpath)
+                if days is None:
+                    continue
+                if entry["date"] < (today - timedelta(days=days)).isoformat():
+                    self._remove(relpath)
+
+            if self.size_budget:
+                total = sum(entry["size"] for entry in self.files.values())
+                dated = sorted(
+                    (entry["date"], relpath)
+                    for relpath, entry in self.files.items()
+                    if not entry["live"]
+                )
+                for _, relpath in dated:
+                    if total <= self.size_budget:
+                        break
+                    size = self.files[relpath]["size"]
+                    self._remove(relpath)
+                    if relpath not in self.files:
+                        total -= size
+
+            self._save()
+            self.last_sweep = time.monotonic()
+
+    def maybe_sweep(self):
+        """由輪詢迴圈呼叫；只有距上次超過 interval 才真的執行"""
+        if self.last_sweep and time.monotonic() - self.last_sweep < self.interval:
+            return
+        try:
+            self.sweep()
+        except Exception as e:
+            print(f"log retention error: {e}")
@@ -0,0 +1,330 @@
+import os
+import threading
+import time
+
+from pymodbus.client.sync import ModbusTcpClient
+from pymodbus.exceptions import ConnectionException
+from pymodbus.pdu import ExceptionResponse
+
+
+# 單一請求的上限，與讀取 thrshd 時的 read_num (120) 一致
+MAX_REGISTERS = 120
+MAX_BITS = 256
+# 兩段位址間距在此範圍內就合併成一次讀取，多讀的空位比多一次來回便宜
+MAX_REGISTER_GAP = 40
+MAX_BIT_GAP = 64
+
+READ_METHODS = {
+    "hr": "read_holding_registers",
+    "coil": "read_coils",
+    "di": "read_discrete_inputs",
+}
+
+
+def coalesce(ranges, max_gap, max_count):
+    """
+    把 (address, count) 清單合併成盡量少的連續區塊。
+    回傳 [(start, count, parts), ...]，已依位址排序；parts 為併入該區塊的原始範圍，
+    區塊讀取失敗時改回逐段讀取。
+    """
+    blocks = []
+    for address, count in sorted(set(ranges)):
+        if blocks:
+            start, length, parts = blocks[-1]
+            end = start + length
+            new_end = max(end, address + count)
+            if address - end <= max_gap and new_end - start <= max_count:
+                parts.append((address, count))
+                blocks[-1] = (start, new_end - start, parts)
+                continue
+        blocks.append((address, count, [(address, count)]))
+    return blocks
+
+
+class ReadPlan:
+    """一個輪詢週期要讀取的所有位址，依種類 (hr / coil / di) 合併成 bulk 請求"""
+
+    def __init__(self):
+        self.ranges = {kind: [] for kind in READ_METHODS}
+
+    def add(self, kind, address, count=1):
+        self.ranges[kind].append((address, count))
+        return self
+
+    def blocks(self):
+        for kind, ranges in self.ranges.items():
+            if kind == "hr":
+                merged = coalesce(ranges, MAX_REGISTER_GAP, MAX_REGISTERS)
+            else:
+                merged = coalesce(ranges, MAX_BIT_GAP, MAX_BITS)
+            for start, count, parts in merged:
+                yield kind, start, count, parts
+
+
+class CachedResponse:
+    """模擬 pymodbus 回應物件，讓既有的 r.registers / r.bits / r.isError() 寫法不用改"""
+
+    def __init__(self, kind, values):
+        if kind == "hr":
+            self.registers = values
+        else:
+            self.bits = values
+
+    def isError(self):
+        return False
+
+
+class PollCycle:
+    """
+    一個輪詢週期的讀取結果。
+
+    提供與 ModbusTcpClient 相同的 read_* 介面，可直接取代
+    `with ModbusTcpClient(...) as client:` 的 client；
+    不在讀取計畫內的位址會改用同一條常駐連線即時讀取。
+    """
+
+    def __init__(self, client, unit):
+        self.client = client
+        self.unit = unit
+        self.blocks = {kind: [] for kind in READ_METHODS}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def _read(self, kind, address, count):
+        for start, length, response in self.blocks[kind]:
+            if start <= address and address + count <= start + length:
+                if response.isError():
+                    return response
+                offset = address - start
+                if kind == "hr":
+                    values = response.registers[offset : offset + count]
+                else:
+                    values = response.bits[offset : offset + count]
+                return CachedResponse(kind, values)
+
+        return getattr(self.client, READ_METHODS[kind])(address, count, unit=self.unit)
+
+    def read_holding_registers(self, address, count=1, **kwargs):
+        return self._read("hr", address, count)
+
+    def read_coils(self, address, count=1, **kwargs):
+        return self._read("coil", address, count)
+
+    def read_discrete_inputs(self, address, count=1, **kwargs):
+        return self._read("di", address, count)
+
+
+class ModbusPoller:
+    """
+    以一條常駐 TCP 連線執行讀取計畫，並統計實際的更新週期。
+
+    合併後的區塊讀取失敗時，改回原本的範圍逐段讀取，單段的錯誤
+    不會連帶影響同一區塊內其他可讀的位址。連線失敗時關閉 socket，下一輪自動重連。
+    """
+
+    def __init__(self, host, port, unit=1, timeout=1):
+        self.client = ModbusTcpClient(host=host, port=port, timeout=timeout)
+        self.unit = unit
+        self.status = {
+            "period": 0.0,
+            "cycle_time": 0.0,
+            "requests": 0,
+            "cycles": 0,
+            "last_update": None,
+        }
+        self._last_start = None
+        # 合併讀取曾被 PLC 以 exception 拒絕的區塊
+        self.split_blocks = set()
+
+    def _read_block(self, kind, address, count):
+        return getattr(self.client, READ_METHODS[kind])(address, count, unit=self.unit)
+
+    def poll(self, plan):
+        start = time.time()
+        if self._last_start is not None:
+            period = start - self._last_start
+            # 指數移動平均，避免單次延遲造成數字跳動
+            if self.status["period"]:
+                self.status["period"] = round(
+                    self.status["period"] * 0.8 + period * 0.2, 3
+                )
+            else:
+                self.status["period"] = round(period, 3)
+        self._last_start = start
+
+        if not self.client.connect():
+            raise ConnectionException(f"{self.client.host}:{self.client.port}")
+
+        cycle = PollCycle(self.client, self.unit)
+        requests = 0
+        try:
+            for kind, address, count, parts in plan.blocks():
+                if len(parts) > 1 and (kind, address, count) not in self.split_blocks:
+                    try:
+                        response = self._read_block(kind, address, count)
+                    except ConnectionException:
+                        raise
+                    except Exception as e:
+                        response = None
+                        print(f"merged read {kind} {address}+{count} failed: {e}")
+                    requests += 1
+                    if response is not None and not response.isError():
+                        cycle.blocks[kind].append((address, count, response))
+                        continue
+                    if isinstance(response, ExceptionResponse):
+                        # PLC 拒絕合併後多讀的空位，之後這一段都直接逐段讀取
+                        self.split_blocks.add((kind, address, count))
+                for part_address, part_count in parts:
+                    response = self._read_block(kind, part_address, part_count)
+                    cycle.blocks[kind].append((part_address, part_count, response))
+                    requests += 1
+        except Exception:
+            self.client.close()
+            raise
+
+        self.status["cycle_time"] = round(time.time() - start, 3)
+        self.status["requests"] = requests
+        self.status["cycles"] += 1
+        self.status["last_update"] = start
+        return cycle
+
+    def close(self):
+        self.client.close()
+
+
+class OnDemandReads:
+    """
+    頁面按需讀取的請求 / 完成交握。
+
+    request() 把該項目標記為待讀並等待 poller 完成，同時等待的多個請求
+    共用同一次 PLC 讀取；poller 以 begin() 取走待讀項目，讀完呼叫
+    complete()，失敗則呼叫 fail() 留待下一輪重試。
+    """
+
+    def __init__(self, names):
+        self.condition = threading.Condition()
+        self.pending = {name: False for name in names}
+        self.in_progress = {name: False for name in names}
+        self.generation = {name: 0 for name in names}
+        self.waiters = {name: 0 for name in names}
+
+    def request(self, name, timeout):
+        """等到一次在請求之後才開始的讀取完成；逾時回傳 False"""
+        with self.condition:
+            # 正在進行中的讀取可能在請求前就讀過 PLC，要等下一次
+            target = self.generation[name] + (2 if self.in_progress[name] else 1)
+            self.pending[name] = True
+            self.waiters[name] += 1
+            try:
+                done = self.condition.wait_for(
+                    lambda: self.generation[name] >= target, timeout
+                )
+            finally:
+                self.waiters[name] -= 1
+            if not done and self.waiters[name] == 0:
+                self.pending[name] = False
+            return done
+
+    def begin(self, name):
+        with self.condition:
+            if not self.pending[name]:
+                return False
+            self.pending[name] = False
+            self.in_progress[name] = True
+            return True
+
+    def complete(self, name):
+        with self.condition:
+            self.in_progress[name] = False
+            self.generation[name] += 1
+            self.condition.notify_all()
+
+    def fail(self, name):
+        with self.condition:
+            self.in_progress[name] = False
+            if self.waiters[name]:
+                self.pending[name] = True
+
+
+class SharedOnDemandReads:
+    """
+    跨行程版的 OnDemandReads，poller 與 web worker 分開執行時使用，介面相同。
+
+    request() 在 directory 寫入 <name>.request (內容為請求時間)；poller 的
+    begin() 看到 request 檔就取走並開始讀取，complete() 把讀取開始時間記在
+    done。done 與其他狀態一起由 JsonStatePublisher 發佈，web worker 的
+    JsonStateReader 讀回後呼叫 notify() 喚醒等待中的 request()，回應時
+    讀到的已是這次讀取之後發佈的狀態。失敗時在 retry_window 秒內重新排入，
+    之後就放棄，避免沒人等的請求一直重試。
+    """
+
+    def __init__(self, names, directory, retry_window=10):
+        self.directory = directory
+        self.retry_window = retry_window
+        self.in_progress = {name: None for name in names}
+        self.done = {}
+        self.condition = threading.Condition()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name, suffix):
+        return os.path.join(self.directory, f"{name}.{suffix}")
+
+    def _write(self, name, suffix, value):
+        path = self._path(name, suffix)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as file:
+            file.write(repr(value))
+        os.replace(tmp_path, path)
+
+    def _read(self, name, suffix):
+        try:
+            with open(self._path(name, suffix), "r") as file:
+                return float(file.read())
+        except (OSError, ValueError):
+            return None
+
+    def request(self, name, timeout):
+        requested = time.time()
+        self._write(name, "request", requested)
+        with self.condition:
+            return self.condition.wait_for(
+                lambda: self.done.get(name, 0) >= requested, timeout
+            )
+
+    def notify(self):
+        """done 被 JsonStateReader 更新後呼叫"""
+        with self.condition:
+            self.condition.notify_all()
+
+    def begin(self, name):
+        requested = self._read(name, "request")
+        if requested is None:
+            return False
+        try:
+            os.remove(self._path(name, "request"))
+        except OSError:
+            pass
+        # 取走之後才記錄開始時間，之前寫入的請求都會被這次讀取滿足
+        self.in_progress[name] = (time.time(), requested)
+        return True
+
+    def complete(self, name):
+        if self.in_progress[name] is None:
+            return
+        started, _ = self.in_progress[name]
+        self.in_progress[name] = None
+        self.done[name] = started
+
+    def fail(self, name):
+        if self.in_progress[name] is None:
+            return
+        _, requested = self.in_progress[name]
+        self.in_progress[name] = None
+        if time.time() - requested < self.retry_window and not os.path.exists(
+            self._path(name, "request")
+        ):
+            self._write(name, "request", requested)
@@ -0,0 +1,21 @@
+"""
+獨立的 PLC 輪詢服務。
+
+以 WEBUI_ROLE=poller 載入 app，只啟動 read_modbus_data / read_rack_status
+並發佈狀態到 web/json；gunicorn 以 WEBUI_ROLE=web 執行時只讀取這些狀態，
+可以開多個 worker 而不會重複輪詢 PLC。
+
+    cd webUI && python -m web.poller
+"""
+
+import os
+import time
+
+os.environ["WEBUI_ROLE"] = "poller"
+
+import web.app  # noqa: E402,F401  (載入即啟動輪詢執行緒)
+
+
+if __name__ == "__main__":
+    while True:
+        time.sleep(60)
@@ -0,0 +1,210 @@
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from pymodbus.client.sync import ModbusTcpClient
+
+
+RACK_COUNT = 10
+# rackN 的狀態暫存器在 192.168.3.(19+N)，漏液 / 斷線 coil 在 192.168.3.(9+N)
+REGISTER_HOST = "192.168.3.{}"
+REGISTER_HOST_BASE = 19
+COIL_HOST_BASE = 9
+# 單次讀取的 socket timeout 與整輪輪詢的上限 (秒)
+TIMEOUT = 0.5
+SWEEP_TIMEOUT = 1.5
+# 連續失敗第二次起開始退避，1、2、4 ... 最多 30 秒才重試一次
+BACKOFF_BASE = 1
+BACKOFF_MAX = 30
+
+# rack gateway (modbus_proxy/rack_gateway.py) 的位址表
+GATEWAY_STATUS_OFFSET = 0
+GATEWAY_LEAK_OFFSET = 0
+GATEWAY_BROKEN_OFFSET = 10
+GATEWAY_REGISTER_ONLINE_OFFSET = 20
+GATEWAY_CONTROL_ONLINE_OFFSET = 30
+
+RackReading = namedtuple("RackReading", ["register", "bits"])
+
+
+def rack_hosts(count=RACK_COUNT):
+    """回傳 {rack: (狀態暫存器 host, coil host)}"""
+    return {
+        f"rack{index}": (
+            REGISTER_HOST.format(REGISTER_HOST_BASE + index),
+            REGISTER_HOST.format(COIL_HOST_BASE + index),
+        )
+        for index in range(1, count + 1)
+    }
+
+
+class RackEndpoint:
+    """一個 rack 裝置的常駐連線與退避狀態；同一時間只會有一個讀取在進行"""
+
+    def __init__(self, name, host, port, timeout, read):
+        self.name = name
+        self.client = ModbusTcpClient(host=host, port=port, timeout=timeout)
+        self.read = read
+        self.failures = 0
+        self.next_attempt = 0
+        self.future = None
+
+    def due(self, now):
+        return now >= self.next_attempt
+
+    def run(self):
+        try:
+            response = self.read(self.client)
+            if response.isError():
+                raise ValueError(response)
+        except Exception as e:
+            self.client.close()
+            self.failures += 1
+            if self.failures > 1:
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (self.failures - 2))
+                self.next_attempt = time.monotonic() + delay
+            print(f"{self.name} error: {e}")
+            raise
+        self.failures = 0
+        self.next_attempt = 0
+        return response
+
+    def close(self):
+        self.client.close()
+
+
+class RackPoller:
+    """
+    同時讀取所有啟用 rack 的狀態暫存器與漏液 coil。
+
+    每個裝置保留一條常駐連線，失敗時關閉、下一次讀取自動重連；
+    連續失敗的裝置依 BACKOFF_* 退避，退避期間直接視為無連線。
+    poll() 最多等 sweep_timeout 秒，尚未回應的裝置本輪視為無連線，
+    上一次讀取還沒結束前不會再送出新的讀取。
+    """
+
+    def __init__(self, hosts, port, timeout=TIMEOUT, sweep_timeout=SWEEP_TIMEOUT):
+        self.sweep_timeout = sweep_timeout
+        self.endpoints = {}
+        for rack, (register_host, coil_host) in hosts.items():
+            self.endpoints[rack] = (
+                RackEndpoint(
+                    f"{rack} reg",
+                    register_host,
+                    port,
+                    timeout,
+                    lambda client: client.read_holding_registers(0, 1),
+                ),
+                RackEndpoint(
+                    f"{rack} coil",
+                    coil_host,
+                    port,
+                    timeout,
+                    lambda client: client.read_coils(0, 2),
+                ),
+            )
+        self.executor = ThreadPoolExecutor(
+            max_workers=2 * len(self.endpoints), thread_name_prefix="rack_poller"
+        )
+        self.lock = threading.Lock()
+
+    def _submit(self, endpoint, now):
+        if endpoint.future is not None and not endpoint.future.done():
+            return None
+        if not endpoint.due(now):
+            endpoint.future = None
+            return None
+        endpoint.future = self.executor.submit(endpoint.run)
+        return endpoint.future
+
+    @staticmethod
+    def _result(future):
+        if future is None or not future.done() or future.exception() is not None:
+            return None
+        return future.result()
+
+    def poll(self, racks):
+        """
+        讀取 racks 內的 rack，回傳 {rack: RackReading}；讀取失敗的欄位為 None。
+        不在 racks 內的 rack 會關閉連線。
+        """
+        with self.lock:
+            now = time.monotonic()
+            pending = {}
+            for rack, endpoints in self.endpoints.items():
+                if rack in racks:
+                    pending[rack] = [self._submit(endpoint, now) for endpoint in endpoints]
+                else:
+                    for endpoint in endpoints:
+                        if endpoint.future is None or endpoint.future.done():
+                            endpoint.close()
+
+            futures = [f for pair in pending.values() for f in pair if f is not None]
+            if futures:
+                wait(futures, timeout=self.sweep_timeout)
+
+            readings = {}
+            for rack, (register_future, coil_future) in pending.items():
+                register = self._result(register_future)
+                coil = self._result(coil_future)
+                readings[rack] = RackReading(
+                    register.registers[0] if register is not None else None,
+                    coil.bits[:2] if coil is not None else None,
+                )
+            return readings
+
+    def close(self):
+        with self.lock:
+            self.executor.shutdown(wait=False)
+            for endpoints in self.endpoints.values():
+                for endpoint in endpoints:
+                    endpoint.close()
+
+
+class RackGatewayClient:
+    """
+    與 RackPoller 相同介面，改向 modbus_proxy 的 rack gateway 讀取。
+
+    gateway 獨佔 rack 連線並與 plc.py 共用同一份輪詢結果，
+    這裡每輪只需對 gateway 讀一次 input register 與 discrete input。
+    """
+
+    def __init__(self, host, port, count=RACK_COUNT, timeout=TIMEOUT):
+        self.client = ModbusTcpClient(host=host, port=int(port), timeout=timeout)
+        self.count = count
+        self.lock = threading.Lock()
+
+    def poll(self, racks):
+        with self.lock:
+            try:
+                registers = self.client.read_input_registers(
+                    GATEWAY_STATUS_OFFSET, self.count
+                )
+                flags = self.client.read_discrete_inputs(0, 4 * self.count)
+                if registers.isError() or flags.isError():
+                    raise ValueError(registers if registers.isError() else flags)
+            except Exception as e:
+                self.client.close()
+                print(f"rack gateway error: {e}")
+                return {rack: RackReading(None, None) for rack in racks}
+
+        readings = {}
+        bits = flags.bits
+        for rack in racks:
+            index = int(rack[len("rack"):]) - 1
+            register = None
+            if bits[GATEWAY_REGISTER_ONLINE_OFFSET + index]:
+                register = registers.registers[GATEWAY_STATUS_OFFSET + index]
+            coil = None
+            if bits[GATEWAY_CONTROL_ONLINE_OFFSET + index]:
+                coil = [
+                    bits[GATEWAY_LEAK_OFFSET + index],
+                    bits[GATEWAY_BROKEN_OFFSET + index],
+                ]
+            readings[rack] = RackReading(register, coil)
+        return readings
+
+    def close(self):
+        with self.lock:
+            self.client.close()
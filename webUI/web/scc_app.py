@@ -1,4 +1,5 @@
 # 標準函式庫
+import copy
 import json
 import logging
 import os
@@ -8,10 +9,8 @@ import struct
 import subprocess
 import threading
 import time
-import zipfile
 from datetime import datetime
 from functools import wraps
-from io import BytesIO
 
 # 第三方套件
 import requests
@@ -19,7 +18,7 @@ import pyzipper
 from dotenv import load_dotenv, set_key
 from concurrent_log_handler import ConcurrentTimedRotatingFileHandler
 from flask import (
-    Flask, Blueprint, Response, g, jsonify, request, send_file
+    Flask, Blueprint, Response, g, jsonify, request
 )
 from flask_login import LoginManager, UserMixin
 from pymodbus.client.sync import ModbusTcpClient
@@ -44,6 +43,15 @@ if platform.system() == "Linux":
 else:
     onLinux = False
 
+if onLinux:
+    from web.zip_stream import collect_entries, zip_response
+    from web.unit_view import convert_units, unit_labels
+    from web.state_publisher import JsonStatePublisher
+else:
+    from zip_stream import collect_entries, zip_response
+    from unit_view import convert_units, unit_labels
+    from state_publisher import JsonStatePublisher
+
 
 app = Flask(__name__)
 log_path = os.getcwd()
@@ -1975,19 +1983,7 @@ def read_data_from_json():
 def change_to_metric():
     read_data_from_json()
 
-    for key in thrshd:
-        if not key.endswith("_trap") and not key.startswith("Delay_"):
-            if "Temp" in key:
-                thrshd[key] = (thrshd[key] - 32) * 5.0 / 9.0
-
-            if "DewPoint" in key:
-                thrshd[key] = (thrshd[key]) * 5.0 / 9.0
-
-            if "Prsr" in key:
-                thrshd[key] = thrshd[key] * 6.89476
-
-            if "Flow" in key:
-                thrshd[key] = thrshd[key] / 0.2642
+    thrshd.update(convert_units(thrshd, "thrshd", "metric"))
 
     registers = []
     index = 0
@@ -2013,17 +2009,7 @@ def change_to_metric():
 
         i += 1
 
-    key_list = list(ctr_data["value"].keys())
-    for key in key_list:
-        if key == "oil_temp_set":
-            ctr_data["value"]["oil_temp_set"] = (
-                (ctr_data["value"]["oil_temp_set"] - 32) / 9.0 * 5.0
-            )
-
-        if key == "oil_pressure_set":
-            ctr_data["value"]["oil_pressure_set"] = (
-                ctr_data["value"]["oil_pressure_set"] * 6.89476
-            )
+    ctr_data["value"].update(convert_units(ctr_data["value"], "control", "metric"))
 
     temp1, temp2 = cvt_float_byte(ctr_data["value"]["oil_temp_set"])
     try:
@@ -2041,16 +2027,7 @@ def change_to_metric():
     except Exception as e:
         print(f"write oil pressure error:{e}")
 
-    key_list = list(measure_data.keys())
-    for key in key_list:
-        if "Temp" in key:
-            measure_data[key] = (measure_data[key] - 32) * 5.0 / 9.0
-
-        if "Prsr" in key:
-            measure_data[key] = measure_data[key] * 6.89476
-
-        if "f1" in key or "f2" in key:
-            measure_data[key] = measure_data[key] / 0.2642
+    measure_data.update(convert_units(measure_data, "measure", "metric"))
     try:
         with ModbusTcpClient(host=modbus_host, port=modbus_port) as client:
             for i, (key, value) in enumerate(measure_data.items()):
@@ -2064,19 +2041,7 @@ def change_to_metric():
 def change_to_imperial():
     read_data_from_json()
 
-    for key in thrshd:
-        if not key.endswith("_trap") and not key.startswith("Delay_"):
-            if "Temp" in key:
-                thrshd[key] = thrshd[key] * 9.0 / 5.0 + 32.0
-
-            if "DewPoint" in key:
-                thrshd[key] = thrshd[key] * 9.0 / 5.0
-
-            if "Prsr" in key:
-                thrshd[key] = thrshd[key] * 0.145038
-
-            if "Flow" in key:
-                thrshd[key] = thrshd[key] * 0.2642
+    thrshd.update(convert_units(thrshd, "thrshd", "imperial"))
 
     registers = []
     index = 0
@@ -2115,17 +2080,7 @@ def change_to_imperial():
     except Exception as e:
         print(f"write oil pressure error:{e}")
 
-    key_list = list(ctr_data["value"].keys())
-    for key in key_list:
-        if key == "oil_temp_set":
-            ctr_data["value"]["oil_temp_set"] = (
-                ctr_data["value"]["oil_temp_set"] * 9.0 / 5.0 + 32.0
-            )
-
-        if key == "oil_pressure_set":
-            ctr_data["value"]["oil_pressure_set"] = (
-                ctr_data["value"]["oil_pressure_set"] * 0.145038
-            )
+    ctr_data["value"].update(convert_units(ctr_data["value"], "control", "imperial"))
 
     temp1, temp2 = cvt_float_byte(ctr_data["value"]["oil_temp_set"])
     try:
@@ -2141,16 +2096,7 @@ def change_to_imperial():
     except Exception as e:
         print(f"write oil pressure error:{e}")
 
-    key_list = list(measure_data.keys())
-    for key in key_list:
-        if "Temp" in key:
-            measure_data[key] = measure_data[key] * 9.0 / 5.0 + 32.0
-
-        if "Prsr" in key:
-            measure_data[key] = measure_data[key] * 0.145038
-
-        if "f1" in key or "f2" in key:
-            measure_data[key] = measure_data[key] * 0.2642
+    measure_data.update(convert_units(measure_data, "measure", "imperial"))
 
     try:
         with ModbusTcpClient(host=modbus_host, port=modbus_port) as client:
@@ -2715,205 +2661,16 @@ def get_sensor_status():
 @scc_bp.route("/api/v1/cdu/status/sensor_value")
 @requires_auth
 def get_sensor_value():
-    try:
-        unit["unit"]["UnitSet"] = g.system_data["value"]["unit"]
-
-        if unit["unit"]["UnitSet"] == "imperial":
-            for key in sensor_value_data:
-                if "Temp" in key or "Dew" in key:
-                    sensor_value_data[key]["Unit"] = "°F"
-                if "Pressure" in key:
-                    sensor_value_data[key]["Unit"] = "psi"
-                if "Flow" in key:
-                    sensor_value_data[key]["Unit"] = "GPM"
-
-        elif unit["unit"]["UnitSet"] == "metric":
-            for key in sensor_value_data:
-                if "Temp" in key or "Dew" in key:
-                    sensor_value_data[key]["Unit"] = "°C"
-                if "Pressure" in key:
-                    sensor_value_data[key]["Unit"] = "kPa"
-                if "Flow" in key:
-                    sensor_value_data[key]["Unit"] = "LPM"
-
-        sensor_map = {
-            "CoolantSupplyTemperature": "temp_clntSply",
-            "CoolantSupplyTemperatureSpare": "temp_clntSplySpare",
-            "CoolantReturnTemperature": "temp_clntRtn",
-            "CoolantReturnTemperatureSpare": "temp_clntRtnSpare",
-            "CoolantSupplyPressure": "prsr_clntSply",
-            "CoolantSupplyPressureSpare": "prsr_clntSplySpare",
-            "CoolantReturnPressure": "prsr_clntRtn",
-            "CoolantReturnPressureSpare": "prsr_clntRtnSpare",
-            "FilterInletPressure":"prsr_fltIn",
-            "FilterOutletPressure":"prsr_fltOut",
-            "CoolantFlowRate": "clnt_flow",
-            "AmbientTemp": "ambient_temp",
-            "RelativeHumid": "relative_humid",
-            "DewPoint": "dew_point",
-            "pH": "pH",
-            "Conductivity": "cdct",
-            "Turbidity": "tbd",
-            "InstantPowerConsumption": "power",
-            "HeatCapacity": "heat_capacity",
-            "AverageCurrent": "AC",
-        }
-
-        for key, value in sensor_map.items():
-            if key == "CoolantFlowRate":
-                sensor_value_data[key]["Value"] = int(g.sensorData["value"][value])
-            else:
-                sensor_value_data[key]["Value"] = round(g.sensorData["value"][value], 1)
-
-    except Exception as e:
-        print(f"status value error:{e}")
+    if not scc_model["online"]:
         return api_error_response(503)
 
     try:
-        key_list = list(sensor_value_data.keys())
-
-        for key in key_list:
-            if key != "HeatCapacity" and key != "InstantPowerConsumption":
-                sensor_value_data[key]["Status"] = "Good"
-                v_key = app_value_mapping.get(key)
-                if v_key:
-                    if g.sensorData["alert_notice"][v_key]:
-                        sensor_value_data[key]["Status"] = "Alert"
-                    elif g.sensorData["warning_notice"][v_key]:
-                        sensor_value_data[key]["Status"] = "Warning"
+        values = build_sensor_values(g.sensorData, g.system_data["value"]["unit"])
     except Exception as e:
-        print(f"alert plc error: {e}")
-        return api_error_response(503)
-
-    try:
-        key_list = list(sensor_value_data.keys())
-
-        for key in key_list:
-            if key != "HeatCapacity" and key != "InstantPowerConsumption":
-                sensor_value_data[key]["Status"] = "Good"
-                e_key = app_error_mapping.get(key)
-                if e_key:
-                    if g.sensorData["error"][e_key]:
-                        sensor_value_data[key]["Status"] = "Error"
-
-                # if g.sensorData["error"]["Clnt_Flow_Com"]:
-                #     sensor_value_data["CoolantFlowRate"]["Status"] = "Error"
-
-    except Exception as e:
-        print(f"alert plc error: {e}")
-        return api_error_response(503)
-
-    try:
-        with ModbusTcpClient(host=modbus_host, port=modbus_port) as client:
-            thr_regs = len(sensor_thrshd.keys()) * 2
-            start_address = 1000
-            total_registers = thr_regs
-            read_num = 120
-
-            for counted_num in range(0, total_registers, read_num):
-                count = min(read_num, total_registers - counted_num)
-                result = client.read_holding_registers(
-                    start_address + counted_num, count
-                )
-
-                if not result.isError():
-                    keys_list = list(sensor_thrshd.keys())
-                    j = counted_num // 2
-                    for i in range(0, count, 2):
-                        if i + 1 < len(result.registers) and j < len(keys_list):
-                            temp1 = [
-                                result.registers[i],
-                                result.registers[i + 1],
-                            ]
-                            decoder_big_endian = BinaryPayloadDecoder.fromRegisters(
-                                temp1,
-                                byteorder=Endian.Big,
-                                wordorder=Endian.Little,
-                            )
-                            decoded_value_big_endian = (
-                                decoder_big_endian.decode_32bit_float()
-                            )
-                            sensor_thrshd[keys_list[j]] = decoded_value_big_endian
-                            j += 1
-
-        for key in sensor_thrshd:
-            parts = key.split("_")
-            short_key = parts[-2]
-
-            if "Rst" not in key:
-                if "W_" in key:
-                    if "_L" in key:
-                        sensor_value_data[short_key]["WarningLevel"]["MinValue"] = (
-                            round((sensor_thrshd.get(key, None)), 1)
-                        )
-                    elif "_H" in key:
-                        sensor_value_data[short_key]["WarningLevel"]["MaxValue"] = (
-                            round(sensor_thrshd.get(key, None), 1)
-                        )
-                elif "A_" in key:
-                    if "_L" in key:
-                        sensor_value_data[short_key]["AlertLevel"]["MinValue"] = round(
-                            sensor_thrshd.get(key, None), 1
-                        )
-                    elif "_H" in key:
-                        sensor_value_data[short_key]["AlertLevel"]["MaxValue"] = round(
-                            sensor_thrshd.get(key, None), 1
-                        )
-    except Exception as e:
-        print(f"min max plc error: {e}")
-        return api_error_response(503)
-
-    try:
-        with ModbusTcpClient(host=modbus_host, port=modbus_port) as client:
-            thr_count = len(trap_enable_key.keys())
-            r = client.read_coils((8192 + 2000), thr_count)
-
-            for x, key in enumerate(trap_enable_key.keys()):
-                trap_enable_key[key] = r.bits[x]
-
-            for key in sensor_value_data:
-                w_key = f"W_{key}"
-                a_key = f"A_{key}"
-
-                if key != "HeatCapacity" and key != "InstantPowerConsumption":
-                    sensor_value_data[key]["WarningLevel"]["TrapEnabled"] = (
-                        trap_enable_key.get(w_key, False)
-                    )
-                    sensor_value_data[key]["AlertLevel"]["TrapEnabled"] = (
-                        trap_enable_key.get(a_key, False)
-                    )
-    except Exception as e:
-        print(f"read trap plc error: {e}")
-        return api_error_response(503)
-
-    try:
-        with ModbusTcpClient(host=modbus_host, port=modbus_port) as client:
-            delay_count = len(sensor_delay.keys())
-            r = client.read_holding_registers(1000 + thr_regs, delay_count)
-
-            i = 0
-            for key, value in sensor_value_data.items():
-                if key not in [
-                    "InstantPowerConsumption",
-                    "HeatCapacity",
-                ]:
-                    sensor_value_data[key]["DelayTime"] = r.registers[i]
-                    i += 1
-
-    except Exception as e:
-        print(f"read delay plc error: {e}")
-        return api_error_response(503)
-
-    output = [v for v in sensor_value_data.values()]
-
-    try:
-        with open("web/json/scc.json", "w") as file:
-            json.dump(sensor_value_data, file, indent=4)
-    except Exception as e:
-        print(f"input error: {e}")
+        print(f"status value error:{e}")
         return api_error_response(503)
 
-    return output
+    return [v for v in values.values()]
 
 
 @scc_bp.route("/api/v1/cdu/status/sensor_value", methods=["PATCH"])
@@ -3120,6 +2877,7 @@ def set_sensor_config():
             response_data["DelayTime"] = delay
 
         op_logger.info(f"Sensor Value updated successfully. {response_data}")
+        scc_refresh.set()
         return jsonify(response_data)
 
     except Exception as e:
@@ -3339,26 +3097,10 @@ def get_error_messages():
     #         if message[1]:
     #             error_messages.append({"ErrorCode": code, "Message": message[0]})
     try:
-        error_messages = []
-        for category in ["warning", "alert", "error", "rack"]:
-            for key, status in g.sensorData[category].items():
-                if status:
-                    msg = g.sensorData["err_log"][category][key].split(" ", 1)
-                    code = msg[0]
-                    messages = msg[1]
-                    error_messages.append({"ErrorCode": code, "Message": messages})
+        return build_error_messages(g.sensorData)
     except Exception as e:
         print(f"error message issue:{e}")
         return api_error_response(503)
-    
-    try:
-        with open("web/json/scc_error.json", "w") as file:
-            json.dump(error_messages, file, indent=4)
-    except Exception as e:
-        print(f"input error: {e}")
-        return api_error_response(503)
-
-    return error_messages
 
 
 @scc_bp.route("/api/v1/devices", methods=["GET"])
@@ -3366,202 +3108,16 @@ def get_error_messages():
 def get_devices():
     """GET Device Information"""
 
-    exclude_keys = ["ControlUnit", "PC1Error", "PC2Error", "LowCoolantLevelWarning"]
-    rack_leakage_sensor_keys = [
-        "RackLeakageSensor1Leak",
-        "RackLeakageSensor1Broken",
-        "RackLeakageSensor2Leak",
-        "RackLeakageSensor2Broken",
-    ]
-    try:
-        with ModbusTcpClient(host=modbus_host, port=modbus_port) as client:
-            start_addr = len(sensor_thrshd.keys()) * 2 + len(sensor_delay.keys())
-            device_delay_count = len(device_delay.keys())
-
-            r = client.read_holding_registers(1000 + start_addr, device_delay_count)
-
-            for i, key in enumerate(devices.keys()):
-                if key not in exclude_keys:
-                    if key not in rack_leakage_sensor_keys:
-                        devices[key]["DelayTime"] = r.registers[i]
-                    else:
-                        devices[key]["DelayTime"] = r.registers[i - 4]
-
-    except Exception as e:
-        print(f"read delay plc error: {e}")
-        return api_error_response(503)
-
-    try:
-        with ModbusTcpClient(host=modbus_host, port=modbus_port) as client:
-            start_addr = len(sensor_trap.keys()) * 2
-            device_trap_count = len(device_trap.keys())
-            r = client.read_coils((8192 + 2000 + start_addr), device_trap_count)
-
-            for i, key in enumerate(devices.keys()):
-                devices[key]["TrapEnabled"] = r.bits[i]
-    except Exception as e:
-        print(f"trap enable error: {e}")
-        return api_error_response(503)
-
-    try:
-        if g.sensorData["error"]["pc1_error"]:
-            devices["PC1Error"]["Status"] = "Error"
-        else:
-            devices["PC1Error"]["Status"] = "Good"
-
-        if g.sensorData["error"]["pc2_error"]:
-            devices["PC2Error"]["Status"] = "Error"
-        else:
-            devices["PC2Error"]["Status"] = "Good"
-    except Exception as e:
-        print(f"read new devices error: {e}")
-        return api_error_response(503)
-
-    try:
-        inv_names = ["1", "2", "3"]
-        for inv in inv_names:
-            if g.sensorData["error"][f"Inv{inv}_Error"]:
-                devices[f"Inv{inv}Error"]["Status"] = "Error"
-            elif g.sensorData["value"][f"inv{inv}_freq"]:
-                devices[f"Inv{inv}Error"]["Status"] = "Enabled"
-            else:
-                devices[f"Inv{inv}Error"]["Status"] = "Disabled"
-
-        overload_names = ["1", "2", "3"]
-        for o in overload_names:
-            if g.sensorData["error"][f"Inv{o}_OverLoad"]:
-                devices[f"Inv{o}Overload"]["Status"] = "Error"
-            else:
-                devices[f"Inv{o}Overload"]["Status"] = "Good"
-
-        overload_names = ["1", "2"]
-        for o in overload_names:
-            if g.sensorData["error"][f"Fan_OverLoad{o}"]:
-                devices[f"FanOverload{o}"]["Status"] = "Error"
-            else:
-                devices[f"FanOverload{o}"]["Status"] = "Good"
-
-        with ModbusTcpClient(host=modbus_host, port=modbus_port) as client:
-            if not client.connect():
-                devices["ControlUnit"]["Status"] = "Error"
-            else:
-                devices["ControlUnit"]["Status"] = "Good"
-
-        if g.sensorData["ats_status"]["ATS1"]:
-            devices["ATS"]["Status"] = "Primary"
-        elif g.sensorData["ats_status"]["ATS2"]:
-            devices["ATS"]["Status"] = "Secondary"
-        else:
-            devices["ATS"]["Status"] = "OFF"
-    except Exception as e:
-        print(f"read ats plc error: {e}")
+    if not scc_model["online"]:
         return api_error_response(503)
 
     try:
-        sensor_mapping = {
-            "CoolantSupplyTemperatureBroken": "TempClntSply_broken",
-            "CoolantSupplyTemperatureSpareBroken": "TempClntSplySpare_broken",
-            "CoolantReturnTemperatureBroken": "TempClntRtn_broken",
-            "CoolantReturnTemperatureSpareBroken": "TempClntRtnSpare_broken",
-            "CoolantSupplyPressureBroken": "PrsrClntSply_broken",
-            "CoolantSupplyPressureSpareBroken": "PrsrClntSplySpare_broken",
-            "CoolantReturnPressureBroken": "PrsrClntRtn_broken",
-            "CoolantReturnPressureSpareBroken": "PrsrClntRtnSpare_broken",
-            "FilterInletPressureBroken": "PrsrFltIn_broken",
-            "FilterOutletPressureBroken": "PrsrFltOut_broken",
-            "CoolantFlowRateBroken": "Clnt_Flow_broken",
-        }
-
-        for k, v in sensor_mapping.items():
-            devices[k]["Status"] = "Error" if g.sensorData["error"][v] else "Good"
-
+        status = build_device_status(g.sensorData)
     except Exception as e:
-        print(f"read broken plc error: {e}")
+        print(f"read device status error: {e}")
         return api_error_response(503)
 
-    try:
-        sensor_mapping = {
-            "Inv1SpeedComm": "Inv1_Com",
-            "Inv2SpeedComm": "Inv2_Com",
-            "Inv3SpeedComm": "Inv3_Com",
-            # "CoolantFlowRateComm": "Clnt_Flow_Com",
-            "AmbientTempComm": "Ambient_Temp_Com",
-            "RelativeHumidComm": "Relative_Humid_Com",
-            "DewPointComm": "Dew_Point_Com",
-            "pHComm": "pH_Com",
-            "ConductivityComm": "Cdct_Sensor_Com",
-            "TurbidityComm": "Tbd_Com",
-            "ATS1Comm": "ATS1_Com",
-            "ATS2Comm": "ATS2_Com",
-            "InstantPowerConsumptionComm": "Power_Meter_Com",
-            "AverageCurrentComm": "Average_Current_Com",
-            "Fan1Comm": "Fan1_Com",
-            "Fan2Comm": "Fan2_Com",
-            "Fan3Comm": "Fan3_Com",
-            "Fan4Comm": "Fan4_Com",
-            "Fan5Comm": "Fan5_Com",
-            "Fan6Comm": "Fan6_Com",
-            "Fan7Comm": "Fan7_Com",
-            "Fan8Comm": "Fan8_Com",
-        }
-
-        for k, v in sensor_mapping.items():
-            devices[k]["Status"] = "Error" if g.sensorData["error"][v] else "Good"
-    except Exception as e:
-        print(f"read comm plc error: {e}")
-        return api_error_response(503)
-
-    try:
-        mapping = {
-            "Leakage1Leak": "leakage1_leak",
-            "Leakage1Broken": "leakage1_broken",
-            "Level1": "level1",
-            "Level2": "level2",
-            "Level3": "level3",
-            "Power24v1": "power24v1",
-            "Power24v2": "power24v2",
-            "Power12v1": "power12v1",
-            "Power12v2": "power12v2",
-            "MainMcError": "main_mc_error",
-            "Fan1Error": "fan1_error",
-            "Fan2Error": "fan2_error",
-            "Fan3Error": "fan3_error",
-            "Fan4Error": "fan4_error",
-            "Fan5Error": "fan5_error",
-            "Fan6Error": "fan6_error",
-            "Fan7Error": "fan7_error",
-            "Fan8Error": "fan8_error",
-            "LowCoolantLevelWarning": "Low_Coolant_Level_Warning",
-            "ControlUnit": "PLC",
-        }
-
-        for k, v in mapping.items():
-            devices[k]["Status"] = "Error" if g.sensorData["error"][v] else "Good"
-
-    except Exception as e:
-        print(f"change status: {e}")
-
-    try:
-        mapping = {
-            "RackLeakageSensor1Leak": "rack_leakage1_leak",
-            "RackLeakageSensor1Broken": "rack_leakage1_broken",
-            "RackLeakageSensor2Leak": "rack_leakage2_leak",
-            "RackLeakageSensor2Broken": "rack_leakage2_broken",
-        }
-        for k, v in mapping.items():
-            devices[k]["Status"] = "Error" if g.sensorData["rack"][v] else "Good"
-    except Exception as e:
-        print(f"change status: {e}")
-
-    output = [d for d in devices.values()]
-
-    try:
-        with open("web/json/scc_device.json", "w") as file:
-            json.dump(devices, file, indent=4)
-    except Exception as e:
-        return {"message": f"File Writing Error: {e}"}
-
-    return output
+    return [d for d in status.values()]
 
 
 @scc_bp.route("/api/v1/devices", methods=["PATCH"])
@@ -3635,6 +3191,7 @@ def devices_set_trap_enable():
         response_data.update(filter_setting)
 
     op_logger.info(f"Trap Enabled Setting updated successfully. {response_data} ")
+    scc_refresh.set()
 
     return jsonify(response_data)
 
@@ -3672,31 +3229,18 @@ def download_errorlogs_by_range(date_range):
 
         today = datetime.now().date()
 
-        zip_buffer = BytesIO()
-
-        with zipfile.ZipFile(zip_buffer, "w") as zip_file:
-            files = os.listdir(f"{log_path}/logs/error")
-
-            for file in files:
-                try:
-                    if file == "errorlog.log":
-                        file_date = today
-                    else:
-                        file_date_str = file.rsplit(".", 1)[-1]
-                        file_date = datetime.strptime(file_date_str, "%Y-%m-%d").date()
-
-                    if start_date <= file_date <= end_date:
-                        zip_file.write(f"{log_path}/logs/error/{file}", arcname=file)
-                except (IndexError, ValueError):
-                    continue
+        def in_range(file):
+            if file == "errorlog.log":
+                file_date = today
+            else:
+                file_date_str = file.rsplit(".", 1)[-1]
+                file_date = datetime.strptime(file_date_str, "%Y-%m-%d").date()
+            return start_date <= file_date <= end_date
 
-        zip_buffer.seek(0)
+        entries = collect_entries(f"{log_path}/logs/error", in_range)
 
-        return send_file(
-            zip_buffer,
-            mimetype="application/zip",
-            as_attachment=True,
-            download_name=f"errorlogs_{start_date_str}_to_{end_date_str}.zip",
+        return zip_response(
+            Response, entries, f"errorlogs_{start_date_str}_to_{end_date_str}.zip"
         )
     except Exception as e:
         
@@ -3715,33 +3259,18 @@ def download_oplogs_by_range(date_range):
 
     today = datetime.now().date()
 
-    zip_buffer = BytesIO()
+    def in_range(file):
+        if file == "oplog.log":
+            file_date = today
+        else:
+            file_date_str = file.rsplit(".", 1)[-1]
+            file_date = datetime.strptime(file_date_str, "%Y-%m-%d").date()
+        return start_date <= file_date <= end_date
 
-    with zipfile.ZipFile(zip_buffer, "w") as zip_file:
-        files = os.listdir(f"{log_path}/logs/operation")
+    entries = collect_entries(f"{log_path}/logs/operation", in_range)
 
-        for file in files:
-            try:
-                if file == "oplog.log":
-                    file_date = today
-                    print(f"filedate{file_date}")
-                else:
-                    file_date_str = file.rsplit(".", 1)[-1]
-                    file_date = datetime.strptime(file_date_str, "%Y-%m-%d").date()
-                    print(f"filedate{file_date}")
-
-                if start_date <= file_date <= end_date:
-                    zip_file.write(f"{log_path}/logs/operation/{file}", arcname=file)
-            except (IndexError, ValueError):
-                continue
-
-    zip_buffer.seek(0)
-
-    return send_file(
-        zip_buffer,
-        mimetype="application/zip",
-        as_attachment=True,
-        download_name=f"oplogs_{start_date_str}_to_{end_date_str}.zip",
+    return zip_response(
+        Response, entries, f"oplogs_{start_date_str}_to_{end_date_str}.zip"
     )
 
 
@@ -3755,28 +3284,15 @@ def download_sensorlogs_by_range(date_range):
     start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
     end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
 
-    zip_buffer = BytesIO()
-
-    with zipfile.ZipFile(zip_buffer, "w") as zip_file:
-        files = os.listdir(f"{log_path}/logs/sensor")
-
-        for file in files:
-            try:
-                file_date_str = file.rsplit(".")[-2]
-                file_date = datetime.strptime(file_date_str, "%Y-%m-%d")
+    def in_range(file):
+        file_date_str = file.rsplit(".")[-2]
+        file_date = datetime.strptime(file_date_str, "%Y-%m-%d")
+        return start_date <= file_date <= end_date
 
-                if start_date <= file_date <= end_date:
-                    zip_file.write(f"{log_path}/logs/sensor/{file}", arcname=file)
-            except (IndexError, ValueError):
-                continue
+    entries = collect_entries(f"{log_path}/logs/sensor", in_range)
 
-    zip_buffer.seek(0)
-
-    return send_file(
-        zip_buffer,
-        mimetype="application/zip",
-        as_attachment=True,
-        download_name=f"sensorlogs_{start_date_str}_to_{end_date_str}.zip",
+    return zip_response(
+        Response, entries, f"sensorlogs_{start_date_str}_to_{end_date_str}.zip"
     )
 
 
@@ -4053,49 +3569,467 @@ def set_network():
 
 
 
-def get_scc_data():
-    while True:
-        try:
-            sensor_trap_reg = len(sensor_trap.keys()) * 2
-            e_trap_reg = len(device_trap.keys())
-            with ModbusTcpClient(host=modbus_host, port=modbus_port) as client:
-                r = client.read_coils((8192 + 2000), sensor_trap_reg)
+# GET 不再讀 PLC 也不寫檔：門檻、trap、延遲時間只由 poller (或單一行程) 的
+# get_scc_data() 每 2 秒讀一次，即時值與狀態取自 app.py 的 sensorData；
+# 回應與檔案都從副本產生，共用的 sensor_value_data / devices 只放 PLC 設定。
+# 檔案只在內容改變時 atomic 寫入，scc.json 不含每輪都變的 Value。
+# scc_model 是 PLC 讀到的部分，由 app.py 放進 shared_state 發佈，
+# web worker 讀回後以 apply_scc_model() 套用，不自己讀 PLC。
+scc_state = {"sensorData": None, "system_data": None}
+scc_plc = {"updated": 0}
+scc_model = {"online": False, "sensor_value_data": {}, "devices": {}}
+scc_files = JsonStatePublisher(f"{web_path}/json")
+scc_poller = os.getenv("WEBUI_ROLE", "all") in ("all", "poller")
+SCC_INTERVAL = 2
+SCC_PLC_STALE = SCC_INTERVAL * 5
+# PATCH 寫入 PLC 後設定，背景執行緒不等滿 2 秒立即重讀
+scc_refresh = threading.Event()
+# 上次讀到的 trap enable coil，用來判斷是否改變
+trap_bitmap = {"bits": None}
 
-                for x, key in enumerate(trap_enable_key.keys()):
-                    trap_enable_key[key] = r.bits[x]
 
-                for key in sensor_value_data:
-                    w_key = f"W_{key}"
-                    a_key = f"A_{key}"
-                    if key != "HeatCapacity" and key != "InstantPowerConsumption":
-                        sensor_trap[key]["Warning"] = trap_enable_key.get(w_key, None)
-                        sensor_trap[key]["Alert"] = trap_enable_key.get(a_key, None)
-        except Exception as e:
-            print(f"[interval] read trap plc error: {e}")
+def bind_scc_state(sensor_data, system_data):
+    """由 app.py 傳入就地更新的 sensorData / system_data，背景執行緒據此產生檔案"""
+    scc_state["sensorData"] = sensor_data
+    scc_state["system_data"] = system_data
 
-        try:
-            with ModbusTcpClient(host=modbus_host, port=modbus_port) as client:
-                r = client.read_coils((8192 + 2000 + sensor_trap_reg), e_trap_reg)
 
-                for i, key in enumerate(device_trap.keys()):
-                    device_trap[key] = r.bits[i]
-        except Exception as e:
-            print(f"[interval] trap enable error: {e}")
+def plc_fresh():
+    return time.time() - scc_plc["updated"] < SCC_PLC_STALE
+
+
+def build_scc_model():
+    """只取 PLC 讀到的欄位，即時值每秒都在變，不放進來以免每次都要寫檔"""
+    return {
+        "online": plc_fresh(),
+        "sensor_value_data": {
+            key: {
+                "WarningLevel": dict(value["WarningLevel"]),
+                "AlertLevel": dict(value["AlertLevel"]),
+                "DelayTime": value["DelayTime"],
+            }
+            for key, value in sensor_value_data.items()
+            if "WarningLevel" in value
+        },
+        "devices": {
+            key: {
+                field: value[field]
+                for field in ("TrapEnabled", "DelayTime")
+                if field in value
+            }
+            for key, value in devices.items()
+        },
+    }
 
-        scc_data = {
-            "sensor_value_data": sensor_trap,
-            "devices": device_trap,
+
+def apply_scc_model():
+    """web worker 收到新的 scc_model 後呼叫"""
+    for key, value in scc_model["sensor_value_data"].items():
+        sensor_value_data[key].update(value)
+    for key, value in scc_model["devices"].items():
+        devices[key].update(value)
+
+
+def read_registers(client, address, count, read_num=120):
+    registers = []
+    for counted_num in range(0, count, read_num):
+        result = client.read_holding_registers(
+            address + counted_num, min(read_num, count - counted_num)
+        )
+        if result.isError():
+            raise ValueError(result)
+        registers.extend(result.registers)
+    return registers
+
+
+def read_scc_plc(client):
+    """門檻、sensor 延遲、device 延遲在 1000 起連續排列，一次讀完再分段套用"""
+    thr_regs = len(sensor_thrshd.keys()) * 2
+    delay_count = len(sensor_delay.keys())
+    device_delay_count = len(device_delay.keys())
+    registers = read_registers(
+        client, 1000, thr_regs + delay_count + device_delay_count
+    )
+
+    for j, key in enumerate(sensor_thrshd.keys()):
+        decoder_big_endian = BinaryPayloadDecoder.fromRegisters(
+            registers[j * 2 : j * 2 + 2],
+            byteorder=Endian.Big,
+            wordorder=Endian.Little,
+        )
+        sensor_thrshd[key] = decoder_big_endian.decode_32bit_float()
+
+    for key in sensor_thrshd:
+        parts = key.split("_")
+        short_key = parts[-2]
+
+        if "Rst" not in key:
+            if "W_" in key:
+                if "_L" in key:
+                    sensor_value_data[short_key]["WarningLevel"]["MinValue"] = round(
+                        sensor_thrshd.get(key, None), 1
+                    )
+                elif "_H" in key:
+                    sensor_value_data[short_key]["WarningLevel"]["MaxValue"] = round(
+                        sensor_thrshd.get(key, None), 1
+                    )
+            elif "A_" in key:
+                if "_L" in key:
+                    sensor_value_data[short_key]["AlertLevel"]["MinValue"] = round(
+                        sensor_thrshd.get(key, None), 1
+                    )
+                elif "_H" in key:
+                    sensor_value_data[short_key]["AlertLevel"]["MaxValue"] = round(
+                        sensor_thrshd.get(key, None), 1
+                    )
+
+    delays = registers[thr_regs : thr_regs + delay_count]
+    i = 0
+    for key in sensor_value_data:
+        if key not in [
+            "InstantPowerConsumption",
+            "HeatCapacity",
+        ]:
+            sensor_value_data[key]["DelayTime"] = delays[i]
+            i += 1
+
+    exclude_keys = ["ControlUnit", "PC1Error", "PC2Error", "LowCoolantLevelWarning"]
+    rack_leakage_sensor_keys = [
+        "RackLeakageSensor1Leak",
+        "RackLeakageSensor1Broken",
+        "RackLeakageSensor2Leak",
+        "RackLeakageSensor2Broken",
+    ]
+    delays = registers[thr_regs + delay_count :]
+    for i, key in enumerate(devices.keys()):
+        if key not in exclude_keys:
+            if key not in rack_leakage_sensor_keys:
+                devices[key]["DelayTime"] = delays[i]
+            else:
+                devices[key]["DelayTime"] = delays[i - 4]
+
+
+def read_trap_enable(client):
+    """sensor (W_/A_ 各一) 與 device 的 trap enable coil 連續排列，一次讀完"""
+    count = len(sensor_trap.keys()) * 2 + len(device_trap.keys())
+    r = client.read_coils((8192 + 2000), count)
+    if r.isError():
+        raise ValueError(r)
+    return tuple(r.bits[:count])
+
+
+def apply_trap_enable(bits):
+    for x, key in enumerate(trap_enable_key.keys()):
+        trap_enable_key[key] = bits[x]
+
+    for key in sensor_value_data:
+        w_key = f"W_{key}"
+        a_key = f"A_{key}"
+
+        if key != "HeatCapacity" and key != "InstantPowerConsumption":
+            sensor_trap[key]["Warning"] = trap_enable_key.get(w_key, None)
+            sensor_trap[key]["Alert"] = trap_enable_key.get(a_key, None)
+            sensor_value_data[key]["WarningLevel"]["TrapEnabled"] = (
+                trap_enable_key.get(w_key, False)
+            )
+            sensor_value_data[key]["AlertLevel"]["TrapEnabled"] = (
+                trap_enable_key.get(a_key, False)
+            )
+
+    sensor_trap_reg = len(sensor_trap.keys()) * 2
+    for i, key in enumerate(device_trap.keys()):
+        device_trap[key] = bits[sensor_trap_reg + i]
+
+    # devices 與 device_trap 的 key 名稱不完全相同，依 coil 順序對應
+    for key, enabled in zip(devices, device_trap.values()):
+        devices[key]["TrapEnabled"] = enabled
+
+
+def sync_trap_enable(bits):
+    """
+    與上次讀到的 bitmap 相同就不做事；不同時才更新各 dict 並寫 scc_data.json，
+    SNMP agent 依檔案的 (inode, mtime) 改變才重新讀取。
+    """
+    if bits == trap_bitmap["bits"]:
+        return False
+
+    apply_trap_enable(bits)
+    scc_data = {
+        "sensor_value_data": sensor_trap,
+        "devices": device_trap,
+    }
+    try:
+        scc_files.publish("scc_data.json", scc_data)
+    except Exception as e:
+        # 不記錄 bitmap，下一輪重試寫檔
+        print(f"input error: {e}")
+        return True
+
+    trap_bitmap["bits"] = bits
+    return True
+
+
+def build_sensor_values(sensor_data, unit_set):
+    """
+    以 sensor_value_data 的副本填入單位、即時值與狀態後回傳。
+    共用的 sensor_value_data 同時被背景執行緒更新與序列化，這裡不修改它。
+    """
+    unit["unit"]["UnitSet"] = unit_set
+    values = copy.deepcopy(sensor_value_data)
+
+    if unit["unit"]["UnitSet"] in ("imperial", "metric"):
+        labels = unit_labels(
+            "sensor_value", tuple(values), unit["unit"]["UnitSet"]
+        )
+        for key, label in labels.items():
+            values[key]["Unit"] = label
+
+    sensor_map = {
+        "CoolantSupplyTemperature": "temp_clntSply",
+        "CoolantSupplyTemperatureSpare": "temp_clntSplySpare",
+        "CoolantReturnTemperature": "temp_clntRtn",
+        "CoolantReturnTemperatureSpare": "temp_clntRtnSpare",
+        "CoolantSupplyPressure": "prsr_clntSply",
+        "CoolantSupplyPressureSpare": "prsr_clntSplySpare",
+        "CoolantReturnPressure": "prsr_clntRtn",
+        "CoolantReturnPressureSpare": "prsr_clntRtnSpare",
+        "FilterInletPressure":"prsr_fltIn",
+        "FilterOutletPressure":"prsr_fltOut",
+        "CoolantFlowRate": "clnt_flow",
+        "AmbientTemp": "ambient_temp",
+        "RelativeHumid": "relative_humid",
+        "DewPoint": "dew_point",
+        "pH": "pH",
+        "Conductivity": "cdct",
+        "Turbidity": "tbd",
+        "InstantPowerConsumption": "power",
+        "HeatCapacity": "heat_capacity",
+        "AverageCurrent": "AC",
+    }
+
+    for key, value in sensor_map.items():
+        if key == "CoolantFlowRate":
+            values[key]["Value"] = int(sensor_data["value"][value])
+        else:
+            values[key]["Value"] = round(sensor_data["value"][value], 1)
+
+    key_list = list(values.keys())
+
+    for key in key_list:
+        if key != "HeatCapacity" and key != "InstantPowerConsumption":
+            values[key]["Status"] = "Good"
+            v_key = app_value_mapping.get(key)
+            if v_key:
+                if sensor_data["alert_notice"][v_key]:
+                    values[key]["Status"] = "Alert"
+                elif sensor_data["warning_notice"][v_key]:
+                    values[key]["Status"] = "Warning"
+
+    key_list = list(values.keys())
+
+    for key in key_list:
+        if key != "HeatCapacity" and key != "InstantPowerConsumption":
+            values[key]["Status"] = "Good"
+            e_key = app_error_mapping.get(key)
+            if e_key:
+                if sensor_data["error"][e_key]:
+                    values[key]["Status"] = "Error"
+
+            # if sensor_data["error"]["Clnt_Flow_Com"]:
+            #     values["CoolantFlowRate"]["Status"] = "Error"
+
+    return values
+
+
+def build_device_status(sensor_data):
+    """以 devices 的副本填入各裝置狀態後回傳，不修改共用的 devices"""
+    status = copy.deepcopy(devices)
+
+    if sensor_data["error"]["pc1_error"]:
+        status["PC1Error"]["Status"] = "Error"
+    else:
+        status["PC1Error"]["Status"] = "Good"
+
+    if sensor_data["error"]["pc2_error"]:
+        status["PC2Error"]["Status"] = "Error"
+    else:
+        status["PC2Error"]["Status"] = "Good"
+
+    inv_names = ["1", "2", "3"]
+    for inv in inv_names:
+        if sensor_data["error"][f"Inv{inv}_Error"]:
+            status[f"Inv{inv}Error"]["Status"] = "Error"
+        elif sensor_data["value"][f"inv{inv}_freq"]:
+            status[f"Inv{inv}Error"]["Status"] = "Enabled"
+        else:
+            status[f"Inv{inv}Error"]["Status"] = "Disabled"
+
+    overload_names = ["1", "2", "3"]
+    for o in overload_names:
+        if sensor_data["error"][f"Inv{o}_OverLoad"]:
+            status[f"Inv{o}Overload"]["Status"] = "Error"
+        else:
+            status[f"Inv{o}Overload"]["Status"] = "Good"
+
+    overload_names = ["1", "2"]
+    for o in overload_names:
+        if sensor_data["error"][f"Fan_OverLoad{o}"]:
+            status[f"FanOverload{o}"]["Status"] = "Error"
+        else:
+            status[f"FanOverload{o}"]["Status"] = "Good"
+
+    status["ControlUnit"]["Status"] = "Good" if scc_model["online"] else "Error"
+
+    if sensor_data["ats_status"]["ATS1"]:
+        status["ATS"]["Status"] = "Primary"
+    elif sensor_data["ats_status"]["ATS2"]:
+        status["ATS"]["Status"] = "Secondary"
+    else:
+        status["ATS"]["Status"] = "OFF"
+
+    sensor_mapping = {
+        "CoolantSupplyTemperatureBroken": "TempClntSply_broken",
+        "CoolantSupplyTemperatureSpareBroken": "TempClntSplySpare_broken",
+        "CoolantReturnTemperatureBroken": "TempClntRtn_broken",
+        "CoolantReturnTemperatureSpareBroken": "TempClntRtnSpare_broken",
+        "CoolantSupplyPressureBroken": "PrsrClntSply_broken",
+        "CoolantSupplyPressureSpareBroken": "PrsrClntSplySpare_broken",
+        "CoolantReturnPressureBroken": "PrsrClntRtn_broken",
+        "CoolantReturnPressureSpareBroken": "PrsrClntRtnSpare_broken",
+        "FilterInletPressureBroken": "PrsrFltIn_broken",
+        "FilterOutletPressureBroken": "PrsrFltOut_broken",
+        "CoolantFlowRateBroken": "Clnt_Flow_broken",
+    }
+
+    for k, v in sensor_mapping.items():
+        status[k]["Status"] = "Error" if sensor_data["error"][v] else "Good"
+
+    sensor_mapping = {
+        "Inv1SpeedComm": "Inv1_Com",
+        "Inv2SpeedComm": "Inv2_Com",
+        "Inv3SpeedComm": "Inv3_Com",
+        # "CoolantFlowRateComm": "Clnt_Flow_Com",
+        "AmbientTempComm": "Ambient_Temp_Com",
+        "RelativeHumidComm": "Relative_Humid_Com",
+        "DewPointComm": "Dew_Point_Com",
+        "pHComm": "pH_Com",
+        "ConductivityComm": "Cdct_Sensor_Com",
+        "TurbidityComm": "Tbd_Com",
+        "ATS1Comm": "ATS1_Com",
+        "ATS2Comm": "ATS2_Com",
+        "InstantPowerConsumptionComm": "Power_Meter_Com",
+        "AverageCurrentComm": "Average_Current_Com",
+        "Fan1Comm": "Fan1_Com",
+        "Fan2Comm": "Fan2_Com",
+        "Fan3Comm": "Fan3_Com",
+        "Fan4Comm": "Fan4_Com",
+        "Fan5Comm": "Fan5_Com",
+        "Fan6Comm": "Fan6_Com",
+        "Fan7Comm": "Fan7_Com",
+        "Fan8Comm": "Fan8_Com",
+    }
+
+    for k, v in sensor_mapping.items():
+        status[k]["Status"] = "Error" if sensor_data["error"][v] else "Good"
+
+    try:
+        mapping = {
+            "Leakage1Leak": "leakage1_leak",
+            "Leakage1Broken": "leakage1_broken",
+            "Level1": "level1",
+            "Level2": "level2",
+            "Level3": "level3",
+            "Power24v1": "power24v1",
+            "Power24v2": "power24v2",
+            "Power12v1": "power12v1",
+            "Power12v2": "power12v2",
+            "MainMcError": "main_mc_error",
+            "Fan1Error": "fan1_error",
+            "Fan2Error": "fan2_error",
+            "Fan3Error": "fan3_error",
+            "Fan4Error": "fan4_error",
+            "Fan5Error": "fan5_error",
+            "Fan6Error": "fan6_error",
+            "Fan7Error": "fan7_error",
+            "Fan8Error": "fan8_error",
+            "LowCoolantLevelWarning": "Low_Coolant_Level_Warning",
+            "ControlUnit": "PLC",
+        }
+
+        for k, v in mapping.items():
+            status[k]["Status"] = "Error" if sensor_data["error"][v] else "Good"
+
+    except Exception as e:
+        print(f"change status: {e}")
+
+    try:
+        mapping = {
+            "RackLeakageSensor1Leak": "rack_leakage1_leak",
+            "RackLeakageSensor1Broken": "rack_leakage1_broken",
+            "RackLeakageSensor2Leak": "rack_leakage2_leak",
+            "RackLeakageSensor2Broken": "rack_leakage2_broken",
         }
+        for k, v in mapping.items():
+            status[k]["Status"] = "Error" if sensor_data["rack"][v] else "Good"
+    except Exception as e:
+        print(f"change status: {e}")
+
+    return status
 
+
+def build_error_messages(sensor_data):
+    error_messages = []
+    for category in ["warning", "alert", "error", "rack"]:
+        for key, status in sensor_data[category].items():
+            if status:
+                msg = sensor_data["err_log"][category][key].split(" ", 1)
+                code = msg[0]
+                messages = msg[1]
+                error_messages.append({"ErrorCode": code, "Message": messages})
+    return error_messages
+
+
+def publish_scc_files():
+    sensor_data = scc_state["sensorData"]
+    if sensor_data is None:
+        return
+    try:
+        values = build_sensor_values(
+            sensor_data, scc_state["system_data"]["value"]["unit"]
+        )
+        # Value 每輪都在變，放進檔案就每 2 秒重寫一次；即時值由 GET 回應提供
+        scc_files.publish(
+            "scc.json",
+            {
+                key: {field: v for field, v in value.items() if field != "Value"}
+                for key, value in values.items()
+            },
+        )
+        scc_files.publish("scc_error.json", build_error_messages(sensor_data))
+        scc_files.publish("scc_device.json", build_device_status(sensor_data))
+    except Exception as e:
+        print(f"[interval] scc json error: {e}")
+
+
+def get_scc_data():
+    while True:
         try:
-            with open(f"{web_path}/json/scc_data.json", "w") as file:
-                json.dump(scc_data, file, indent=4)
+            with ModbusTcpClient(host=modbus_host, port=modbus_port) as client:
+                sync_trap_enable(read_trap_enable(client))
+                read_scc_plc(client)
+            scc_plc["updated"] = time.time()
         except Exception as e:
-            print(f"input error: {e}")
+            print(f"[interval] read scc plc error: {e}")
+
+        # 整個換掉各個值，發佈端序列化時不會看到改到一半的 dict
+        scc_model.update(build_scc_model())
+        publish_scc_files()
 
-        time.sleep(2)
+        scc_refresh.wait(SCC_INTERVAL)
+        scc_refresh.clear()
 
 
-scc_thread = threading.Thread(target=get_scc_data)
-scc_thread.daemon = True
-scc_thread.start()
+if scc_poller:
+    scc_thread = threading.Thread(target=get_scc_data)
+    scc_thread.daemon = True
+    scc_thread.start()
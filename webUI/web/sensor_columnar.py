@@ -0,0 +1,270 @@
+"""
+sensor log 的欄式壓縮格式 (sensor.log.YYYY-MM-DD.col)，與同日的 CSV 並存。
+
+檔案格式 (little-endian)：
+    MAGIC
+    block*
+block：
+    uint32 meta 長度 + meta (JSON) + payload
+meta：
+    rows, t_min, t_max   列數與時間範圍 (秒，naive 本地時間當作 UTC 計算)
+    time                 時間欄在 payload 內的 offset / length
+    columns              [{name, type, offset, length, min, max, dict}]
+                         type 為 "f4" (float32) 或 "str" (字典編碼，uint16 代碼)
+    size                 payload 總長度
+每個欄位各自以 zlib 壓縮，讀取時依 meta 的時間範圍略過不需要的 block，
+只解壓需要的欄位。
+"""
+
+import calendar
+import json
+import math
+import os
+import struct
+import sys
+import zlib
+from array import array
+from datetime import datetime, timedelta
+
+
+MAGIC = b"SLCOL1\n"
+META_LENGTH = struct.Struct("<I")
+EPOCH = datetime(1970, 1, 1)
+# 以 15 秒取樣約一小時一個 block
+BLOCK_ROWS = 240
+
+
+def to_seconds(value):
+    return calendar.timegm(value.timetuple())
+
+
+def from_seconds(seconds):
+    return EPOCH + timedelta(seconds=seconds)
+
+
+def _pack(values, typecode):
+    data = array(typecode, values)
+    if sys.byteorder == "big":
+        data.byteswap()
+    return zlib.compress(data.tobytes(), 6)
+
+
+def _unpack(payload, typecode):
+    data = array(typecode)
+    data.frombytes(zlib.decompress(payload))
+    if sys.byteorder == "big":
+        data.byteswap()
+    return data
+
+
+def _as_float(value):
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, (int, float)):
+        return float(value)
+    return None
+
+
+def encode_block(column_names, rows):
+    """rows 為 [(datetime, [value, ...]), ...]，回傳完整的 block bytes"""
+    payload = bytearray()
+    times = [to_seconds(ts) for ts, _ in rows]
+    packed = _pack(times, "q")
+    meta = {
+        "rows": len(rows),
+        "t_min": min(times),
+        "t_max": max(times),
+        "time": {"offset": 0, "length": len(packed)},
+        "columns": [],
+    }
+    payload += packed
+
+    for index, name in enumerate(column_names):
+        values = [row[index] if index < len(row) else None for _, row in rows]
+        floats = [_as_float(value) for value in values]
+        column = {"name": name}
+        if all(value is not None for value in floats):
+            finite = [value for value in floats if not math.isnan(value)]
+            column["type"] = "f4"
+            column["min"] = min(finite) if finite else None
+            column["max"] = max(finite) if finite else None
+            packed = _pack(floats, "f")
+        else:
+            # 含字串 (如 Mode、"-") 的欄位以字典編碼保存原本的文字
+            texts = ["" if value is None else str(value) for value in values]
+            dictionary = sorted(set(texts))
+            codes = {text: code for code, text in enumerate(dictionary)}
+            column["type"] = "str"
+            column["dict"] = dictionary
+            packed = _pack([codes[text] for text in texts], "H")
+        column["offset"] = len(payload)
+        column["length"] = len(packed)
+        payload += packed
+        meta["columns"].append(column)
+
+    meta["size"] = len(payload)
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode()
+    return META_LENGTH.pack(len(meta_bytes)) + meta_bytes + bytes(payload)
+
+
+def scan_blocks(file):
+    """
+    回傳 [(meta, payload 起始位置), ...] 與最後一個完整 block 的結尾位置。
+    寫到一半的 block (斷電) 會被忽略。
+    """
+    file.seek(0)
+    if file.read(len(MAGIC)) != MAGIC:
+        return [], 0
+
+    blocks = []
+    end = file.tell()
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    file.seek(end)
+    while True:
+        header = file.read(META_LENGTH.size)
+        if len(header) < META_LENGTH.size:
+            break
+        (meta_length,) = META_LENGTH.unpack(header)
+        try:
+            meta = json.loads(file.read(meta_length))
+        except ValueError:
+            break
+        start = file.tell()
+        if start + meta["size"] > size:
+            break
+        blocks.append((meta, start))
+        end = start + meta["size"]
+        file.seek(end)
+    return blocks, end
+
+
+def _decode_column(file, start, column):
+    file.seek(start + column["offset"])
+    payload = file.read(column["length"])
+    if column["type"] == "f4":
+        return _unpack(payload, "f")
+    dictionary = column["dict"]
+    return [dictionary[code] for code in _unpack(payload, "H")]
+
+
+def read_columns(path, columns=None, start=None, end=None):
+    """
+    讀取一個 .col 檔，回傳 {"time": [datetime, ...], 欄位: [值, ...]}。
+
+    columns 為 None 時讀取全部欄位；start / end (datetime，皆含) 之外的
+    block 不會被讀取，float32 欄位回傳 array('f')。
+    """
+    t_start = to_seconds(start) if start else None
+    t_end = to_seconds(end) if end else None
+    result = {"time": []}
+
+    with open(path, "rb") as file:
+        blocks, _ = scan_blocks(file)
+        for meta, offset in blocks:
+            if t_start is not None and meta["t_max"] < t_start:
+                continue
+            if t_end is not None and meta["t_min"] > t_end:
+                continue
+
+            file.seek(offset + meta["time"]["offset"])
+            times = _unpack(file.read(meta["time"]["length"]), "q")
+            keep = [
+                i
+                for i, t in enumerate(times)
+                if (t_start is None or t >= t_start) and (t_end is None or t <= t_end)
+            ]
+            if not keep:
+                continue
+            whole = len(keep) == len(times)
+            result["time"].extend(from_seconds(times[i]) for i in keep)
+
+            for column in meta["columns"]:
+                name = column["name"]
+                if columns is not None and name not in columns:
+                    continue
+                values = _decode_column(file, offset, column)
+                if not whole:
+                    values = [values[i] for i in keep]
+                target = result.setdefault(
+                    name, array("f") if column["type"] == "f4" else []
+                )
+                if isinstance(target, array) and column["type"] != "f4":
+                    # 先前 block 是數值、此 block 含字串時改成一般 list
+                    target = result[name] = list(target)
+                target.extend(values)
+    return result
+
+
+def iter_records(path, columns=None, start=None, end=None):
+    """
+    逐列回傳 dict，格式與 csv.DictReader 讀 CSV 相近：time 為 datetime，
+    float32 還原成 7 位有效數字的 float，字串欄位維持原文字。
+    """
+    data = read_columns(path, columns, start, end)
+    names = [name for name in data if name != "time"]
+    for index, timestamp in enumerate(data["time"]):
+        record = {"time": timestamp}
+        for name in names:
+            value = data[name][index]
+            if isinstance(value, float):
+                value = float(f"{value:.7g}")
+            record[name] = value
+        yield record
+
+
+class ColumnarLogWriter:
+    """
+    將 sensor log 每 block_rows 列編成一個 block 附加到當日的 .col 檔。
+
+    開啟既有檔案時會截掉斷電留下的不完整 block；未滿一個 block 的資料
+    留在記憶體，換日或關閉時寫出。換日後以舊檔路徑呼叫 on_rotate。
+    """
+
+    def __init__(self, directory, prefix="sensor.log", block_rows=BLOCK_ROWS, on_rotate=None):
+        self.directory = directory
+        self.prefix = prefix
+        self.block_rows = block_rows
+        self.on_rotate = on_rotate
+        self.date = None
+        self.column_names = None
+        self.rows = []
+
+    def path_for(self, date):
+        return os.path.join(self.directory, f"{self.prefix}.{date}.col")
+
+    def append(self, column_names, timestamp, values):
+        """column_names 含 "time"，與 CSV 表頭相同"""
+        date = timestamp.strftime("%Y-%m-%d")
+        names = [name for name in column_names if name != "time"]
+        if date != self.date or names != self.column_names:
+            self.flush()
+            if self.on_rotate is not None and self.date not in (None, date):
+                self.on_rotate(self.path_for(self.date))
+            self.date = date
+            self.column_names = names
+
+        self.rows.append((timestamp, list(values)))
+        if len(self.rows) >= self.block_rows:
+            self.flush()
+
+    def flush(self, fsync=True):
+        if not self.rows:
+            return
+        rows, self.rows = self.rows, []
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(self.date)
+
+        with open(path, "r+b" if os.path.exists(path) else "w+b") as file:
+            _, end = scan_blocks(file)
+            if end == 0:
+                file.seek(0)
+                file.truncate()
+                file.write(MAGIC)
+            else:
+                file.seek(end)
+                file.truncate()
+            file.write(encode_block(self.column_names, rows))
+            if fsync:
+                file.flush()
+                os.fsync(file.fileno())
@@ -0,0 +1,139 @@
+import csv
+import logging
+import os
+import platform
+import threading
+import time
+from datetime import datetime
+
+if platform.system() == "Linux":
+    onLinux = True
+else:
+    onLinux = False
+
+if onLinux:
+    from web.sensor_columnar import ColumnarLogWriter
+else:
+    from sensor_columnar import ColumnarLogWriter
+
+
+journal_logger = logging.getLogger("journal_logger")
+
+
+class SensorLogWriter:
+    """
+    常駐開啟當日 sensor log CSV 的寫入器。
+
+    目前日期記在記憶體，跨過午夜才關閉舊檔並開新檔，不必每筆都重開、
+    讀回檔頭判斷日期。資料先留在緩衝區，累積 flush_rows 筆或距上次
+    flush 超過 flush_interval 秒才寫出；fsync=True 時每次寫出都 fsync，
+    換日與關閉時一律 fsync；換日關閉舊檔後呼叫 on_rotate(舊檔路徑)。
+    每次 flush 後確認檔案仍在原路徑，被其他行程搬走 (重設時的 LogMover) 就改開新檔。
+
+    有 columnar_directory 時同時在該目錄寫一份欄式壓縮檔 (見 sensor_columnar)，
+    其失敗不影響 CSV。
+    """
+
+    def __init__(
+        self,
+        directory,
+        prefix="sensor.log",
+        flush_rows=20,
+        flush_interval=60,
+        fsync=True,
+        columnar_directory=None,
+        on_rotate=None,
+    ):
+        self.directory = directory
+        self.prefix = prefix
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.on_rotate = on_rotate
+        self.columnar = None
+        if columnar_directory:
+            self.columnar = ColumnarLogWriter(columnar_directory, prefix, on_rotate=on_rotate)
+
+        self.lock = threading.Lock()
+        self.file = None
+        self.writer = None
+        self.date = None
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def path_for(self, date):
+        return os.path.join(self.directory, f"{self.prefix}.{date}.csv")
+
+    def _open(self, date, column_names):
+        os.makedirs(self.directory, exist_ok=True)
+        # 以 append 開檔後 tell() 即為檔案大小，不需讀回內容
+        self.file = open(self.path_for(date), mode="a", newline="", buffering=64 * 1024)
+        self.writer = csv.writer(self.file)
+        self.date = date
+        if self.file.tell() == 0:
+            self.writer.writerow(column_names)
+            self.pending += 1
+
+    def _flush(self, fsync):
+        if self.file is None:
+            return
+        self.file.flush()
+        if fsync:
+            os.fsync(self.file.fileno())
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def _close(self):
+        if self.file is None:
+            return
+        try:
+            self._flush(True)
+        finally:
+            self.file.close()
+            path = self.file.name
+            self.file = None
+            self.writer = None
+            self.date = None
+        if self.on_rotate is not None:
+            self.on_rotate(path)
+
+    def _moved(self):
+        return self.pending == 0 and not os.path.exists(self.file.name)
+
+    def write(self, column_names, values, now=None):
+        now = now or datetime.now()
+        date = now.strftime("%Y-%m-%d")
+        with self.lock:
+            if date != self.date or self._moved():
+                self._close()
+                self._open(date, column_names)
+
+            values = list(values)
+            self.writer.writerow([now.strftime("%Y-%m-%d %H:%M:%S")] + values)
+            self.pending += 1
+            if self.columnar is not None:
+                try:
+                    self.columnar.append(column_names, now.replace(microsecond=0), values)
+                except Exception as e:
+                    journal_logger.info(f"write columnar sensor log error: {e}")
+            if (
+                self.pending >= self.flush_rows
+                or time.monotonic() - self.last_flush >= self.flush_interval
+            ):
+                self._flush(self.fsync)
+
+    def flush(self):
+        """讓讀取端 (下載、Redfish) 看得到尚在緩衝區的資料，欄式檔一併寫出"""
+        with self.lock:
+            self._flush(self.fsync)
+            if self.columnar is not None:
+                try:
+                    self.columnar.flush(self.fsync)
+                except Exception as e:
+                    journal_logger.info(f"write columnar sensor log error: {e}")
+
+    def close(self):
+        with self.lock:
+            self._close()
+            if self.columnar is not None:
+                self.columnar.flush()
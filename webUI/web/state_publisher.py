@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+STATE_VERSION_FILE = "state_version.json"
+
+
+def atomic_write(path, payload, fsync=False):
+    """
+    先寫到同目錄的暫存檔再 rename 覆蓋，讀取端不會看到寫到一半的檔案。
+    """
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(payload)
+            if fsync:
+                file.flush()
+                os.fsync(file.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class JsonStatePublisher:
+    """
+    將 poller 的狀態 dict 發佈成 JSON 檔。
+
+    每個 dict 只序列化一次，內容 hash 沒變就不寫檔；有變才以緊湊格式
+    atomic 寫入，並遞增 state_version.json 內的版本號。讀取端只要比對
+    版本號 (或檔案 mtime) 就知道是否需要重新解析。
+    """
+
+    def __init__(self, directory, fsync=False):
+        self.directory = directory
+        self.fsync = fsync
+        self.digests = {}
+        self.payloads = {}
+        self.file_versions = {}
+        self.version = self._load_version()
+
+    def _load_version(self):
+        # 從上次的版本號接續，服務重啟後版本號仍單調遞增
+        try:
+            with open(os.path.join(self.directory, STATE_VERSION_FILE), "r") as file:
+                return int(json.load(file)["version"])
+        except Exception:
+            return 0
+
+    def publish(self, name, data):
+        """回傳 True 表示內容有變並已寫檔"""
+        payload = json.dumps(data, separators=(",", ":")).encode()
+        digest = hashlib.blake2b(payload, digest_size=16).digest()
+        path = os.path.join(self.directory, name)
+        if self.digests.get(name) == digest and os.path.exists(path):
+            return False
+
+        atomic_write(path, payload, self.fsync)
+        self.digests[name] = digest
+        self.payloads[name] = payload
+        self.version += 1
+        self.file_versions[name] = self.version
+        return True
+
+    def publish_all(self, states):
+        """
+        一次發佈多個檔案，任何一個有變才更新 state_version.json。
+        個別檔案寫入失敗不影響其他檔案。
+        """
+        changed = []
+        for name, data in states.items():
+            try:
+                if self.publish(name, data):
+                    changed.append(name)
+            except Exception as e:
+                print(f"{name}:{e}")
+
+        if changed:
+            version_info = {
+                "version": self.version,
+                "updated": time.time(),
+                "files": self.file_versions,
+            }
+            try:
+                atomic_write(
+                    os.path.join(self.directory, STATE_VERSION_FILE),
+                    json.dumps(version_info, separators=(",", ":")).encode(),
+                    self.fsync,
+                )
+            except Exception as e:
+                print(f"{STATE_VERSION_FILE}:{e}")
+        return changed
+
+
+class JsonStateReader:
+    """
+    讀取另一個行程以 JsonStatePublisher 發佈的狀態。
+
+    背景執行緒每 interval 秒 stat 一次 state_version.json，有變才解析其中
+    版本號改變的檔案，並就地更新 targets 內的 dict (clear() / update())
+    或 list (切片指派)，既有的參照不會失效。每次有檔案更新後以更新的檔名清單呼叫 on_change。
+    """
+
+    def __init__(self, directory, targets, interval=0.25, on_change=None):
+        self.directory = directory
+        self.targets = targets
+        self.interval = interval
+        self.on_change = on_change
+        self.stamp = None
+        self.file_versions = {}
+
+    def refresh(self):
+        """回傳本次更新的檔名清單"""
+        path = os.path.join(self.directory, STATE_VERSION_FILE)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return []
+        stamp = (stat.st_ino, stat.st_mtime_ns)
+        if stamp == self.stamp:
+            return []
+
+        try:
+            with open(path, "r") as file:
+                versions = json.load(file)["files"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"{STATE_VERSION_FILE}:{e}")
+            return []
+
+        changed = []
+        for name, target in self.targets.items():
+            version = versions.get(name)
+            if version is None or version == self.file_versions.get(name):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), "r") as file:
+                    data = json.load(file)
+            except (OSError, ValueError) as e:
+                print(f"{name}:{e}")
+                continue
+            if isinstance(target, list):
+                target[:] = data
+            else:
+                target.clear()
+                target.update(data)
+            self.file_versions[name] = version
+            changed.append(name)
+        self.stamp = stamp
+        return changed
+
+    def _run(self):
+        while True:
+            try:
+                changed = self.refresh()
+                if changed and self.on_change is not None:
+                    self.on_change(changed)
+            except Exception as e:
+                print(f"state reader error: {e}")
+            time.sleep(self.interval)
+
+    def start(self):
+        self.refresh()
+        thread = threading.Thread(target=self._run, daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,223 @@
+"""
+靜態檔建置與提供。
+
+build() 把 static/ 下的檔案複製成檔名含內容雜湊的版本 (static/dist/css/all.min.<hash>.css)，
+文字類檔案另外產生 .gz (有安裝 brotli 時再加 .br)，並寫出 manifest.json 記錄
+原路徑與雜湊路徑的對照。CSS 內的 url(...) 會改指向雜湊後的字型 / 圖片。
+
+執行時 StaticAssets 讓 url_for("static", filename=...) 依 manifest 產生雜湊路徑，
+/static/dist/ 以預先壓縮的檔案回應並帶一年的 immutable 快取標頭；
+內容改變時檔名跟著變，瀏覽器不需要再驗證舊檔。
+manifest 不存在時 url_for 維持原本的 /static/ 路徑。
+
+    python -m web.static_assets   # 手動建置
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import platform
+import re
+import sys
+
+from flask import request, send_from_directory
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+if platform.system() == "Linux":
+    onLinux = True
+else:
+    onLinux = False
+
+if onLinux:
+    from web.state_publisher import atomic_write
+else:
+    from state_publisher import atomic_write
+
+
+DIST_DIR = "dist"
+MANIFEST_FILE = "manifest.json"
+# 已經壓縮過的格式 (png、jpg、woff2...) 不再另外壓縮
+COMPRESS_SUFFIXES = {".css", ".js", ".svg", ".ttf", ".eot", ".json", ".txt", ".html"}
+CACHE_MAX_AGE = 365 * 24 * 3600
+CSS_URL = re.compile(r"url\(\s*(['\"]?)([^'\")]+)\1\s*\)")
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def _hashed_name(relpath, data):
+    base, ext = os.path.splitext(relpath)
+    return f"{base}.{_digest(data)}{ext}"
+
+
+def _sources(static_dir):
+    """回傳 static/ 下要建置的檔案 (相對路徑，/ 分隔)，略過 dist/ 與隱藏檔"""
+    sources = []
+    for root, dirs, files in os.walk(static_dir):
+        rel_root = os.path.relpath(root, static_dir)
+        if rel_root == DIST_DIR or rel_root.startswith(DIST_DIR + os.sep):
+            dirs[:] = []
+            continue
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for filename in files:
+            if filename.startswith("."):
+                continue
+            relpath = os.path.normpath(os.path.join(rel_root, filename))
+            sources.append(relpath.replace(os.sep, "/"))
+    return sorted(sources)
+
+
+def _signature(static_dir, sources):
+    entries = []
+    for relpath in sources:
+        st = os.stat(os.path.join(static_dir, relpath))
+        entries.append(f"{relpath}:{st.st_size}:{st.st_mtime_ns}")
+    return _digest("\n".join(entries).encode())
+
+
+def load_manifest(static_dir):
+    try:
+        with open(os.path.join(static_dir, DIST_DIR, MANIFEST_FILE), "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _rewrite_css(relpath, text, assets):
+    """把 CSS 內指向其他靜態檔的相對 url() 換成雜湊後的檔名"""
+    css_dir = os.path.dirname(relpath)
+
+    def replace(match):
+        quote, url = match.groups()
+        if url.startswith(("data:", "http:", "https:", "//", "/", "#")):
+            return match.group(0)
+        path, suffix = re.match(r"([^?#]*)(.*)", url).groups()
+        target = os.path.normpath(os.path.join(css_dir, path)).replace(os.sep, "/")
+        hashed = assets.get(target)
+        if hashed is None:
+            return match.group(0)
+        relative = os.path.relpath(hashed, css_dir or ".").replace(os.sep, "/")
+        return f"url({quote}{relative}{suffix}{quote})"
+
+    return CSS_URL.sub(replace, text)
+
+
+def _write(path, data):
+    if os.path.exists(path):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write(path, data)
+
+
+def build(static_dir, force=False):
+    """
+    建置 static_dir/dist；來源檔案 (大小、mtime) 沒變時直接回傳既有 manifest。
+    """
+    sources = _sources(static_dir)
+    signature = _signature(static_dir, sources)
+    manifest = load_manifest(static_dir)
+    if not force and manifest is not None and manifest.get("signature") == signature:
+        return manifest
+
+    dist_dir = os.path.join(static_dir, DIST_DIR)
+    assets = {}
+    outputs = set()
+    # CSS 會引用其他檔案，放到最後處理
+    ordered = sorted(sources, key=lambda relpath: relpath.endswith(".css"))
+    for relpath in ordered:
+        with open(os.path.join(static_dir, relpath), "rb") as file:
+            data = file.read()
+        if relpath.endswith(".css"):
+            data = _rewrite_css(relpath, data.decode("utf-8"), assets).encode("utf-8")
+
+        hashed = _hashed_name(relpath, data)
+        assets[relpath] = hashed
+        target = os.path.join(dist_dir, hashed)
+        _write(target, data)
+        outputs.add(hashed)
+
+        if os.path.splitext(relpath)[1].lower() in COMPRESS_SUFFIXES:
+            _write(target + ".gz", gzip.compress(data, 9, mtime=0))
+            outputs.add(hashed + ".gz")
+            if brotli is not None:
+                _write(target + ".br", brotli.compress(data))
+                outputs.add(hashed + ".br")
+
+    manifest = {"signature": signature, "assets": assets}
+    atomic_write(
+        os.path.join(dist_dir, MANIFEST_FILE),
+        json.dumps(manifest, indent=1, sort_keys=True).encode(),
+    )
+
+    # 清掉舊版本的雜湊檔
+    for root, _, files in os.walk(dist_dir):
+        for filename in files:
+            path = os.path.join(root, filename)
+            relpath = os.path.relpath(path, dist_dir).replace(os.sep, "/")
+            if relpath != MANIFEST_FILE and relpath not in outputs:
+                os.remove(path)
+    return manifest
+
+
+class StaticAssets:
+    """讓 url_for("static", ...) 指向雜湊檔，並提供 /static/dist/ 的預壓縮回應"""
+
+    def __init__(self, app=None):
+        self.assets = {}
+        self.dist_dir = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        manifest = load_manifest(app.static_folder)
+        self.assets = manifest["assets"] if manifest else {}
+        self.dist_dir = os.path.join(app.static_folder, DIST_DIR)
+        app.url_defaults(self._url_defaults)
+        app.add_url_rule(
+            f"{app.static_url_path}/{DIST_DIR}/<path:filename>",
+            endpoint="static_dist",
+            view_func=self.send_dist,
+        )
+
+    def _url_defaults(self, endpoint, values):
+        if endpoint != "static":
+            return
+        hashed = self.assets.get(values.get("filename"))
+        if hashed is not None:
+            values["filename"] = f"{DIST_DIR}/{hashed}"
+
+    def send_dist(self, filename):
+        suffix = ""
+        encoding = None
+        for name, candidate in (("br", ".br"), ("gzip", ".gz")):
+            if request.accept_encodings[name] and os.path.isfile(
+                os.path.join(self.dist_dir, filename + candidate)
+            ):
+                suffix, encoding = candidate, name
+                break
+
+        response = send_from_directory(
+            self.dist_dir,
+            filename + suffix,
+            mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+            max_age=CACHE_MAX_AGE,
+        )
+        if encoding is not None:
+            response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+
+if __name__ == "__main__":
+    static = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+    result = build(static, force="--force" in sys.argv)
+    print(f"built {len(result['assets'])} static assets")
@@ -0,0 +1,140 @@
+import os
+import time
+import zipfile
+
+
+CHUNK_SIZE = 64 * 1024
+# 已壓縮過的檔案再 deflate 只是浪費 CPU，直接 store
+PRECOMPRESSED_SUFFIXES = (".gz", ".zip", ".bz2", ".xz", ".7z", ".col")
+# 固定欄位長度，用於計算全部 store 時的 zip 大小
+LOCAL_HEADER_SIZE = 30
+DATA_DESCRIPTOR_SIZE = 16
+CENTRAL_HEADER_SIZE = 46
+END_RECORD_SIZE = 22
+
+
+class _ChunkSink:
+    """ZipFile 的輸出目標；不可 seek，ZipFile 會改用 data descriptor 寫法"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self.chunks = self.chunks, []
+        return chunks
+
+
+def _compress_type(arcname, compress):
+    if not compress or arcname.lower().endswith(PRECOMPRESSED_SUFFIXES):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def collect_entries(directory, select, prefix=""):
+    """
+    列出 directory 內 select(filename) 為 True 的檔案。
+    回傳 [(path, arcname, size), ...]；大小在此時固定，stream_zip() 依此長度
+    截斷或補齊，zip 內容與預估大小才會一致。
+    """
+    entries = []
+    if not os.path.isdir(directory):
+        return entries
+    for filename in sorted(os.listdir(directory)):
+        path = os.path.join(directory, filename)
+        try:
+            if not os.path.isfile(path) or not select(filename):
+                continue
+            entries.append((path, prefix + filename, os.path.getsize(path)))
+        except (IndexError, ValueError, OSError):
+            continue
+    return entries
+
+
+def estimate_size(entries, compress=True):
+    """全部以 store 寫入時回傳精確的 zip 大小，否則回傳 None"""
+    total = END_RECORD_SIZE
+    for _, arcname, size in entries:
+        if _compress_type(arcname, compress) != zipfile.ZIP_STORED:
+            return None
+        if size * 1.05 > zipfile.ZIP64_LIMIT:
+            return None
+        name_length = len(arcname.encode("utf-8"))
+        total += LOCAL_HEADER_SIZE + name_length + size + DATA_DESCRIPTOR_SIZE
+        total += CENTRAL_HEADER_SIZE + name_length
+    return total
+
+
+def _read_exact(source, size):
+    """
+    剛好讀出 size bytes：檔案列出後仍在寫入時只讀到 size，
+    被截短或已輪替刪除 (source 為 None) 時不足的部分補 0，
+    zip 的實際大小才會與 Content-Length 一致。
+    """
+    remaining = size
+    while source is not None and remaining > 0:
+        chunk = source.read(min(CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        yield chunk
+    while remaining > 0:
+        chunk = bytes(min(CHUNK_SIZE, remaining))
+        remaining -= len(chunk)
+        yield chunk
+
+
+def stream_zip(entries, compress=True, compresslevel=6):
+    """
+    邊壓縮邊產生 zip 內容的 generator，記憶體用量與檔案大小無關。
+    entries 為 collect_entries() 的回傳值，每個檔案都寫入列出時的大小。
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compresslevel=compresslevel) as zip_file:
+        for path, arcname, size in entries:
+            info = zipfile.ZipInfo(arcname, time.localtime()[:6])
+            try:
+                source = open(path, "rb")
+            except OSError:
+                source = None
+            else:
+                # 從已開啟的檔案取 stat，檔案此時被輪替也不影響
+                st = os.fstat(source.fileno())
+                info.date_time = time.localtime(st.st_mtime)[:6]
+                info.external_attr = (st.st_mode & 0xFFFF) << 16
+            try:
+                info.file_size = size
+                info.compress_type = _compress_type(arcname, compress)
+                with zip_file.open(info, "w") as target:
+                    for chunk in _read_exact(source, size):
+                        target.write(chunk)
+                        yield from sink.drain()
+            finally:
+                if source is not None:
+                    source.close()
+            yield from sink.drain()
+    yield from sink.drain()
+
+
+def zip_response(response_class, entries, download_name, compress=True):
+    """建立串流下載的 flask Response；能算出大小時附上 Content-Length"""
+    headers = {
+        "Content-Disposition": f"attachment; filename={download_name}",
+        # 不讓 nginx 先把整個 zip 緩衝起來
+        "X-Accel-Buffering": "no",
+    }
+    size = estimate_size(entries, compress)
+    if size is not None:
+        headers["Content-Length"] = str(size)
+    return response_class(
+        stream_zip(entries, compress),
+        mimetype="application/zip",
+        headers=headers,
+        direct_passthrough=True,
+    )
@@ -3,9 +3,11 @@
 
 TARGET_DIR=/home/user/service/webUI
 SERVICE_NAME=webui.service
+POLLER_SERVICE_NAME=webui-poller.service
 VENV_PATH=$TARGET_DIR/webvenv
 SCRIPT_PATH=$TARGET_DIR/web/app.py
 SYSTEMD_PATH=/etc/systemd/system/$SERVICE_NAME
+POLLER_SYSTEMD_PATH=/etc/systemd/system/$POLLER_SERVICE_NAME
 
 
 cd $TARGET_DIR
@@ -16,16 +18,37 @@ pip install --no-index --find-links=./wheelhouse --upgrade -r requirements.txt |
 
 
 
+# PLC 輪詢獨立成一個服務，gunicorn 以 WEBUI_ROLE=web 只讀取輪詢結果，可開多個 worker
+cat <<EOL | sudo tee $POLLER_SYSTEMD_PATH
+[Unit]
+Description=WebUI Poller Service
+After=network.target
+
+
+[Service]
+WorkingDirectory=$TARGET_DIR
+Environment="PATH=$VENV_PATH/bin:/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin"
+ExecStart=$VENV_PATH/bin/python -m web.poller
+Restart=always
+RestartSec=5
+StandardOutput=file:/home/user/service/webUI/poller.log
+StandardError=file:/home/user/service/webUI/poller.log
+[Install]
+WantedBy=multi-user.target
+EOL
+
 cat <<EOL | sudo tee $SYSTEMD_PATH
 [Unit]
 Description=WebUI Service
-After=network.target
+After=network.target $POLLER_SERVICE_NAME
+Wants=$POLLER_SERVICE_NAME
 
 
 [Service]
 #User=user
 WorkingDirectory=$TARGET_DIR
 Environment="PATH=$VENV_PATH/bin:/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin"
+Environment="WEBUI_ROLE=web"
 ExecStart=$VENV_PATH/bin/gunicorn --config $TARGET_DIR/web/gunicorn_config.py web.app:app
 #ExecStart=$VENV_PATH/bin/python $SCRIPT_PATH
 Restart=always
@@ -36,8 +59,10 @@ StandardError=file:/home/user/service/webUI/logfile.log
 WantedBy=multi-user.target
 EOL
 
-sudo chmod 644 $SYSTEMD_PATH
+sudo chmod 644 $SYSTEMD_PATH $POLLER_SYSTEMD_PATH
 sudo systemctl daemon-reload
+sudo systemctl start $POLLER_SERVICE_NAME
+sudo systemctl enable $POLLER_SERVICE_NAME
 sudo systemctl start $SERVICE_NAME
 sudo systemctl enable $SERVICE_NAME
 sudo systemctl status $SERVICE_NAME